@@ -1,8 +1,15 @@
+import uuid
+
 import streamlit as st
-import pandas as pd
-import io
-import zipfile
-from datetime import datetime
+
+# 冷启动只加载核心；检索/预览/预算/导出模块在生成报表时才导入（之后留在 sys.modules，rerun 不再付导入成本）
+from restock.cache import get_default_cache
+from restock.dashboard import (FILE_LABELS, FORECAST_LABELS, JOB_LABELS, SHOP_PLAN_LABELS, STAGE_LABELS, TIMING_LABELS,
+                               kpis, pack_label, page_count, table, today_stamp)
+from restock.fonts import font_hint, missing_fonts
+from restock.jobs import STATUS_TEXT, get_default_jobs, job_key
+from restock.pipeline import Params, Pipeline
+from restock.readers import as_source
 
 # ==========================================
 # 1. 页面配置
@@ -12,204 +19,41 @@ st.title("📦 Coupang 智能补货 (定制导出版)")
 st.markdown("### 核心逻辑：分表极简展示 + 统一视觉标准")
 
 # ==========================================
-# 2. 列号配置 (请确认 Excel 实际位置)
+# 2. 流水线 (列号配置见 restock/config.py)
 # ==========================================
-# A=0, B=1, C=2, D=3, E=4, F=5, G=6 ... M=12, N=13 ... R=17
-
-# --- 1. 基础信息表 (Master) ---
-IDX_M_CODE    = 0    # A列: 产品编码
-IDX_M_SHOP    = 1    # B列: 店铺
-IDX_M_COL_E   = 4    # E列: 基础信息E
-IDX_M_COL_F   = 5    # F列: SKU名称
-IDX_M_COST    = 6    # G列: 采购单价
-IDX_M_ORANGE  = 3    # D列: 橙火ID
-IDX_M_INBOUND = 12   # M列: 入库码
-IDX_M_ACTIVE  = 13   # N列: 是否在做 (有Y=在做，大小写容错)
-
-# --- 2.1 销售表 (近7天) ---
-IDX_7D_SKU    = 0    # A列: SKU/ID
-IDX_7D_QTY    = 8    # I列: 销售数量
-
-# --- 2.2 销售表 (近30天) ---
-IDX_30D_SKU   = 0    # A列: SKU/ID
-IDX_30D_QTY   = 8    # I列: 销售数量
-
-# --- 3. 火箭仓/橙火库存表 ---
-IDX_INV_R_SKU = 2    # C列: SKU/ID
-IDX_INV_R_QTY = 7    # H列: 数量
-IDX_INV_R_FEE = 17   # R列: 本月仓储费
-
-# --- 4. 极风库存表 ---
-IDX_INV_J_BAR = 2    # C列: 条码/入库码
-IDX_INV_J_QTY = 10   # K列: 数量
+@st.cache_resource
+def get_pipeline():
+    """各阶段记忆化结果跨 rerun/会话共享"""
+    return Pipeline(cache=get_default_cache())
+
+def generate_report(job, pipeline, inputs, params, bp, stamp, with_pdf, prof, render=True):
+    """后台任务：计算 (+预算分配) + 渲染 ZIP；返回 ((结果, 产物耗时, 剖析), PackResult)
+
+    计算完先 publish 给页面展示预览，打包在后台继续；render=False：ZIP 已在结果缓存中（如服务重启后），不再打包
+    """
+    def on_parsed(done, total, name):
+        job.report(0.6 * done / total, f"解析文件 {done}/{total}：{name}")
+
+    with prof.activate():
+        job.report(0.0, "正在按指定列顺序匹配数据...")
+        res = pipeline.run(*inputs, params, progress=on_parsed)
+        if bp is not None:
+            res = pipeline.plan_budget(res, params, bp)
+        job.publish((res, [], prof))
+        if not render:
+            return (res, [], prof), None
+
+        from restock.export import render_pack   # xlsxwriter 在渲染 Excel 时才加载
+
+        job.report(0.7, "正在生成 Excel / 工单...")
+        with prof.stage('render'):
+            pack = render_pack(res.tables, stamp, ingestor=pipeline.ingestor, with_pdf=with_pdf)
+        for t in pack.timings:
+            prof.add_stage(f"render:{t['name']}", t['render_s'], bytes=t['bytes'], cached=False)
+    return (res, pack.timings, prof), pack
 
 # ==========================================
-# 3. 工具函数
-# ==========================================
-def clean_match_key(series):
-    s = series.astype(str).str.upper()
-    s = s.str.replace(r'\.0$', '', regex=True).str.replace('"', '').str.strip()
-    s = s.replace('NAN', '')
-    return s
-
-def clean_num(series):
-    return pd.to_numeric(series.astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-
-def clean_str(series):
-    return series.astype(str).str.replace('nan', '', case=False).str.strip()
-
-def read_file(file):
-    if file is None:
-        return pd.DataFrame()
-    if file.name.endswith(('.xlsx', '.xls', '.xlsm')):
-        try:
-            file.seek(0)
-            return pd.read_excel(file, dtype=str, engine='openpyxl')
-        except:
-            return pd.DataFrame()
-    encodings = ['utf-8', 'utf-8-sig', 'cp949', 'euc-kr', 'gbk', 'latin1']
-    for enc in encodings:
-        try:
-            file.seek(0)
-            return pd.read_csv(file, dtype=str, encoding=enc)
-        except:
-            continue
-    return pd.DataFrame()
-
-def blank_repeat_like_merge(df: pd.DataFrame, group_col: str, cols_to_blank: list):
-    """让指定列在同一group内重复行置空，达到“视觉合并”效果（兼容Excel Table）"""
-    out = df.copy()
-    if group_col not in out.columns:
-        return out
-    first = out[group_col].astype(str).fillna('').ne(out[group_col].astype(str).shift())
-    for c in cols_to_blank:
-        if c in out.columns:
-            out.loc[~first, c] = ''
-    return out
-
-def estimate_col_widths(df: pd.DataFrame, fixed_col_names=None, fixed_width=26,
-                        min_w=6, max_w=22, header_pad=2, cell_pad=2):
-    """xlsxwriter无真正autofit，用字符长度估算列宽"""
-    fixed_col_names = set(fixed_col_names or [])
-    widths = []
-    for col in df.columns:
-        if col in fixed_col_names:
-            widths.append(fixed_width)
-            continue
-        best = len(str(col)) + header_pad
-        ser = df[col].fillna('')
-        lens = ser.astype(str).map(len)
-        if len(lens) > 0:
-            best = max(best, int(lens.max()) + cell_pad)
-        best = max(min_w, min(max_w, best))
-        widths.append(best)
-    return widths
-
-def col_to_excel(col_idx: int) -> str:
-    """0->A, 1->B ..."""
-    n = col_idx + 1
-    s = ""
-    while n:
-        n, r = divmod(n - 1, 26)
-        s = chr(65 + r) + s
-    return s
-
-def make_work_order_html(df: pd.DataFrame, title: str, subtitle: str) -> bytes:
-    """A4灰白可打印HTML，在线加载Noto字体；斑马纹按产品编码分组"""
-    df2 = df.copy()
-    for c in df2.columns:
-        df2[c] = df2[c].fillna('').astype(str)
-
-    if '产品编码' in df2.columns and len(df2) > 0:
-        codes = df2['产品编码'].astype(str).fillna('')
-        gid = (codes.ne(codes.shift()).cumsum() % 2).astype(int)
-    else:
-        gid = pd.Series([0] * len(df2), dtype=int)
-
-    left_cols = set([c for c in df2.columns if c in ('基础信息', 'SKU名称')])
-
-    thead = "<thead><tr>" + "".join([f"<th>{col}</th>" for col in df2.columns]) + "</tr></thead>"
-    rows = []
-    for i in range(len(df2)):
-        zebra = "z1" if int(gid.iloc[i]) == 1 else "z0"
-        tds = []
-        for col in df2.columns:
-            cls = "td-left" if col in left_cols else "td-center"
-            tds.append(f'<td class="{cls}">{df2.iloc[i][col]}</td>')
-        rows.append(f'<tr class="{zebra}">' + "".join(tds) + "</tr>")
-    tbody = "<tbody>" + "".join(rows) + "</tbody>"
-
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    html = f"""<!doctype html>
-<html lang="zh">
-<head>
-  <meta charset="utf-8" />
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  <link rel="preconnect" href="https://fonts.googleapis.com">
-  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-  <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;600&family=Noto+Sans+KR:wght@400;600&display=swap" rel="stylesheet">
-  <title>{title}</title>
-  <style>
-    :root {{
-      --fg:#111; --muted:#555; --line:#d8d8d8; --head:#3f3f3f; --zebra:#f1f1f1; --white:#fff;
-    }}
-    html,body {{
-      margin:0; padding:0; background:var(--white); color:var(--fg);
-      font-family:"Noto Sans SC","Noto Sans KR",system-ui,-apple-system,"Segoe UI",Arial,sans-serif;
-      -webkit-print-color-adjust:exact; print-color-adjust:exact;
-    }}
-    .page {{ width:210mm; margin:0 auto; padding:14mm 12mm; box-sizing:border-box; }}
-    .header {{
-      display:flex; justify-content:space-between; align-items:flex-end;
-      border-bottom:2px solid var(--line); padding-bottom:10px; margin-bottom:12px; gap:12px;
-    }}
-    .title {{ font-size:18px; font-weight:600; margin:0; }}
-    .sub {{ margin:6px 0 0 0; font-size:12px; color:var(--muted); }}
-    .meta {{ font-size:12px; color:var(--muted); text-align:right; white-space:nowrap; }}
-    table {{ width:100%; border-collapse:collapse; font-size:11px; }}
-    th {{
-      background:var(--head); color:#fff; padding:8px 6px; border:1px solid var(--line);
-      text-align:center; font-weight:600;
-    }}
-    td {{ border:1px solid var(--line); padding:6px 6px; vertical-align:middle; word-break:break-word; }}
-    .td-center {{ text-align:center; }}
-    .td-left {{ text-align:left; }}
-    tr.z1 td {{ background:var(--zebra); }}
-    @media print {{
-      thead {{ display:table-header-group; }}
-      tr {{ page-break-inside:avoid; }}
-      .page {{ padding:10mm 10mm; }}
-    }}
-  </style>
-</head>
-<body>
-  <div class="page">
-    <div class="header">
-      <div>
-        <h1 class="title">{title}</h1>
-        <div class="sub">{subtitle}</div>
-      </div>
-      <div class="meta">
-        生成日期：{today}<br/>
-        打印：A4 / 黑白灰
-      </div>
-    </div>
-    <table>{thead}{tbody}</table>
-  </div>
-</body>
-</html>
-"""
-    return html.encode("utf-8")
-
-def _safe_float(x):
-    try:
-        return float(x)
-    except:
-        return 0.0
-
-# ==========================================
-# 4. 侧边栏
+# 3. 侧边栏
 # ==========================================
 with st.sidebar:
     st.header("⚙️ 参数设置")
@@ -231,9 +75,31 @@ with st.sidebar:
     st.divider()
     redundancy_weeks = st.number_input("⚠️ 库存冗余周数 (滞销标准)", min_value=4, max_value=52, value=8, step=1)
 
+    st.divider()
+    st.subheader("📈 需求预测")
+    forecast = FORECAST_LABELS[st.selectbox("预测方法", list(FORECAST_LABELS))]
+    forecast_weight = st.slider("7天销量权重 (混合)", min_value=0.0, max_value=1.0, value=0.5, step=0.05,
+                                help="其余权重给30天日均；单周暴涨/暴跌时调低可减少误判")
+    service_z = st.slider("置信带宽度 (σ倍数)", min_value=0.0, max_value=3.0, value=1.0, step=0.1,
+                          help="安全库存/冗余标准/橙火安全库存 = 预测×周数 + σ倍数×波动×√周数；0=只按预测均值")
+
+    st.divider()
+    st.subheader("💰 预算采购")
+    use_budget = st.checkbox("按预算分配采购数", value=False, help="预算内优先补覆盖周数最低的 SKU，另出预算采购单/工单")
+    budget = st.number_input("本期预算 (RMB)", min_value=0, value=100000, step=10000, disabled=not use_budget)
+    moq = st.number_input("起订量 (MOQ)", min_value=1, value=1, step=1, disabled=not use_budget)
+    shop_caps_text = st.text_area("店铺上限 (每行 店铺=金额，可留空)", disabled=not use_budget)
+
     st.divider()
     st.subheader("🔍 单品库存查询")
-    search_key = st.text_input("输入产品编码 (A列)", placeholder="输入后按回车查询，留空看全部")
+    search_key = st.text_input("产品编码 / SKU名称 / 橙火ID / 入库码", placeholder="输入后按回车查询，留空看全部")
+
+    st.divider()
+    with_pdf = st.checkbox("🖨️ 附带 PDF 工单 (离线打印)", value=True, help="本地字体，无需联网；仓库电脑直接打印")
+    if with_pdf and missing_fonts():
+        # 不嵌入字体的 PDF 在离线电脑上中韩文显示不出来，宁可不出
+        st.warning(f"⚠️ 本次不生成 PDF 工单：{font_hint(missing_fonts())}")
+        with_pdf = False
 
     st.divider()
     st.info("📂 请上传文件 (保持Master顺序)")
@@ -243,479 +109,189 @@ with st.sidebar:
     files_inv_r = st.file_uploader("3. 橙火/火箭仓库存 *多选", type=['xlsx', 'csv'], accept_multiple_files=True)
     files_inv_j = st.file_uploader("4. 极风库存 *多选", type=['xlsx', 'csv'], accept_multiple_files=True)
 
+    st.divider()
+    with st.expander("🗂️ 解析缓存"):
+        cache_stats = get_default_cache().stats()
+        st.caption(
+            f"命中 {cache_stats['hits']} · 磁盘命中 {cache_stats['disk_hits']} · 未命中 {cache_stats['misses']} · "
+            f"淘汰 {cache_stats['evictions']} · 条目 {cache_stats['entries']} ({cache_stats['mem_mb']} MB) · "
+            f"命中率 {cache_stats['hit_rate']:.0%} · 磁盘层 {'开' if cache_stats['disk'] else '关'}"
+        )
+        if st.button("清空缓存"):
+            get_default_cache().clear(disk=True)
+            get_pipeline().clear()
+
+    with st.expander("📈 性能剖析"):
+        profile_memory = st.checkbox("统计各阶段内存峰值 (tracemalloc，略慢)", value=False)
+        profile_code = st.checkbox("函数级剖析 (cProfile 热点)", value=False)
+
+    with st.expander("🧵 后台任务"):
+        job_list = get_default_jobs().jobs()
+        if job_list:
+            st.dataframe(table([j.record() for j in reversed(job_list)], JOB_LABELS), use_container_width=True,
+                         hide_index=True)
+        result_stats = get_default_jobs().results.stats()
+        st.caption(f"结果缓存 {result_stats['entries']} 个压缩包 ({result_stats['mb']} MB) · 淘汰 {result_stats['evictions']}")
+
 # ==========================================
-# 5. 主逻辑
+# 4. 主逻辑：计算 + 打包在后台任务里跑，页面只轮询进度；任务ID 记在 URL 里，刷新页面后继续
 # ==========================================
+jobs = get_default_jobs()
 if file_master and files_sales_7d and files_sales_30d and files_inv_r and files_inv_j:
     if st.button("🚀 生成定制报表", type="primary", use_container_width=True):
-        with st.spinner("正在按指定列顺序匹配数据..."):
-
-            # --- A. 读取 Master ---
-            df_m = read_file(file_master)
-            if df_m.empty:
-                st.stop()
-
-            df_base = pd.DataFrame()
+        st.session_state['report_ready'] = True
+    if st.session_state.get('report_ready'):
+        from restock.profiling import Profiler
+
+        # --- A~F. 读取/清洗/汇总/合并/计算（各阶段按输入记忆化，只改参数时只重算F；同输入同参数直接复用已有任务） ---
+        params = Params(safety_weeks, min_safety_qty, orange_safety_weeks, redundancy_weeks,
+                        forecast=forecast, forecast_weight=forecast_weight, service_z=service_z)
+        bp = None
+        if use_budget:
+            from restock.budget import BudgetParams, parse_shop_caps
             try:
-                df_base['Shop'] = clean_str(df_m.iloc[:, IDX_M_SHOP])
-                df_base['Code'] = clean_match_key(df_m.iloc[:, IDX_M_CODE])
-                df_base['Info_E'] = clean_str(df_m.iloc[:, IDX_M_COL_E])
-                df_base['Info_F'] = clean_str(df_m.iloc[:, IDX_M_COL_F])
-                df_base['Cost'] = clean_num(df_m.iloc[:, IDX_M_COST])
-                df_base['Orange_ID'] = clean_match_key(df_m.iloc[:, IDX_M_ORANGE])
-                df_base['Inbound_Code'] = clean_match_key(df_m.iloc[:, IDX_M_INBOUND])
-
-                active_raw = clean_str(df_m.iloc[:, IDX_M_ACTIVE])
-                df_base['Active'] = active_raw.astype(str).str.contains('Y', case=False, na=False).map(lambda x: 'Y' if x else '')
-            except IndexError:
-                st.error("❌ 基础表列数不足，请检查列配置！")
-                st.stop()
-
-            # --- B1. 销售汇总 (近7天) ---
-            s_list_7d = [read_file(f) for f in files_sales_7d]
-            if not s_list_7d:
+                bp = BudgetParams(float(budget), int(moq), parse_shop_caps(shop_caps_text))
+            except ValueError as e:
+                st.error(str(e))
                 st.stop()
-            df_sales_7d = pd.concat(s_list_7d, ignore_index=True)
-            df_sales_7d['Key'] = clean_match_key(df_sales_7d.iloc[:, IDX_7D_SKU])
-            df_sales_7d['Qty'] = clean_num(df_sales_7d.iloc[:, IDX_7D_QTY])
-            agg_sales_7d = df_sales_7d.groupby('Key')['Qty'].sum().reset_index()
-
-            # --- B2. 销售汇总 (近30天，仅展示) ---
-            s_list_30d = [read_file(f) for f in files_sales_30d]
-            if not s_list_30d:
-                st.stop()
-            df_sales_30d = pd.concat(s_list_30d, ignore_index=True)
-            df_sales_30d['Key'] = clean_match_key(df_sales_30d.iloc[:, IDX_30D_SKU])
-            df_sales_30d['Qty'] = clean_num(df_sales_30d.iloc[:, IDX_30D_QTY])
-            agg_sales_30d = df_sales_30d.groupby('Key')['Qty'].sum().reset_index()
-
-            # --- C. 橙火库存 ---
-            r_list = [read_file(f) for f in files_inv_r]
-            if r_list:
-                df_r = pd.concat(r_list, ignore_index=True)
-                df_r['Key'] = clean_match_key(df_r.iloc[:, IDX_INV_R_SKU])
-                df_r['Qty'] = clean_num(df_r.iloc[:, IDX_INV_R_QTY])
-                try:
-                    df_r['Fee'] = clean_num(df_r.iloc[:, IDX_INV_R_FEE])
-                except:
-                    df_r['Fee'] = 0
-                agg_orange = df_r.groupby('Key')[['Qty', 'Fee']].sum().reset_index()
-            else:
-                agg_orange = pd.DataFrame(columns=['Key', 'Qty', 'Fee'])
-
-            # --- D. 极风库存 ---
-            j_list = [read_file(f) for f in files_inv_j]
-            if j_list:
-                df_j = pd.concat(j_list, ignore_index=True)
-                df_j['Key'] = clean_match_key(df_j.iloc[:, IDX_INV_J_BAR])
-                df_j['Qty'] = clean_num(df_j.iloc[:, IDX_INV_J_QTY])
-                agg_jifeng = df_j.groupby('Key')['Qty'].sum().reset_index()
-            else:
-                agg_jifeng = pd.DataFrame(columns=['Key', 'Qty'])
-
-            # --- E. 匹配合并 ---
-            df_final = pd.merge(df_base, agg_sales_7d, left_on='Orange_ID', right_on='Key', how='left')
-            df_final.rename(columns={'Qty': 'Sales_7d'}, inplace=True)
-
-            df_final = pd.merge(df_final, agg_sales_30d, left_on='Orange_ID', right_on='Key', how='left', suffixes=('', '_30d'))
-            df_final.rename(columns={'Qty': 'Sales_30d'}, inplace=True)
-
-            df_final = pd.merge(df_final, agg_orange, left_on='Orange_ID', right_on='Key', how='left', suffixes=('', '_R'))
-            df_final.rename(columns={'Qty': 'Stock_Orange', 'Fee': 'Storage_Fee'}, inplace=True)
-
-            df_final = pd.merge(df_final, agg_jifeng, left_on='Inbound_Code', right_on='Key', how='left', suffixes=('', '_J'))
-            df_final.rename(columns={'Qty': 'Stock_Jifeng'}, inplace=True)
-
-            # --- F. 计算逻辑（不使用30天） ---
-            df_final['Sales_7d'] = df_final['Sales_7d'].fillna(0)
-            df_final['Sales_30d'] = df_final['Sales_30d'].fillna(0)  # 仅展示用
-            df_final['Stock_Orange'] = df_final['Stock_Orange'].fillna(0)
-            df_final['Stock_Jifeng'] = df_final['Stock_Jifeng'].fillna(0)
-            df_final['Storage_Fee'] = df_final['Storage_Fee'].fillna(0)
-
-            df_final['Total_Stock'] = df_final['Stock_Orange'] + df_final['Stock_Jifeng']
-            df_final['Safety_Calc'] = df_final['Sales_7d'] * safety_weeks
-
-            def apply_safety_floor(row):
-                base_val = row['Safety_Calc']
-                is_active = (str(row.get('Active', '')).strip().upper() == 'Y')
-                has_inbound = bool(str(row.get('Inbound_Code', '')).strip())
-                if is_active and has_inbound:
-                    return max(base_val, min_safety_qty)
-                return base_val
-
-            df_final['Safety'] = df_final.apply(apply_safety_floor, axis=1)
-            df_final['Redundancy_Std'] = df_final['Sales_7d'] * redundancy_weeks
-
-            df_final['Restock_Qty'] = (df_final['Safety'] - df_final['Total_Stock']).apply(lambda x: int(x) if x > 0 else 0)
-            inactive_mask = df_final['Active'].astype(str).str.upper().ne('Y')
-            df_final.loc[inactive_mask, 'Restock_Qty'] = 0
-            df_final['Restock_Money'] = df_final['Restock_Qty'] * df_final['Cost']
-
-            df_final['Redundancy_Qty'] = (df_final['Total_Stock'] - df_final['Redundancy_Std']).apply(lambda x: int(x) if x > 0 else 0)
-            df_final['Redundancy_Money'] = df_final['Redundancy_Qty'] * df_final['Cost']
-
-            # ✅ 调拨：不计算保底库存
-            df_final['Orange_Safety_Calc'] = df_final['Sales_7d'] * orange_safety_weeks
-            df_final['Orange_Safety_Std'] = df_final['Orange_Safety_Calc']  # 不做 max(..., min_safety_qty)
-            df_final['Orange_Transfer_Qty'] = (df_final['Orange_Safety_Std'] - df_final['Stock_Orange']).apply(lambda x: int(x) if x > 0 else 0)
-
-            # --- G. 整理输出（保持原结构，不把30天写进基础df_out_base） ---
-            cols_export_base = [
-                'Shop', 'Code', 'Info_E', 'Info_F', 'Cost', 'Orange_ID', 'Inbound_Code',
-                'Sales_7d', 'Stock_Orange', 'Stock_Jifeng', 'Total_Stock', 'Safety',
-                'Restock_Qty', 'Restock_Money', 'Redundancy_Std', 'Redundancy_Qty',
-                'Redundancy_Money', 'Orange_Safety_Std', 'Orange_Transfer_Qty', 'Storage_Fee'
-            ]
-            df_out_base = df_final[cols_export_base].copy()
-
-            header_map_base = {
-                'Shop': '店铺名称',
-                'Code': '产品编码',
-                'Info_E': '基础信息',
-                'Info_F': 'SKU名称',
-                'Cost': '采购单价',
-                'Orange_ID': '橙火ID',
-                'Inbound_Code': '入库码',
-                'Sales_7d': '7天销量',
-                'Stock_Orange': '橙火库存',
-                'Stock_Jifeng': '极风库存',
-                'Total_Stock': '库存合计',
-                'Safety': f'总安全库存(有码>{min_safety_qty})',
-                'Restock_Qty': '建议采购数',
-                'Restock_Money': '预计采购总额(RMB)',
-                'Redundancy_Std': f'冗余标准({redundancy_weeks}周)',
-                'Redundancy_Qty': '冗余数量',
-                'Redundancy_Money': '冗余资金',
-                'Orange_Safety_Std': f'橙火安全库存(有码>{min_safety_qty})',
-                'Orange_Transfer_Qty': '建议调拨数量',
-                'Storage_Fee': '本月仓储费(预警)'
-            }
-            df_out_base.rename(columns=header_map_base, inplace=True)
-
-            # ✅ 采购/调拨/预警表（先按原逻辑筛选）
-            df_buy = df_out_base[df_out_base['建议采购数'].map(_safe_float) > 0].copy()
-            df_trans = df_out_base[df_out_base['建议调拨数量'].map(_safe_float) > 0].copy()
-            df_fee = df_out_base[df_out_base['本月仓储费(预警)'].map(_safe_float) > 0].copy()
-
-            # ===============================
-            # ✅ 插入“30天销量”（仅展示用，不参与运算）
-            # - df_sheet1：用于streamlit预览 + sheet1导出
-            # - df_buy：用于sheet2导出 + 采购工单HTML
-            # ===============================
-            sales_30d_series = df_final['Sales_30d'].map(_safe_float).values
-
-            # Sheet1/展示专用：插入“在做(Y)”列 + 30天销量
-            df_sheet1 = df_out_base.copy()
-            df_sheet1.insert(1, '在做(Y)', df_final['Active'].values)
-
-            if '7天销量' in df_sheet1.columns:
-                pos_7d = df_sheet1.columns.get_loc('7天销量')
-                df_sheet1.insert(pos_7d + 1, '30天销量', sales_30d_series)
-
-            # 采购单：在 7天销量 后插入 30天销量（落在 7天销量 与 橙火库存 中间）
-            df_buy_with30 = df_buy.copy()
-            if len(df_buy_with30) > 0 and '7天销量' in df_buy_with30.columns:
-                # 按产品编码映射到30天（因为df_buy是df_out_base过滤后的子集）
-                # df_out_base 的行顺序与 df_final 对齐，所以可用 df_buy.index 去取 df_final 的 Sales_30d
-                sales_30d_buy = df_final.loc[df_buy_with30.index, 'Sales_30d'].map(_safe_float).values
-                pos_7d_buy = df_buy_with30.columns.get_loc('7天销量')
-                df_buy_with30.insert(pos_7d_buy + 1, '30天销量', sales_30d_buy)
-
-            # ==========================================
-            # ✅ H. 搜索与KPI + 高亮看板（按产品编码分组斑马纹）
-            # ==========================================
-            if search_key:
-                df_display = df_sheet1[df_sheet1['产品编码'].astype(str).str.contains(search_key, case=False, na=False)].copy()
-            else:
-                df_display = df_sheet1.copy()
-
-            buy_mask = df_display.get('建议采购数', pd.Series([0] * len(df_display))).map(_safe_float) > 0
-            k1_cnt = int(buy_mask.sum())
-            k1_val = float(df_display.loc[buy_mask, '预计采购总额(RMB)'].map(_safe_float).sum()) if '预计采购总额(RMB)' in df_display.columns else 0.0
-
-            red_mask = df_display.get('冗余数量', pd.Series([0] * len(df_display))).map(_safe_float) > 0
-            k2_cnt = int(red_mask.sum())
-            k2_val = float(df_display.loc[red_mask, '冗余资金'].map(_safe_float).sum()) if '冗余资金' in df_display.columns else 0.0
-
-            trans_mask = df_display.get('建议调拨数量', pd.Series([0] * len(df_display))).map(_safe_float) > 0
-            k3_cnt = int(trans_mask.sum())
-            k3_val = float(df_display.loc[trans_mask, '建议调拨数量'].map(_safe_float).sum()) if '建议调拨数量' in df_display.columns else 0.0
-
-            fee_mask = df_display.get('本月仓储费(预警)', pd.Series([0] * len(df_display))).map(_safe_float) > 0
-            k4_cnt = int(fee_mask.sum())
-            k4_val = float(df_display.loc[fee_mask, '本月仓储费(预警)'].map(_safe_float).sum()) if '本月仓储费(预警)' in df_display.columns else 0.0
-
-            st.divider()
-            m1, m2, m3, m4 = st.columns(4)
-            m1.metric("**📦 需采购 SKU / 金额**", f"{k1_cnt} 个", f"¥ {k1_val:,.0f}")
-            m2.metric("**⚠️ 冗余 SKU / 资金**", f"{k2_cnt} 个", f"¥ {k2_val:,.0f}", delta_color="inverse")
-            m3.metric("**🚚 需调拨 SKU / 数量**", f"{k3_cnt} 个", f"{k3_val:,.0f} 件")
-            m4.metric("**🚨 库龄预警 SKU / 总仓储费**", f"{k4_cnt} 个", f"₩ {k4_val:,.0f}", delta_color="inverse")
-
-            # 视觉置空（店铺名称/产品编码同一产品只显示一次）
-            df_display_vis = df_display.copy()
-            if '产品编码' in df_display_vis.columns:
-                first_in_group = df_display_vis['产品编码'].astype(str).fillna('').ne(df_display_vis['产品编码'].astype(str).shift())
-                for col in ['店铺名称', '产品编码']:
-                    if col in df_display_vis.columns:
-                        df_display_vis.loc[~first_in_group, col] = ''
-                zebra_group_ids = (df_display['产品编码'].astype(str).fillna('').ne(df_display['产品编码'].astype(str).shift()).cumsum() % 2)
-            else:
-                zebra_group_ids = pd.Series([0] * len(df_display_vis), index=df_display_vis.index)
-
-            def highlight_zebra(row):
-                try:
-                    gid = zebra_group_ids.loc[row.name]
-                    if int(gid) == 1:
-                        return ['background-color: #f7f7f7'] * len(row)
-                except:
-                    pass
-                return [''] * len(row)
-
-            def highlight_bold_cols(row):
-                return ['font-weight: bold'] * len(row)
-
-            def highlight_restock_qty(s):
-                return ['background-color: #ffcccc; color: #b71c1c; font-weight: bold' if _safe_float(v) > 0 else '' for v in s]
-
-            def highlight_restock_money(s):
-                return ['background-color: #ffcccc; color: #b71c1c' if _safe_float(v) > 0 else '' for v in s]
-
-            def highlight_redundancy_qty(s):
-                return ['background-color: #ffe0b2; color: #e65100; font-weight: bold' if _safe_float(v) > 0 else '' for v in s]
-
-            def highlight_redundancy_money(s):
-                return ['background-color: #ffe0b2; color: #e65100' if _safe_float(v) > 0 else '' for v in s]
-
-            def highlight_transfer(s):
-                return ['background-color: #e3f2fd; color: #0d47a1; font-weight: bold' if _safe_float(v) > 0 else '' for v in s]
-
-            def highlight_fee(s):
-                return ['background-color: #e1bee7; color: #4a148c; font-weight: bold' if _safe_float(v) > 0 else '' for v in s]
-
-            st_df = df_display_vis.style.apply(highlight_zebra, axis=1)
-
-            for c in ['产品编码', 'SKU名称']:
-                if c in df_display_vis.columns:
-                    st_df = st_df.apply(highlight_bold_cols, subset=[c])
-
-            if '建议采购数' in df_display_vis.columns:
-                st_df = st_df.apply(highlight_restock_qty, subset=['建议采购数'])
-            if '预计采购总额(RMB)' in df_display_vis.columns:
-                st_df = st_df.apply(highlight_restock_money, subset=['预计采购总额(RMB)'])
-            if '冗余数量' in df_display_vis.columns:
-                st_df = st_df.apply(highlight_redundancy_qty, subset=['冗余数量'])
-            if '冗余资金' in df_display_vis.columns:
-                st_df = st_df.apply(highlight_redundancy_money, subset=['冗余资金'])
-            if '建议调拨数量' in df_display_vis.columns:
-                st_df = st_df.apply(highlight_transfer, subset=['建议调拨数量'])
-            if '本月仓储费(预警)' in df_display_vis.columns:
-                st_df = st_df.apply(highlight_fee, subset=['本月仓储费(预警)'])
-
-            fmt_map = {}
-            for k in ['橙火库存', '极风库存', '库存合计', '7天销量', '30天销量', '建议采购数', '冗余数量', '建议调拨数量']:
-                if k in df_display_vis.columns:
-                    fmt_map[k] = '{:.0f}'
-            if f'总安全库存(有码>{min_safety_qty})' in df_display_vis.columns:
-                fmt_map[f'总安全库存(有码>{min_safety_qty})'] = '{:.0f}'
-            if f'冗余标准({redundancy_weeks}周)' in df_display_vis.columns:
-                fmt_map[f'冗余标准({redundancy_weeks}周)'] = '{:.0f}'
-            if f'橙火安全库存(有码>{min_safety_qty})' in df_display_vis.columns:
-                fmt_map[f'橙火安全库存(有码>{min_safety_qty})'] = '{:.0f}'
-            if '预计采购总额(RMB)' in df_display_vis.columns:
-                fmt_map['预计采购总额(RMB)'] = '{:,.0f}'
-            if '采购单价' in df_display_vis.columns:
-                fmt_map['采购单价'] = '{:,.0f}'
-            if '冗余资金' in df_display_vis.columns:
-                fmt_map['冗余资金'] = '{:,.0f}'
-            if '本月仓储费(预警)' in df_display_vis.columns:
-                fmt_map['本月仓储费(预警)'] = '{:,.0f}'
-
-            if fmt_map:
-                st_df = st_df.format(fmt_map)
-
-            st.dataframe(st_df, use_container_width=True, height=600, hide_index=True)
-
-            # ==========================================
-            # Excel 导出（Table + 按产品编码分组斑马纹 + 两列左对齐）
-            # ==========================================
-            out_io = io.BytesIO()
-            with pd.ExcelWriter(out_io, engine='xlsxwriter') as writer:
-                wb = writer.book
-
-                fmt_center = wb.add_format({'align': 'center', 'valign': 'vcenter'})
-                fmt_left = wb.add_format({'align': 'left', 'valign': 'vcenter'})
-
-                fmt_zebra_group = wb.add_format({'bg_color': '#F2F2F2', 'align': 'center', 'valign': 'vcenter'})
-                fmt_zebra_left = wb.add_format({'bg_color': '#F2F2F2', 'align': 'left', 'valign': 'vcenter'})
-
-                fmt_red_bold = wb.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
-                fmt_red_norm = wb.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006', 'bold': False, 'align': 'center', 'valign': 'vcenter'})
-                fmt_orange_bold = wb.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C5700', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
-                fmt_orange_norm = wb.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C5700', 'bold': False, 'align': 'center', 'valign': 'vcenter'})
-                fmt_blue = wb.add_format({'bg_color': '#C5D9F1', 'font_color': '#1F497D', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
-                fmt_purple = wb.add_format({'bg_color': '#E1BEE7', 'font_color': '#4A148C', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
-                fmt_bold = wb.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter'})
-
-                def apply_conditional(ws, df_curr):
-                    col_idx = {c: i for i, c in enumerate(df_curr.columns)}
-                    nrows = len(df_curr)
-                    if nrows <= 0:
-                        return
-
-                    def cf(colname, rule):
-                        if colname not in col_idx:
-                            return
-                        c = col_idx[colname]
-                        if rule == 'bold':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'formula', 'criteria': '=TRUE', 'format': fmt_bold})
-                        elif rule == 'red_bold':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_red_bold})
-                        elif rule == 'red_norm':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_red_norm})
-                        elif rule == 'orange_bold':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_orange_bold})
-                        elif rule == 'orange_norm':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_orange_norm})
-                        elif rule == 'blue':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_blue})
-                        elif rule == 'purple':
-                            ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_purple})
-
-                    cf('产品编码', 'bold')
-                    cf('SKU名称', 'bold')
-                    cf('建议采购数', 'red_bold')
-                    cf('预计采购总额(RMB)', 'red_norm')
-                    cf('冗余数量', 'orange_bold')
-                    cf('冗余资金', 'orange_norm')
-                    cf('建议调拨数量', 'blue')
-                    cf('本月仓储费(预警)', 'purple')
-
-                def build_table_sheet(sheet_name, df_curr, fixed_width_cols=None, fixed_width=26, hide_cols=None, bold_value_cols=None):
-                    hide_cols = hide_cols or []
-                    fixed_width_cols = fixed_width_cols or []
-                    bold_value_cols = bold_value_cols or []
-
-                    if '产品编码' in df_curr.columns and len(df_curr) > 0:
-                        codes = df_curr['产品编码'].astype(str).fillna('')
-                        gid = (codes.ne(codes.shift()).cumsum() % 2).astype(int)
-                    else:
-                        gid = pd.Series([0] * len(df_curr), dtype=int)
-
-                    df_write = df_curr.copy()
-                    if '产品编码' in df_write.columns and '店铺名称' in df_write.columns:
-                        df_write = blank_repeat_like_merge(df_write, '产品编码', ['店铺名称', '产品编码'])
-
-                    df_write.to_excel(writer, index=False, sheet_name=sheet_name)
-                    ws = writer.sheets[sheet_name]
-
-                    nrows, ncols = len(df_write), len(df_write.columns)
-
-                    columns = [{'header': c} for c in df_write.columns]
-                    if ncols > 0:
-                        last_row = nrows if nrows > 0 else 0
-                        ws.add_table(0, 0, last_row, ncols - 1, {
-                            'columns': columns,
-                            'style': 'Table Style Medium 9',
-                            'autofilter': True if nrows > 0 else False,
-                            'banded_rows': False
-                        })
-
-                    widths = estimate_col_widths(df_write, fixed_col_names=fixed_width_cols, fixed_width=fixed_width)
-                    for i, w in enumerate(widths):
-                        ws.set_column(i, i, w, fmt_center)
-
-                    for colname in ['基础信息', 'SKU名称']:
-                        if colname in df_write.columns:
-                            cidx = list(df_write.columns).index(colname)
-                            ws.set_column(cidx, cidx, widths[cidx], fmt_left)
-
-                    helper_col = ncols
-                    ws.write(0, helper_col, "_gid")
-                    for i in range(nrows):
-                        ws.write(i + 1, helper_col, int(gid.iloc[i]), fmt_center)
-                    ws.set_column(helper_col, helper_col, None, None, {'hidden': True})
-
-                    if nrows > 0 and ncols > 0:
-                        helper_letter = col_to_excel(helper_col)
-                        formula = f'=${helper_letter}2=1'
-                        ws.conditional_format(1, 0, nrows, ncols - 1, {
-                            'type': 'formula',
-                            'criteria': formula,
-                            'format': fmt_zebra_group
-                        })
-                        for colname in ['基础信息', 'SKU名称']:
-                            if colname in df_write.columns:
-                                cidx = list(df_write.columns).index(colname)
-                                ws.conditional_format(1, cidx, nrows, cidx, {
-                                    'type': 'formula',
-                                    'criteria': formula,
-                                    'format': fmt_zebra_left
-                                })
-
-                    # ✅ 指定列“数值加粗”（不影响表头）
-                    if nrows > 0:
-                        col_idx_map = {c: i for i, c in enumerate(df_write.columns)}
-                        for cname in bold_value_cols:
-                            if cname in col_idx_map:
-                                c = col_idx_map[cname]
-                                ws.conditional_format(1, c, nrows, c, {'type': 'formula', 'criteria': '=TRUE', 'format': fmt_bold})
-
-                    for c in hide_cols:
-                        if 0 <= c < ncols:
-                            ws.set_column(c, c, None, None, {'hidden': True})
-
-                    apply_conditional(ws, df_write)
-
-                # sheet1：补货计算表（含在做列 + 30天销量）
-                build_table_sheet('补货计算表', df_sheet1, fixed_width_cols=['基础信息'], fixed_width=26)
-
-                # sheet2：采购单（插入30天销量；并加粗7天/30天两列数值）
-                build_table_sheet(
-                    '采购单(找工厂)',
-                    df_buy_with30,
-                    fixed_width_cols=['基础信息'],
-                    fixed_width=26,
-                    hide_cols=[14, 15, 16, 17, 18, 19],  # 沿用你原来的隐藏列逻辑（基于原sheet2列结构）
-                    bold_value_cols=['7天销量', '30天销量']
-                )
-
-                # sheet3：调拨单（保持原样）
-                build_table_sheet('调拨单(发橙火)', df_trans, fixed_width_cols=['基础信息'], fixed_width=26,
-                                  hide_cols=[12, 13, 14, 15, 16, 17, 19])
-
-                # sheet4：库龄预警单（保持原样）
-                build_table_sheet('库龄预警单(需重入库)', df_fee, fixed_width_cols=['基础信息'], fixed_width=26,
-                                  hide_cols=[11, 12, 13, 14, 15, 16, 17, 18])
-
-            excel_bytes = out_io.getvalue()
-
-            # ==========================================
-            # ZIP打包：Excel + 3个HTML工单
-            # ==========================================
-            stamp = pd.Timestamp.now().strftime('%Y%m%d')
-            excel_name = f"Coupang_Restock_Full_v18_{stamp}.xlsx"
-
-            # 采购工单HTML使用带30天销量版本
-            html_buy = make_work_order_html(df_buy_with30, "采购工单（找工厂）", "范围：建议采购数 > 0")
-            html_trans = make_work_order_html(df_trans, "调拨工单（发橙火）", "范围：建议调拨数量 > 0")
-            html_fee = make_work_order_html(df_fee, "库龄预警工单（需重入库）", "范围：本月仓储费(预警) > 0")
-
-            zip_buf = io.BytesIO()
-            with zipfile.ZipFile(zip_buf, 'w', compression=zipfile.ZIP_DEFLATED) as z:
-                z.writestr(excel_name, excel_bytes)
-                z.writestr(f"WorkOrder_Buy_{stamp}.html", html_buy)
-                z.writestr(f"WorkOrder_Transfer_{stamp}.html", html_trans)
-                z.writestr(f"WorkOrder_Fee_{stamp}.html", html_fee)
-
-            st.download_button(
-                "📦 下载压缩包（Excel + 3个工单HTML）",
-                data=zip_buf.getvalue(),
-                file_name=f"Coupang_Restock_Pack_{stamp}.zip",
-                mime="application/zip",
-                type="primary",
-                use_container_width=True
-            )
-else:
+        # 上传文件在会话线程里读成字节，任务线程不碰 UploadedFile
+        inputs = (as_source(file_master), [as_source(f) for f in files_sales_7d], [as_source(f) for f in files_sales_30d],
+                  [as_source(f) for f in files_inv_r], [as_source(f) for f in files_inv_j])
+        stamp = today_stamp()
+        key = job_key(inputs[0].key(), [[src.key() for src in group] for group in inputs[1:]], tuple(params),
+                      tuple(bp) if bp else None, stamp, with_pdf, profile_memory, profile_code)
+        prof = Profiler(memory=profile_memory, engine='cprofile' if profile_code else None)
+        # 同输入的任务跨会话共享；每个会话登记自己的提交，取消时只撤回本会话的那一份
+        owner = st.session_state.setdefault('job_owner', uuid.uuid4().hex)
+        job = jobs.submit(
+            lambda job, pipeline=get_pipeline(): generate_report(job, pipeline, inputs, params, bp, stamp, with_pdf, prof,
+                                                                 render=key not in jobs.results),
+            key, label=f"{file_master.name} · {sum(len(g) for g in inputs[1:]) + 1} 个文件", owner=owner)
+        if st.query_params.get('job', job.id) != job.id:
+            jobs.cancel(st.query_params['job'], owner)   # 参数连续调整时，本会话还在排队的旧任务不必再跑
+        st.query_params['job'] = job.id
+elif 'job' not in st.query_params:
     st.info("👈 请在左侧上传文件")
+
+job = jobs.get(st.query_params.get('job'))
+if job is None and 'job' in st.query_params:
+    st.warning("⌛ 任务已过期，请重新上传文件生成")
+    del st.query_params['job']
+
+@st.fragment(run_every=1.0)
+def job_progress(job, ready):
+    """只重跑这一小段轮询进度；ready(job) 为真时整页重跑展示结果"""
+    if ready(job):
+        st.rerun()
+    st.progress(job.progress, text=f"{STATUS_TEXT[job.status]} · {job.message or '等待空闲工作线程...'}")
+    st.caption(f"任务 {job.id} · 已用 {job.elapsed_s():.0f} 秒 · 刷新页面不会中断")
+
+if job is not None and job.value is None and job.active:
+    # 只改参数时计算走记忆化，通常很快就能出结果，先等一会儿再退回轮询
+    job.wait(2.0)
+if job is not None and job.value is None:
+    if job.active:
+        job_progress(job, lambda j: j.value is not None or not j.active)
+    else:
+        st.error(job.error)
+elif job is not None:
+    from restock.preview import PAGE_SIZES, PREVIEW_FILTERS, paginate, select_rows, style_page
+    from restock.profiling import Profiler
+    from restock.search import SearchIndex
+
+    res, timings, run_prof = job.value
+    # 任务剖析记录计算/打包；本页的检索/预览另记，每次 rerun 重新计（后台任务占着内存剖析时本页只计时，不等待）
+    prof = Profiler(memory=profile_memory)
+    tables = res.tables
+    df_sheet1 = tables.sheet1
+
+    for info in res.files:
+        if info.get('note'):
+            st.warning(f"⚠️ {info['name']}：{info['note']}")
+    with st.expander(f"📄 已读取文件 ({len(res.files)})"):
+        st.dataframe(table(res.files, FILE_LABELS), use_container_width=True, hide_index=True)
+
+    # ==========================================
+    # ✅ H. 搜索与KPI + 高亮看板（按产品编码分组斑马纹）
+    # 过滤/KPI 直接在数值列上做，中文表头只在展示时套用
+    # ==========================================
+    # 检索索引按计算结果记忆化：改搜索词只查索引，不重算不重读
+    with prof.activate(wait=False):
+        index = get_pipeline().memo('search', res.key, lambda: SearchIndex(df_sheet1))
+        with prof.stage('search_query', rows_in=len(df_sheet1)) as rec:
+            df_display = index.filter(df_sheet1, search_key)
+            rec['rows_out'] = len(df_display)
+
+    (k1_cnt, k1_val), (k2_cnt, k2_val), (k3_cnt, k3_val), (k4_cnt, k4_val) = kpis(df_display)
+
+    st.divider()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("**📦 需采购 SKU / 金额**", f"{k1_cnt} 个", f"¥ {k1_val:,.0f}")
+    m2.metric("**⚠️ 冗余 SKU / 资金**", f"{k2_cnt} 个", f"¥ {k2_val:,.0f}", delta_color="inverse")
+    m3.metric("**🚚 需调拨 SKU / 数量**", f"{k3_cnt} 个", f"{k3_val:,.0f} 件")
+    m4.metric("**🚨 库龄预警 SKU / 总仓储费**", f"{k4_cnt} 个", f"₩ {k4_val:,.0f}", delta_color="inverse")
+
+    # 服务端筛选/排序/分页，只给当前页生成样式（店铺名称/产品编码同一产品只显示一次）
+    hdr = tables.headers
+    sort_labels = {'默认顺序': None, **{hdr[c]: c for c in df_display.columns}}
+    p1, p2, p3, p4 = st.columns([2, 2, 1, 1])
+    filter_label = p1.radio("筛选", list(PREVIEW_FILTERS), horizontal=True)
+    sort_label = p2.selectbox("排序", list(sort_labels))
+    descending = p3.toggle("降序", value=True)
+    page_size = p4.selectbox("每页行数", PAGE_SIZES, index=1)
+
+    with prof.activate(wait=False), prof.stage('preview_select', rows_in=len(df_display)) as rec:
+        df_view = select_rows(df_display, PREVIEW_FILTERS[filter_label], sort_labels[sort_label], not descending)
+        rec['rows_out'] = len(df_view)
+    n_pages = page_count(len(df_view), page_size)
+    page_no = st.number_input(f"页码 (共 {n_pages} 页 · {len(df_view)} 行)", min_value=1, max_value=n_pages,
+                              value=1, step=1)
+    with prof.activate(wait=False), prof.stage('preview_style', rows_in=len(df_view)) as rec:
+        page = paginate(df_view, page_no, page_size)
+        st_df = style_page(page, tables)
+        rec['rows_out'] = len(page.frame)
+
+    st.dataframe(st_df, use_container_width=True, height=600, hide_index=True)
+
+    # 预算采购：水位 / 各店铺分配 / 预算采购单
+    plan = tables.plan
+    if plan is not None:
+        st.subheader("💰 预算采购")
+        b1, b2, b3 = st.columns(3)
+        b1.metric("已分配 / 预算", f"¥ {plan.spent:,.0f}", f"预算 ¥ {plan.budget:,.0f}", delta_color="off")
+        b2.metric("预算采购 SKU", f"{len(plan.frame)} 个", f"需采购 {len(tables.buy)} 个", delta_color="off")
+        b3.metric("覆盖水位", f"{plan.level:.1f} 周", f"目标 {safety_weeks} 周", delta_color="off")
+        st.dataframe(plan.by_shop.rename(columns=SHOP_PLAN_LABELS), use_container_width=True, hide_index=True)
+        with st.expander(f"📋 预算采购单 ({len(plan.frame)})"):
+            st.dataframe(tables.display(plan.frame), use_container_width=True, hide_index=True)
+
+    # ==========================================
+    # ZIP打包：Excel + 3个HTML工单 (+ PDF工单)，预览出来后任务继续在后台打包，存进结果缓存
+    # ==========================================
+    packed = None if job.active else jobs.pack(job)
+    if job.active:
+        job_progress(job, lambda j: not j.active)
+    elif job.error:
+        st.error(job.error)
+    elif packed is None:
+        st.warning("⌛ 压缩包已过期清理，请重新生成")
+    else:
+        with st.expander("⏱️ 产物耗时"):
+            st.dataframe(table(timings, TIMING_LABELS), use_container_width=True, hide_index=True)
+        st.download_button(
+            pack_label(plan is not None, with_pdf),
+            data=packed[1],
+            file_name=packed[0],
+            mime="application/zip",
+            type="primary",
+            use_container_width=True
+        )
+
+    with st.expander(f"📈 性能 (任务 {run_prof.total_s:.2f} 秒 + 本页 {prof.total_s:.2f} 秒)"):
+        st.dataframe(table(run_prof.stages + prof.stages, STAGE_LABELS), use_container_width=True, hide_index=True)
+        if run_prof.files:
+            st.dataframe(table(run_prof.files, FILE_LABELS), use_container_width=True, hide_index=True)
+        st.download_button("⬇️ 导出性能数据 (JSON)", data=run_prof.to_json(),
+                           file_name=f"restock_profile_{today_stamp()}.json", mime="application/json")
+        if run_prof.engine:
+            st.code(run_prof.hot_paths(), language=None)
@@ -0,0 +1,76 @@
+"""Excel 导出基准：Table 模式（按列批量写） vs constant_memory 流式模式，耗时 + Python 峰值内存
+
+用法：python bench/bench_export.py --rows 100000 --repeat 1
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restock.calc import Params  # noqa: E402
+from restock.export import build_excel_bytes  # noqa: E402
+from restock.pipeline import compute_restock  # noqa: E402
+from restock.report import build_report_tables  # noqa: E402
+
+
+def make_tables(rows: int, seed=0):
+    rng = np.random.default_rng(seed)
+    # 每个产品编码 1~4 个 SKU，模拟分组斑马纹
+    codes = np.repeat(np.arange(rows), rng.integers(1, 5, rows))[:rows]
+    df = pd.DataFrame({
+        'Shop': np.where(rng.random(rows) < 0.5, '店铺A', '店铺B'),
+        'Active': np.where(rng.random(rows) < 0.7, 'Y', ''),
+        'Code': pd.Series(codes).map('P{:07d}'.format),
+        'Info_E': pd.Series(rng.integers(0, 10**6, rows)).map('基础信息-{}-规格说明'.format),
+        'Info_F': pd.Series(np.arange(rows)).map('SKU-{}'.format),
+        'Cost': rng.integers(1, 200, rows).astype(float),
+        'Orange_ID': pd.Series(rng.integers(10**9, 10**10, rows)).astype(str),
+        'Inbound_Code': np.where(rng.random(rows) < 0.8, 'IB', ''),
+        'Sales_7d': rng.integers(0, 50, rows).astype(float),
+        'Sales_30d': rng.integers(0, 200, rows).astype(float),
+        'Stock_Orange': rng.integers(0, 120, rows).astype(float),
+        'Stock_Jifeng': rng.integers(0, 80, rows).astype(float),
+        'Storage_Fee': np.where(rng.random(rows) < 0.3, rng.integers(100, 5000, rows), 0).astype(float),
+    })
+    params = Params()
+    return build_report_tables(compute_restock(df, params), params)
+
+def export(tables, constant_memory):
+    show = tables.display
+    return build_excel_bytes(show(tables.sheet1), show(tables.buy_with30), show(tables.trans), show(tables.fee),
+                             constant_memory=constant_memory)
+
+def measure(fn, repeat):
+    best = float('inf')
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', type=int, default=100_000)
+    ap.add_argument('--repeat', type=int, default=1)
+    args = ap.parse_args(argv)
+
+    tables = make_tables(args.rows)
+    for label, cm in (('Table', False), ('constant_memory', True)):
+        t, peak, data = measure(lambda: export(tables, cm), args.repeat)
+        print(f"rows={args.rows}  {label:<16} {t:6.2f} s  峰值 {peak / 2**20:7.1f} MB  文件 {len(data) / 2**20:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
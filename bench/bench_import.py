@@ -0,0 +1,107 @@
+"""导入/启动基准：python -X importtime 统计各入口的冷导入耗时，检查冷路径上是否混入重依赖，
+并（装了 streamlit 时）用 AppTest 测 app.py 首次运行与 rerun 耗时；结果存 JSON 便于逐次对比
+
+用法：python bench/bench_import.py --repeat 5 --out bench/results/import.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块：冷导入各测一次（每次全新子进程）
+TARGETS = ['restock.pipeline', 'restock.dashboard', 'restock.export', 'restock.pdf', 'restock.cli']
+# 只应在对应产物被请求时才加载的重依赖
+HEAVY = ['xlsxwriter', 'openpyxl', 'reportlab', 'matplotlib', 'pyarrow.parquet']
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+_APP_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+t0 = time.perf_counter(); at.run(); first = time.perf_counter() - t0
+reruns = []
+for _ in range({reruns}):
+    t0 = time.perf_counter(); at.run(); reruns.append(time.perf_counter() - t0)
+print(json.dumps({{'first_run_s': first, 'rerun_s': min(reruns),
+                  'heavy_loaded': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def _python(code: str, importtime=False):
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    return subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True)
+
+def import_profile(module: str) -> dict:
+    """一次冷导入：总耗时 (顶层模块累计) + 自身耗时最多的模块 + 已加载的重依赖"""
+    probe = f"import sys, json, {module}; print(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))"
+    t0 = time.perf_counter()
+    proc = _python(probe, importtime=True)
+    wall = time.perf_counter() - t0
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            entries.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3))))
+    total_us = next((cum for name, _, cum, _ in reversed(entries) if name == module), 0)
+    top = sorted(entries, key=lambda e: e[1], reverse=True)[:10]
+    return {
+        'import_ms': total_us / 1000,
+        'process_s': wall,
+        'modules': len(entries),
+        'top_self_ms': [[name, self_us / 1000] for name, self_us, _, _ in top],
+        'heavy_loaded': json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+def app_profile(reruns: int):
+    try:
+        proc = _python(_APP_PROBE.format(app=os.path.join(ROOT, 'app.py'), reruns=reruns, heavy=HEAVY))
+    except subprocess.CalledProcessError as e:
+        return {'error': (e.stderr or '').strip().splitlines()[-1:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--repeat', type=int, default=5, help='每个入口冷导入次数 (取最小值)')
+    ap.add_argument('--reruns', type=int, default=5, help='app rerun 次数 (取最小值)')
+    ap.add_argument('--no-app', action='store_true', help='不测 app.py (未装 streamlit 时自动跳过)')
+    ap.add_argument('--out', default=None, help='结果 JSON 路径')
+    args = ap.parse_args(argv)
+
+    results = {'python': sys.version.split()[0], 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'imports': {}}
+    for module in TARGETS:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r['import_ms'])
+        results['imports'][module] = best
+        heavy = ', '.join(best['heavy_loaded']) or '-'
+        print(f"{module:<20} {best['import_ms']:8.1f} ms  进程 {best['process_s']:.2f}s  "
+              f"{best['modules']:4d} 个模块  重依赖: {heavy}")
+
+    if not args.no_app:
+        try:
+            import streamlit  # noqa: F401
+        except ImportError:
+            print("app.py: 未安装 streamlit，跳过")
+        else:
+            results['app'] = app_profile(args.reruns)
+            app = results['app']
+            if 'error' in app:
+                print(f"app.py: 运行失败 {app['error']}")
+            else:
+                print(f"app.py 首次运行 {app['first_run_s'] * 1000:.0f} ms · rerun {app['rerun_s'] * 1000:.1f} ms · "
+                      f"重依赖: {', '.join(app['heavy_loaded']) or '-'}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果: {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
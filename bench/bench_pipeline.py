@@ -0,0 +1,147 @@
+"""全流程基准：合成 Coupang 输入 (1k~500k SKU × CSV cp949/utf-8 / xlsx) → 各阶段耗时 + 完整 ZIP 生成，结果存 JSON
+
+每个场景每轮都用全新的 Pipeline/ParseCache（冷启动），阶段耗时取各轮中位数；
+另测一次"只改参数"的热重算。生成的数据按 (规模, 格式, 种子) 缓存在 --data-dir 下复用。
+
+用法：
+    python bench/bench_pipeline.py --scenarios 1k 10k 100k --formats csv-cp949 xlsx --repeat 3
+    python bench/bench_pipeline.py --scenarios 10k --compare bench/results/20261017-120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.datagen import FORMATS, SCENARIOS, generate, input_bytes  # noqa: E402
+from restock.cache import ParseCache  # noqa: E402
+from restock.export import render_pack  # noqa: E402
+from restock.ingest import Ingestor  # noqa: E402
+from restock.pipeline import Params, Pipeline  # noqa: E402
+from restock.profiling import Profiler, rss_peak_mb  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'time': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def run_once(inputs: dict, params: Params, workers, with_pdf: bool) -> dict:
+    """冷启动跑一轮：计算各阶段 + ZIP，返回 {stage: 秒}"""
+    pipeline = Pipeline(cache=ParseCache(), ingestor=Ingestor(workers=workers))
+    prof = Profiler()
+    try:
+        with prof.activate():
+            res = pipeline.run(inputs['master'], inputs['sales_7d'], inputs['sales_30d'], inputs['inv_r'],
+                               inputs['inv_j'], params)
+            with prof.stage('zip') as rec:
+                pack = render_pack(res.tables, 'BENCH', ingestor=pipeline.ingestor, with_pdf=with_pdf)
+                rec['rows_out'] = len(pack.zip_bytes)
+        # 热重算：只改参数，只重跑 compute
+        t0 = time.perf_counter()
+        pipeline.run(inputs['master'], inputs['sales_7d'], inputs['sales_30d'], inputs['inv_r'], inputs['inv_j'],
+                     params._replace(safety_weeks=params.safety_weeks + 1))
+        rerun_s = time.perf_counter() - t0
+    finally:
+        pipeline.close()
+
+    stages = {}
+    for rec in prof.stages:
+        stages[rec['stage']] = stages.get(rec['stage'], 0.0) + rec['wall_s']
+    stages['total'] = prof.total_s
+    stages['rerun_params'] = rerun_s
+    return {'stages': stages, 'zip_bytes': len(pack.zip_bytes), 'rows': len(res.df_final),
+            'files': prof.files}
+
+def bench_scenario(name: str, fmt: str, args) -> dict:
+    n_skus = SCENARIOS[name]
+    t0 = time.perf_counter()
+    inputs = generate(os.path.join(args.data_dir, f'{name}-{fmt}-s{args.seed}'), n_skus, fmt, seed=args.seed)
+    gen_s = time.perf_counter() - t0
+    params = Params()
+    runs = [run_once(inputs, params, args.workers, args.pdf) for _ in range(args.repeat)]
+    keys = list(runs[0]['stages'])
+    return {
+        'scenario': name,
+        'n_skus': n_skus,
+        'format': fmt,
+        'input_bytes': input_bytes(inputs),
+        'generate_s': round(gen_s, 3),
+        'repeat': args.repeat,
+        'rows': runs[0]['rows'],
+        'zip_bytes': runs[0]['zip_bytes'],
+        'stages': {k: round(statistics.median(r['stages'].get(k, 0.0) for r in runs), 4) for k in keys},
+        'runs': [{k: round(v, 4) for k, v in r['stages'].items()} for r in runs],
+        'files': runs[-1]['files'],
+        'rss_peak_mb': rss_peak_mb(),
+    }
+
+def _key(r):
+    return r['scenario'], r['format']
+
+def print_result(r, prev=None):
+    print(f"\n== {r['scenario']} ({r['n_skus']} SKU) · {r['format']} · 输入 {r['input_bytes'] / 2**20:.1f} MB · "
+          f"ZIP {r['zip_bytes'] / 2**20:.1f} MB · RSS 峰值 {r['rss_peak_mb']} MB")
+    old = (prev or {}).get('stages', {})
+    for stage, secs in r['stages'].items():
+        delta = ''
+        if old.get(stage):
+            delta = f"  ({(secs - old[stage]) / old[stage]:+.0%} vs {old[stage]:.3f}s)"
+        print(f"  {stage:<16} {secs:8.3f} s{delta}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=['1k', '10k'])
+    ap.add_argument('--formats', nargs='+', choices=FORMATS, default=['csv-cp949'])
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--workers', type=int, default=None, help='解析/渲染进程数 (默认 CPU 核数)')
+    ap.add_argument('--pdf', action='store_true', help='ZIP 中包含 PDF 工单')
+    ap.add_argument('--data-dir', default=os.path.join(HERE, 'data'))
+    ap.add_argument('--out', default=None, help='结果 JSON (默认 bench/results/<时间>.json)')
+    ap.add_argument('--compare', default=None, help='上一次结果 JSON，打印各阶段变化')
+    args = ap.parse_args(argv)
+
+    prev = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            prev = {_key(r): r for r in json.load(f)['results']}
+
+    out = {'env': environment(), 'results': []}
+    for name in args.scenarios:
+        for fmt in args.formats:
+            r = bench_scenario(name, fmt, args)
+            out['results'].append(r)
+            print_result(r, prev.get(_key(r)))
+
+    path = args.out or os.path.join(HERE, 'results', f"{pd.Timestamp.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+    print(f"\n结果: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""合成 Coupang 形态的输入文件：Master / 近7天·近30天销售 / 橙火(火箭仓)库存 / 极风库存
+
+列位置严格按 restock/config.py 的 IDX_* 放置，其余列填占位值；同一 (规模, 格式, 种子) 生成结果完全一致。
+格式：csv-cp949 / csv-utf8 / xlsx（韩文表头 + 韩文品名，cp949 可编码）
+
+用法：python bench/datagen.py --skus 10000 --format csv-cp949 --out bench/data/10k
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restock import config as C  # noqa: E402
+
+SCENARIOS = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '500k': 500_000}
+FORMATS = ('csv-cp949', 'csv-utf8', 'xlsx')
+SHOPS = ['쿠팡A점', '쿠팡B점', '쿠팡C점']
+ID_BASE = 10_000_000
+
+
+def _frame(n: int, width: int, cols: dict, fill: str) -> pd.DataFrame:
+    """width 列的字符串表，cols {列号: 值数组} 放到指定位置，其余列填 fill"""
+    data = {i: cols[i] if i in cols else np.full(n, fill, dtype=object) for i in range(width)}
+    return pd.DataFrame(data)
+
+def _ids(idx: np.ndarray) -> np.ndarray:
+    return (idx + ID_BASE).astype(str).astype(object)
+
+def _inbound(idx: np.ndarray) -> np.ndarray:
+    return np.char.add('IB', np.char.zfill(idx.astype(str), 7)).astype(object)
+
+def master_frame(n: int, rng) -> pd.DataFrame:
+    """每个产品编码 1~4 个 SKU；约 20% 无入库码，Active 混合大小写"""
+    idx = np.arange(n)
+    code = np.repeat(np.arange(n), rng.integers(1, 5, n))[:n]
+    cols = {
+        C.IDX_M_CODE: np.char.add('P', np.char.zfill(code.astype(str), 7)).astype(object),
+        C.IDX_M_SHOP: np.asarray(SHOPS, dtype=object)[np.sort(rng.integers(0, len(SHOPS), n))],
+        C.IDX_M_ORANGE: _ids(idx),
+        C.IDX_M_COL_E: np.char.add('규격-', (idx % 97).astype(str)).astype(object),
+        C.IDX_M_COL_F: np.char.add('상품명 ', idx.astype(str)).astype(object),
+        C.IDX_M_COST: rng.integers(1, 300, n).astype(str).astype(object),
+        C.IDX_M_INBOUND: np.where(rng.random(n) < 0.8, _inbound(idx), ''),
+        C.IDX_M_ACTIVE: rng.choice(np.array(['Y', 'y', '', 'N'], dtype=object), n, p=[0.5, 0.2, 0.2, 0.1]),
+    }
+    return _frame(n, max(C.CFG_MASTER) + 1, cols, '')
+
+def sales_frame(n: int, rng, days: int, key_idx=C.IDX_7D_SKU, qty_idx=C.IDX_7D_QTY) -> pd.DataFrame:
+    """订单明细：同一 SKU 多行，约 1/11 的 ID 带 '.0'（Excel 转存常见）"""
+    rows = n * max(1, days // 7)
+    sku = rng.integers(0, n, rows)
+    ids = _ids(sku)
+    ids[::11] = ids[::11] + '.0'
+    cols = {key_idx: ids, qty_idx: rng.integers(0, 6, rows).astype(str).astype(object)}
+    return _frame(rows, max(key_idx, qty_idx) + 1, cols, '-')
+
+def inv_r_frame(n: int, rng) -> pd.DataFrame:
+    """橙火库存：仓储费带千分位"""
+    idx = rng.permutation(n)
+    fee = rng.integers(0, 8000, n) * (rng.random(n) < 0.3)
+    cols = {
+        C.IDX_INV_R_SKU: _ids(idx),
+        C.IDX_INV_R_QTY: rng.integers(0, 120, n).astype(str).astype(object),
+        C.IDX_INV_R_FEE: pd.Series(fee).map('{:,}'.format).to_numpy(dtype=object),
+    }
+    return _frame(n, max(C.CFG_INV_R) + 1, cols, '-')
+
+def inv_j_frame(n: int, rng) -> pd.DataFrame:
+    idx = rng.permutation(n)
+    cols = {C.IDX_INV_J_BAR: _inbound(idx), C.IDX_INV_J_QTY: rng.integers(0, 80, n).astype(str).astype(object)}
+    return _frame(n, max(C.CFG_INV_J) + 1, cols, '-')
+
+def _headers(width: int, prefix: str) -> list:
+    return [f'{prefix}{i + 1}' for i in range(width)]
+
+def write_frame(df: pd.DataFrame, path_base: str, fmt: str) -> str:
+    """按格式写出，返回文件路径；xlsx 用 constant_memory 逐行写，大规模也不占内存"""
+    headers = _headers(df.shape[1], '항목')
+    if fmt == 'xlsx':
+        path = path_base + '.xlsx'
+        wb = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_numbers': False})
+        ws = wb.add_worksheet()
+        ws.write_row(0, 0, headers)
+        for r, row in enumerate(df.itertuples(index=False, name=None), start=1):
+            ws.write_row(r, 0, row)
+        wb.close()
+        return path
+    path = path_base + '.csv'
+    enc = {'csv-cp949': 'cp949', 'csv-utf8': 'utf-8'}[fmt]
+    df.set_axis(headers, axis=1).to_csv(path, index=False, encoding=enc)
+    return path
+
+def _split(df: pd.DataFrame, parts: int) -> list:
+    bounds = np.linspace(0, len(df), parts + 1).astype(int)
+    return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+def generate(out_dir: str, n_skus: int, fmt: str = 'csv-cp949', sales_files: int = 2, seed: int = 0) -> dict:
+    """生成一套输入，返回 {'master': path, 'sales_7d': [...], 'sales_30d': [...], 'inv_r': [...], 'inv_j': [...]}
+
+    out_dir 下已有同参数的 manifest.json 时直接复用（大规模 xlsx 生成较慢）
+    """
+    manifest = os.path.join(out_dir, 'manifest.json')
+    spec = {'n_skus': n_skus, 'format': fmt, 'sales_files': sales_files, 'seed': seed}
+    if os.path.isfile(manifest):
+        with open(manifest, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved['spec'] == spec and all(os.path.isfile(p) for p in _all_paths(saved['inputs'])):
+            return saved['inputs']
+
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    inputs = {'master': write_frame(master_frame(n_skus, rng), os.path.join(out_dir, 'master'), fmt)}
+    for key, days, cfg in (('sales_7d', 7, C.CFG_7D), ('sales_30d', 30, C.CFG_30D)):
+        parts = _split(sales_frame(n_skus, rng, days, *cfg), sales_files)
+        inputs[key] = [write_frame(p, os.path.join(out_dir, f'{key}_{i + 1}'), fmt) for i, p in enumerate(parts)]
+    inputs['inv_r'] = [write_frame(inv_r_frame(n_skus, rng), os.path.join(out_dir, 'inv_r'), fmt)]
+    inputs['inv_j'] = [write_frame(inv_j_frame(n_skus, rng), os.path.join(out_dir, 'inv_j'), fmt)]
+
+    with open(manifest, 'w', encoding='utf-8') as f:
+        json.dump({'spec': spec, 'inputs': inputs}, f, ensure_ascii=False, indent=2)
+    return inputs
+
+def _all_paths(inputs: dict) -> list:
+    return [inputs['master']] + [p for k, v in inputs.items() if k != 'master' for p in v]
+
+def input_bytes(inputs: dict) -> int:
+    return sum(os.path.getsize(p) for p in _all_paths(inputs))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--skus', type=int, default=10_000)
+    ap.add_argument('--format', choices=FORMATS, default='csv-cp949')
+    ap.add_argument('--sales-files', type=int, default=2, help='每个销售窗口拆成几个文件')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', required=True)
+    args = ap.parse_args(argv)
+    inputs = generate(args.out, args.skus, args.format, args.sales_files, args.seed)
+    for p in _all_paths(inputs):
+        print(f"{os.path.getsize(p) / 2**20:8.1f} MB  {p}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Coupang 智能补货 - 可复用核心模块 (不依赖 Streamlit)"""
@@ -0,0 +1,5 @@
+import sys
+
+from restock.cli import main
+
+sys.exit(main())
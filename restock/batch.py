@@ -0,0 +1,120 @@
+"""多店铺批处理：共享输入只解析/计算一次，按 Master 的店铺列拆出各店报表并一起并行渲染
+
+- 计算本身逐 SKU 独立，全店铺一次 compute 的结果按 Shop 切片即得各店结果
+- 各店全部产物 (Excel / HTML / PDF) 合成一个任务列表交给 Ingestor，跨店铺并行渲染
+- 汇总表：一次 groupby 出各店 SKU 数 / 采购 / 冗余 / 调拨 / 仓储费
+"""
+import io
+import re
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from restock.export import artifact_tasks, assemble_pack, render_all
+from restock.report import build_report_tables
+
+UNASSIGNED_SHOP = '未分配店铺'
+
+SUMMARY_HEADERS = {
+    'Shop': '店铺名称',
+    'SKU': 'SKU数',
+    'Restock_SKU': '需采购SKU',
+    'Restock_Qty': '建议采购数',
+    'Restock_Money': '预计采购总额(RMB)',
+    'Redundancy_SKU': '冗余SKU',
+    'Redundancy_Money': '冗余资金',
+    'Transfer_SKU': '需调拨SKU',
+    'Orange_Transfer_Qty': '建议调拨数量',
+    'Fee_SKU': '库龄预警SKU',
+    'Storage_Fee': '本月仓储费(预警)',
+}
+
+
+class ShopPack(NamedTuple):
+    shop: str
+    folder: str                # 文件系统安全的目录名
+    pack: object               # export.PackResult
+
+
+def shop_folder(shop: str) -> str:
+    name = re.sub(r'[\\/:*?"<>|\s]+', '_', str(shop)).strip('._')
+    return name or UNASSIGNED_SHOP
+
+def shop_folders(shops) -> dict:
+    """{店铺: 目录名}；不同店铺清洗后同名时（不区分大小写，兼容 Windows 解压）后者加 _2、_3 ... 后缀"""
+    out, used = {}, set()
+    for shop in shops:
+        base = name = shop_folder(shop)
+        n = 1
+        while name.casefold() in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name.casefold())
+        out[shop] = name
+    return out
+
+def split_by_shop(df_final: pd.DataFrame, params, plan=None) -> dict:
+    """{店铺: ReportTables}，店铺顺序按 Master 中首次出现；plan (BudgetPlan) 按店铺切成各店的预算采购单"""
+    shops = df_final['Shop'].fillna('').astype(str).replace('', UNASSIGNED_SHOP)
+    out = {shop: build_report_tables(part, params)
+           for shop, part in df_final.groupby(shops.to_numpy(), sort=False)}
+    if plan is not None:
+        for shop, tables in out.items():
+            out[shop] = tables._replace(plan=shop_plan(plan, shop))
+    return out
+
+def shop_plan(plan, shop: str):
+    """全局预算分配结果中某店铺的部分；该店有上限时以上限作为其预算"""
+    name = '' if shop == UNASSIGNED_SHOP else shop
+    rows = plan.by_shop[plan.by_shop['Shop'] == name]
+    frame = plan.frame[plan.frame['Shop'].astype(str).to_numpy() == name]
+    spent = float(rows['Spent'].sum())
+    cap = float(rows['Cap'].iloc[0]) if len(rows) else np.inf
+    return plan._replace(frame=frame, spent=spent, budget=cap if np.isfinite(cap) else plan.budget, by_shop=rows)
+
+def shop_summary(df_final: pd.DataFrame) -> pd.DataFrame:
+    """各店铺 KPI（一次 groupby，内部列名；最后一行为合计）"""
+    df = df_final.assign(
+        Shop=df_final['Shop'].fillna('').astype(str).replace('', UNASSIGNED_SHOP),
+        SKU=1,
+        Restock_SKU=(df_final['Restock_Qty'].to_numpy() > 0).astype(int),
+        Redundancy_SKU=(df_final['Redundancy_Qty'].to_numpy() > 0).astype(int),
+        Transfer_SKU=(df_final['Orange_Transfer_Qty'].to_numpy() > 0).astype(int),
+        Fee_SKU=(df_final['Storage_Fee'].to_numpy() > 0).astype(int),
+        Storage_Fee=np.where(df_final['Storage_Fee'].to_numpy() > 0, df_final['Storage_Fee'].to_numpy(), 0),
+    )
+    cols = [c for c in SUMMARY_HEADERS if c != 'Shop']
+    out = df.groupby('Shop', sort=False)[cols].sum().reset_index()
+    total = out[cols].sum().to_frame().T.assign(Shop='合计')
+    return pd.concat([out, total[out.columns]], ignore_index=True)
+
+def render_shop_packs(tables_by_shop: dict, stamp: str, ingestor=None, constant_memory=False,
+                      with_zip=True, with_pdf=False) -> list:
+    """全部店铺的产物合并为一个任务列表并行渲染，再逐店打包；返回 [ShopPack]"""
+    plan, tasks = [], []
+    for shop, tables in tables_by_shop.items():
+        shop_tasks = artifact_tasks(tables, stamp, constant_memory, with_pdf=with_pdf)
+        plan.append((shop, [name for name, _ in shop_tasks]))
+        tasks.extend(((shop, name), args) for name, args in shop_tasks)
+
+    rendered = render_all(tasks, ingestor)
+    workers = ingestor.workers if ingestor is not None else None
+    folders = shop_folders(shop for shop, _ in plan)
+    packs = []
+    for shop, names in plan:
+        mine = {name: rendered[(shop, name)] for name in names}
+        pack = assemble_pack(names, mine, f"Coupang_Restock_Pack_{folders[shop]}_{stamp}.zip",
+                             workers=workers, with_zip=with_zip)
+        packs.append(ShopPack(shop, folders[shop], pack))
+    return packs
+
+def summary_excel_bytes(summary: pd.DataFrame) -> bytes:
+    """汇总表导出（中文表头）"""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine='xlsxwriter') as writer:
+        summary.rename(columns=SUMMARY_HEADERS).to_excel(writer, index=False, sheet_name='店铺汇总')
+        ws = writer.sheets['店铺汇总']
+        ws.set_column(0, 0, 18)
+        ws.set_column(1, len(SUMMARY_HEADERS) - 1, 14)
+    return buf.getvalue()
@@ -0,0 +1,147 @@
+"""预算采购：在总预算（+ 可选店铺上限 / 起订量）内分配采购数量，尽量拉高各 SKU 的覆盖周数
+
+覆盖周数按安全标准折算：速率 = 总安全库存 / 安全周数，覆盖 = (库存合计 + 采购数) / 速率，
+采购到"建议采购数"即覆盖满安全周数。
+
+分配 = 水位填充：所有 SKU 的覆盖周数一起往上抬到同一水位 L，
+    采购数(L) = clip(ceil(L×速率 − 库存), 0, 建议采购数)，不足起订量的进到起订量；
+花费随 L 单调不减，先按店铺上限各自二分出水位上限，再对总预算二分出全局水位，
+剩余零头按覆盖周数从低到高补下一档。全程数组运算，每次试算 O(SKU数)。
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from restock.report import COLS_EXPORT_BASE
+
+BISECT_ITERS = 60
+
+# 预算采购单：采购单基础列 + 预测/分配结果
+COLS_PLAN = COLS_EXPORT_BASE[:COLS_EXPORT_BASE.index('Restock_Money') + 1] + [
+    'Forecast_Week', 'Cover_Weeks', 'Plan_Qty', 'Plan_Money', 'Plan_Cover_Weeks']
+
+
+class BudgetParams(NamedTuple):
+    budget: float                  # 总预算 (RMB)
+    moq: int = 1                   # 起订量：买就至少买这么多
+    shop_caps: tuple = ()          # ((店铺, 上限), ...)；元组可哈希，直接参与记忆化指纹
+
+
+class BudgetPlan(NamedTuple):
+    frame: pd.DataFrame            # 预算采购单（内部列名，仅 Plan_Qty > 0 的行）
+    level: float                   # 全局覆盖周数水位
+    spent: float
+    budget: float
+    by_shop: pd.DataFrame          # Shop, Cap, Need_Money, Spent, SKU
+
+
+def parse_shop_caps(items) -> tuple:
+    """['店铺A=50000', '店铺B=30000'] / 多行文本 -> (('店铺A', 50000.0), ...)"""
+    if isinstance(items, str):
+        items = items.splitlines()
+    caps = []
+    for item in items or []:
+        item = item.strip()
+        if not item:
+            continue
+        shop, sep, value = item.rpartition('=')
+        if not sep or not shop.strip():
+            raise ValueError(f"店铺上限格式应为 店铺=金额：{item!r}")
+        caps.append((shop.strip(), float(value.replace(',', ''))))
+    return tuple(caps)
+
+def _qty_at(level, rate, stock, need, moq) -> np.ndarray:
+    qty = np.clip(np.ceil(np.round(level * rate - stock, 6)), 0, need)
+    if moq > 1:
+        qty = np.where((qty > 0) & (qty < moq), moq, qty)
+    return qty
+
+def _bisect(cost_at, ok, lo, hi):
+    """对每个分量独立二分：ok(cost_at(mid)) 为真的最大 mid（lo/hi 为等长数组）"""
+    for _ in range(BISECT_ITERS):
+        mid = (lo + hi) / 2
+        good = ok(cost_at(mid))
+        lo = np.where(good, mid, lo)
+        hi = np.where(good, hi, mid)
+    return lo, hi
+
+def allocate(rate, stock, need, cost, shop_codes, budget, caps, moq=1, target=1.0):
+    """返回 (采购数数组, 全局水位)
+
+    rate/stock/need/cost：等长数组；shop_codes：店铺编码 (0..S-1)；caps：各店铺上限 (无上限为 inf)
+    target：水位上限（覆盖满安全周数）
+    """
+    n_shops = len(caps)
+
+    def shop_cost(level_by_row):
+        qty = _qty_at(level_by_row, rate, stock, need, moq)
+        return np.bincount(shop_codes, weights=qty * cost, minlength=n_shops)
+
+    # 1) 各店铺在自己上限内能到的水位
+    lo, hi = np.zeros(n_shops), np.full(n_shops, float(target))
+    full = shop_cost(hi[shop_codes]) <= caps
+    lo, hi = _bisect(lambda lv: shop_cost(lv[shop_codes]), lambda c: c <= caps, lo, hi)
+    shop_top = np.where(full, target, lo)
+    shop_next = np.where(full, target, hi)
+
+    # 2) 总预算下的全局水位（各店铺不超过自己的上限水位）
+    def total_cost(level):
+        return shop_cost(np.minimum(level[0], shop_top)[shop_codes]).sum(keepdims=True)
+
+    top = float(shop_top.max(initial=0.0))
+    if total_cost(np.array([top]))[0] <= budget:
+        level, level_next = top, top
+    else:
+        lo_g, hi_g = _bisect(total_cost, lambda c: c <= budget, np.zeros(1), np.array([top]))
+        level, level_next = float(lo_g[0]), float(hi_g[0])
+
+    qty = _qty_at(np.minimum(level, shop_top)[shop_codes], rate, stock, need, moq)
+
+    # 3) 零头：下一档的增量按当前覆盖周数从低到高依次补，直到总预算/店铺上限用尽
+    nxt = _qty_at(np.minimum(level_next, shop_next)[shop_codes], rate, stock, need, moq)
+    inc = nxt - qty
+    cand = np.flatnonzero(inc > 0)
+    if len(cand):
+        spent_shop = np.bincount(shop_codes, weights=qty * cost, minlength=n_shops)
+        left = budget - spent_shop.sum()
+        order = cand[np.argsort((stock[cand] + qty[cand]) / rate[cand], kind='stable')]
+        inc_cost = inc[order] * cost[order]
+        shop_run = pd.Series(inc_cost).groupby(shop_codes[order]).cumsum().to_numpy()
+        take = (np.cumsum(inc_cost) <= left) & (shop_run <= caps[shop_codes[order]] - spent_shop[shop_codes[order]])
+        qty[order[take]] += inc[order[take]]
+    return qty, level
+
+def plan_budget(df_final: pd.DataFrame, safety_weeks, bp: BudgetParams) -> BudgetPlan:
+    """在需采购行 (Restock_Qty > 0) 上做预算分配"""
+    buy = df_final[df_final['Restock_Qty'].to_numpy() > 0]
+    # 店铺为空 (NaN) 时归到 ''，否则 factorize 得到 -1，bincount 会报错
+    buy = buy.assign(Shop=buy['Shop'].fillna('').astype(str))
+    shops = buy['Shop'].to_numpy()
+    shop_codes, shop_names = pd.factorize(shops)
+    cap_map = dict(bp.shop_caps)
+    caps = np.array([cap_map.get(s, np.inf) for s in shop_names], dtype=float)
+
+    need = buy['Restock_Qty'].to_numpy(dtype=float)
+    stock = buy['Total_Stock'].to_numpy(dtype=float)
+    cost = buy['Cost'].to_numpy(dtype=float)
+    rate = np.maximum(buy['Safety'].to_numpy(dtype=float) / safety_weeks, 1e-9)
+
+    qty, level = allocate(rate, stock, need, cost, shop_codes.astype(np.intp), float(bp.budget), caps,
+                          moq=int(bp.moq), target=float(safety_weeks))
+    qty = qty.astype(np.int64)
+    plan = buy.assign(
+        Cover_Weeks=np.round(stock / rate, 1),
+        Plan_Qty=qty,
+        Plan_Money=qty * cost,
+        Plan_Cover_Weeks=np.round((stock + qty) / rate, 1),
+    )
+    by_shop = pd.DataFrame({
+        'Shop': shop_names,
+        'Cap': caps,
+        'Need_Money': np.bincount(shop_codes, weights=need * cost, minlength=len(shop_names)),
+        'Spent': np.bincount(shop_codes, weights=qty * cost, minlength=len(shop_names)),
+        'SKU': np.bincount(shop_codes, weights=qty > 0, minlength=len(shop_names)).astype(int),
+    })
+    frame = plan.loc[qty > 0, COLS_PLAN]
+    return BudgetPlan(frame, level, float(by_shop['Spent'].sum()), float(bp.budget), by_shop)
@@ -0,0 +1,157 @@
+"""解析结果缓存：按文件内容哈希 + 列号配置缓存解析结果 (列裁剪后的单文件清洗 / 汇总结果)
+
+- 内存层：LRU，按条目数和 DataFrame 占用字节双重限额淘汰
+- 磁盘层（可选）：Parquet，跨会话复用；未安装 pyarrow 时自动关闭
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def content_key(data: bytes, file_name: str, config=()) -> str:
+    """内容哈希 + 扩展名 + 列号配置 -> 缓存键"""
+    h = hashlib.blake2b(data, digest_size=20)
+    ext = os.path.splitext(file_name or '')[1].lower()
+    h.update(ext.encode('utf-8'))
+    h.update(repr(tuple(config)).encode('utf-8'))
+    return h.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, max_entries=128, max_bytes=512 * 1024 * 1024, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._mem = OrderedDict()   # key -> (df, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.disk_dir:
+            try:
+                import pyarrow  # noqa: F401
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except (ImportError, OSError):
+                self.disk_dir = None
+
+    # ---------- 对外接口 ----------
+    def get_or_parse(self, data: bytes, file_name: str, parse_fn, config=()):
+        """命中则返回缓存副本；否则调用 parse_fn() 解析并写入缓存"""
+        key = content_key(data, file_name, config)
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return hit[0].copy()
+
+        df = self._disk_load(key)
+        if df is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            df = parse_fn()
+            with self._lock:
+                self.misses += 1
+            if not df.empty:
+                self._disk_save(key, df)
+
+        if not df.empty:
+            self._put(key, df)
+        return df.copy()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._mem),
+                'mem_mb': round(self._bytes / 1024 / 1024, 1),
+                'hit_rate': round((self.hits + self.disk_hits) / total, 3) if total else 0.0,
+                'disk': bool(self.disk_dir),
+            }
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+        if disk and self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(('.parquet', '.json')):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    # ---------- 内存层 ----------
+    def _put(self, key, df):
+        nbytes = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if nbytes > self.max_bytes:
+                return
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._mem[key] = (df, nbytes)
+            self._bytes += nbytes
+            while self._mem and (len(self._mem) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, b) = self._mem.popitem(last=False)
+                self._bytes -= b
+                self.evictions += 1
+
+    # ---------- 磁盘层 ----------
+    def _disk_paths(self, key):
+        base = os.path.join(self.disk_dir, key)
+        return base + '.parquet', base + '.json'
+
+    def _disk_load(self, key):
+        if not self.disk_dir:
+            return None
+        p_data, p_meta = self._disk_paths(key)
+        if not (os.path.exists(p_data) and os.path.exists(p_meta)):
+            return None
+        try:
+            with open(p_meta, 'r', encoding='utf-8') as f:
+                headers = json.load(f)['columns']
+            df = pd.read_parquet(p_data)
+            df.columns = headers
+            return df
+        except Exception:
+            return None
+
+    def _disk_save(self, key, df):
+        if not self.disk_dir:
+            return
+        p_data, p_meta = self._disk_paths(key)
+        try:
+            # 表头可能重复/非字符串，Parquet 只存位置列名，原表头放旁路 json
+            out = df.copy()
+            out.columns = [str(i) for i in range(out.shape[1])]
+            out.to_parquet(p_data, index=False)
+            with open(p_meta, 'w', encoding='utf-8') as f:
+                json.dump({'columns': [str(c) for c in df.columns]}, f, ensure_ascii=False)
+        except Exception:
+            for p in (p_data, p_meta):
+                if os.path.exists(p):
+                    os.remove(p)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_default_cache() -> ParseCache:
+    """进程级共享缓存（Streamlit 每次 rerun 不会重新导入本模块）；设置 RESTOCK_CACHE_DIR 时落盘为 Parquet"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache(disk_dir=os.environ.get('RESTOCK_CACHE_DIR') or None)
+        return _default_cache
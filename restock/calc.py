@@ -0,0 +1,67 @@
+"""补货/冗余/调拨计算引擎：全部公式为 NumPy 数组运算，不依赖 DataFrame 与逐行 apply"""
+from typing import NamedTuple
+
+import numpy as np
+
+from restock.forecast import Forecast
+
+
+class Params(NamedTuple):
+    safety_weeks: int = 3
+    min_safety_qty: int = 5
+    orange_safety_weeks: int = 2
+    redundancy_weeks: int = 8
+    forecast: str = 'auto'          # 需求预测方法，见 restock.forecast.METHODS
+    forecast_weight: float = 0.5    # blend：近7天日均的权重
+    forecast_alpha: float = 0.3     # ewma：平滑系数
+    service_z: float = 1.0          # 置信带宽度 (σ 的倍数)；0 = 只按预测均值
+
+
+def positive_int(x) -> np.ndarray:
+    """等价于逐元素 int(x) if x > 0 else 0 (正数向零取整)"""
+    x = np.asarray(x)
+    if x.dtype.kind in 'iu':
+        return np.maximum(x, 0).astype(np.int64)
+    return np.trunc(np.where(x > 0, x, 0)).astype(np.int64)
+
+def restock_arrays(fc: Forecast, stock_orange, stock_jifeng, cost, active, has_inbound,
+                   safety_weeks, min_safety_qty, orange_safety_weeks, redundancy_weeks, service_z=0.0) -> dict:
+    """纯函数：输入周预测 + 等长数组 + 参数，返回各结果列 (顺序与导出表一致)
+
+    active / has_inbound 为布尔数组：在做(Y) / 有入库码
+    各"N周"标准 = 预测均值×N + service_z×σ×√N，向上取整到件（flat 预测时即原 7天销量×N，不取整）
+    """
+    stock_orange = np.asarray(stock_orange)
+    cost = np.asarray(cost)
+    active = np.asarray(active, dtype=bool)
+
+    total_stock = stock_orange + np.asarray(stock_jifeng)
+    safety_calc = fc.horizon(safety_weeks, service_z)
+    # 保底：仅对【在做】且【有入库码】的产品生效
+    safety = np.where(active & np.asarray(has_inbound, dtype=bool), np.maximum(safety_calc, min_safety_qty), safety_calc)
+    redundancy_std = fc.horizon(redundancy_weeks, service_z)
+
+    restock_qty = np.where(active, positive_int(safety - total_stock), 0)
+    redundancy_qty = positive_int(total_stock - redundancy_std)
+
+    # ✅ 调拨：不计算保底库存
+    orange_safety_calc = fc.horizon(orange_safety_weeks, service_z)
+    orange_transfer_qty = positive_int(orange_safety_calc - stock_orange)
+
+    lo, hi = fc.band(service_z)
+    return {
+        'Forecast_Week': np.round(fc.weekly, 1),
+        'Forecast_Lo': np.round(lo, 1),
+        'Forecast_Hi': np.round(hi, 1),
+        'Total_Stock': total_stock,
+        'Safety_Calc': safety_calc,
+        'Safety': safety,
+        'Redundancy_Std': redundancy_std,
+        'Restock_Qty': restock_qty,
+        'Restock_Money': restock_qty * cost,
+        'Redundancy_Qty': redundancy_qty,
+        'Redundancy_Money': redundancy_qty * cost,
+        'Orange_Safety_Calc': orange_safety_calc,
+        'Orange_Safety_Std': orange_safety_calc,  # 不做 max(..., min_safety_qty)
+        'Orange_Transfer_Qty': orange_transfer_qty,
+    }
@@ -0,0 +1,271 @@
+"""命令行/批处理入口：不依赖 Streamlit，生成与网页端相同的 Excel + HTML/PDF工单 + ZIP
+
+用法示例：
+    python -m restock --master master.xlsx --sales-7d "sales7d/*.csv" --sales-30d "sales30d/*.csv" \\
+        --inv-r "rocket/*.xlsx" --inv-j "jifeng/*.xlsx" --out out/shopA --safety-weeks 3
+
+    # 历史库模式：每天只导入当天的日销量/库存快照，7/30天窗口从历史库滚动求和
+    python -m restock --master master.xlsx --history store/ --day 2026-10-17 --sales-day daily.csv \
+        --inv-r "rocket/*.xlsx" --inv-j "jifeng/*.xlsx" --out out/shopA
+"""
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from restock.batch import UNASSIGNED_SHOP, ShopPack, render_shop_packs, shop_summary, split_by_shop, summary_excel_bytes
+from restock.budget import BudgetParams, parse_shop_caps
+from restock.cache import ParseCache
+from restock.export import render_pack
+from restock.fonts import FONT_CANDIDATES, font_hint, missing_fonts
+from restock.forecast import METHODS
+from restock.history import HistoryStore, as_day
+from restock.ingest import Ingestor
+from restock.pipeline import Params, Pipeline, PipelineError
+from restock.profiling import Profiler
+
+
+def expand_paths(patterns):
+    """展开路径/通配符，保持参数顺序、去重"""
+    out = []
+    for pat in patterns or []:
+        matches = sorted(glob.glob(pat)) if glob.has_magic(pat) else [pat]
+        for p in matches:
+            if p not in out:
+                out.append(p)
+    return out
+
+def build_parser():
+    defaults = Params()
+    ap = argparse.ArgumentParser(prog='python -m restock', description='Coupang 智能补货 - 命令行批处理')
+    ap.add_argument('--master', required=True, help='基础信息表 (Master)')
+    ap.add_argument('--sales-7d', nargs='+', default=[], help='销售表 (近7天)，可多个路径/通配符')
+    ap.add_argument('--sales-30d', nargs='+', default=[], help='销售表 (近30天)，可多个路径/通配符')
+    ap.add_argument('--inv-r', nargs='+', default=[], help='橙火/火箭仓库存，可多个路径/通配符')
+    ap.add_argument('--inv-j', nargs='+', default=[], help='极风库存，可多个路径/通配符')
+    ap.add_argument('--history', default=None, help='历史库目录：按天存销量/库存，窗口销量从库中滚动求和')
+    ap.add_argument('--day', default=None, help='历史库模式的业务日期 YYYY-MM-DD (默认今天)')
+    ap.add_argument('--sales-day', nargs='+', default=[], help='历史库模式：当天的日销量表 (与近7天表同列结构)')
+    ap.add_argument('--windows', nargs=2, type=int, default=[7, 30], metavar=('N1', 'N2'),
+                    help='历史库模式的两个销量窗口天数 (默认 7 30)：N1 代替近7天销量、N2 代替近30天销量；'
+                         'ewma 的逐日销量取较长的窗口')
+    ap.add_argument('--safety-weeks', type=int, default=defaults.safety_weeks, help='安全周数 (倍数)')
+    ap.add_argument('--min-safety-qty', type=int, default=defaults.min_safety_qty, help='最低库存基数 (保底)')
+    ap.add_argument('--orange-safety-weeks', type=int, default=defaults.orange_safety_weeks, help='橙火安全周数')
+    ap.add_argument('--redundancy-weeks', type=int, default=defaults.redundancy_weeks, help='库存冗余周数')
+    ap.add_argument('--forecast', choices=METHODS, default=defaults.forecast,
+                    help='需求预测：auto(有逐日历史用ewma) / blend(7天30天混合) / ewma / flat(仅7天销量，旧算法)')
+    ap.add_argument('--forecast-weight', type=float, default=defaults.forecast_weight, help='blend：近7天权重 (0~1)')
+    ap.add_argument('--forecast-alpha', type=float, default=defaults.forecast_alpha, help='ewma：平滑系数 (0~1)')
+    ap.add_argument('--service-z', type=float, default=defaults.service_z,
+                    help='置信带宽度 (σ倍数)，用于安全库存/冗余标准/橙火安全库存；0=只按预测均值')
+    ap.add_argument('--budget', type=float, default=None,
+                    help='预算采购模式：总预算 (RMB)，在预算内按覆盖周数水位分配采购数，另出预算采购单/工单')
+    ap.add_argument('--moq', type=int, default=1, help='预算模式：起订量 (买则至少买这么多)')
+    ap.add_argument('--shop-cap', nargs='+', default=[], metavar='店铺=金额', help='预算模式：店铺采购上限')
+    ap.add_argument('--out', default='.', help='输出目录 (默认当前目录)')
+    ap.add_argument('--stamp', default=None, help='文件名日期戳 (默认 --day 或今天，YYYYMMDD)')
+    zip_mode = ap.add_mutually_exclusive_group()
+    zip_mode.add_argument('--no-zip', action='store_true', help='只写 Excel/HTML，不打 ZIP')
+    zip_mode.add_argument('--zip-only', action='store_true', help='只写 ZIP')
+    ap.add_argument('--xlsx-streaming', action='store_true',
+                    help='Excel 逐行流式写出 (constant_memory，大数据量省内存；无 Table 样式，改为表头+筛选)')
+    ap.add_argument('--by-shop', action='store_true',
+                    help='多店铺批处理：按 Master 店铺列拆分，每店一个子目录 (Excel/工单/ZIP)，另出店铺汇总表')
+    ap.add_argument('--pdf', action='store_true', help='同时生成离线 PDF 工单 (采购/调拨/库龄预警)')
+    ap.add_argument('--font', default=None, metavar='TTF',
+                    help='PDF 中文字体 (.ttf/.ttc，嵌入 PDF)；未给 --font-ko 时韩文也用它')
+    ap.add_argument('--font-ko', default=None, metavar='TTF', help='PDF 韩文字体 (.ttf/.ttc)')
+    ap.add_argument('--workers', type=int, default=None, help='并行解析进程数 (默认 CPU 核数，1=串行)')
+    ap.add_argument('--quiet', action='store_true', help='不输出逐文件解析进度')
+    ap.add_argument('--profile', action='store_true', help='输出各阶段耗时/行数/内存峰值 (含 tracemalloc)')
+    ap.add_argument('--profile-json', default=None, metavar='PATH', help='性能数据写入 JSON 文件')
+    ap.add_argument('--cprofile', default=None, metavar='PATH',
+                    help='函数级剖析写入 .prof (cProfile；装了 pyinstrument 且以 .html 结尾时用 pyinstrument)')
+    ap.add_argument('--cache-dir', default=os.environ.get('RESTOCK_CACHE_DIR'), help='解析缓存目录 (Parquet)')
+    return ap
+
+def run_history(pipeline, args, inputs, params, progress):
+    """历史库模式：先把当天文件写入历史库（只写这一天），再按窗口滚动求和计算"""
+    store = HistoryStore(args.history)
+    day = as_day(args.day)
+    added = pipeline.ingest_day(store, day, inputs['sales_day'], inputs['inv_r'], inputs['inv_j'], progress=progress)
+    if not args.quiet:
+        for kind, n in added.items():
+            print(f"  入库 {kind:<6} {day.isoformat()} · {n} SKU", file=sys.stderr)
+        for n in args.windows:
+            gaps = store.missing_days('sales', day, n)
+            if gaps:
+                print(f"  ⚠️ 近{n}天缺 {len(gaps)} 天日销量: {', '.join(d.isoformat() for d in gaps[:5])}"
+                      f"{' …' if len(gaps) > 5 else ''}", file=sys.stderr)
+    return pipeline.run_history(args.master, store, day, params, windows=tuple(args.windows), progress=progress)
+
+def write_pack(out_dir, pack, args) -> list:
+    """把一个 PackResult 写到 out_dir，返回写出的路径"""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    if not args.zip_only:
+        for name, data in pack.artifacts.items():
+            path = os.path.join(out_dir, name)
+            with open(path, 'wb') as f:
+                f.write(data)
+            written.append(path)
+    if not args.no_zip:
+        path = os.path.join(out_dir, pack.zip_name)
+        with open(path, 'wb') as f:
+            f.write(pack.zip_bytes)
+        written.append(path)
+    return written
+
+def run_packs(pipeline, args, inputs, params, stamp, progress, prof):
+    """计算 + 渲染打包；返回 (RunResult, [ShopPack])"""
+    if args.history:
+        res = run_history(pipeline, args, inputs, params, progress)
+    else:
+        res = pipeline.run(args.master, inputs['sales_7d'], inputs['sales_30d'], inputs['inv_r'], inputs['inv_j'],
+                           params, progress=progress)
+    if args.budget is not None:
+        res = pipeline.plan_budget(res, params, BudgetParams(args.budget, args.moq, parse_shop_caps(args.shop_cap)))
+    with prof.stage('render', rows_in=len(res.df_final)):
+        if args.by_shop:
+            tables_by_shop = split_by_shop(res.df_final, params, res.tables.plan)
+            packs = render_shop_packs(tables_by_shop, stamp, ingestor=pipeline.ingestor,
+                                      constant_memory=args.xlsx_streaming, with_zip=not args.no_zip,
+                                      with_pdf=args.pdf)
+        else:
+            packs = [ShopPack('', '', render_pack(res.tables, stamp, constant_memory=args.xlsx_streaming,
+                                                  ingestor=pipeline.ingestor, with_zip=not args.no_zip,
+                                                  with_pdf=args.pdf))]
+    for item in packs:
+        for t in item.pack.timings:
+            prof.add_stage(f"render:{os.path.join(item.folder, t['name'])}", t['render_s'], bytes=t['bytes'])
+    return res, packs
+
+def print_profile(prof):
+    """阶段耗时表 (stderr)"""
+    print(f"  ⏱️ 总耗时 {prof.total_s:.2f}s", file=sys.stderr)
+    for rec in prof.stages:
+        rows = f"{rec.get('rows_in') or '':>8} -> {rec.get('rows_out') or '':<8}"
+        mem = f"py {rec['py_peak_mb']:7.1f} MB" if rec.get('py_peak_mb') is not None else ''
+        print(f"  {rec['wall_s']:8.3f}s {'缓存' if rec.get('cached') else '    '} {rows} {mem:<14} {rec['stage']}",
+              file=sys.stderr)
+    for info in prof.files:
+        parse = '缓存' if info['cached'] else f"{info['parse_s']:.3f}s"
+        print(f"  解析 {parse:>8}  {info['group']:<6} {info['encoding']:<10} {info['name']}", file=sys.stderr)
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.history:
+        if args.sales_7d or args.sales_30d:
+            ap.error('历史库模式下销量来自历史库，请用 --sales-day 导入当天日销量')
+    elif not args.sales_7d or not args.sales_30d:
+        ap.error('需要 --sales-7d 和 --sales-30d (或使用 --history 历史库模式)')
+    try:
+        parse_shop_caps(args.shop_cap)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.day is not None:
+        try:
+            as_day(args.day)
+        except ValueError:
+            ap.error(f'--day 日期格式应为 YYYY-MM-DD：{args.day}')
+
+    inputs = {
+        'sales_7d': expand_paths(args.sales_7d),
+        'sales_30d': expand_paths(args.sales_30d),
+        'sales_day': expand_paths(args.sales_day),
+        'inv_r': expand_paths(args.inv_r),
+        'inv_j': expand_paths(args.inv_j),
+    }
+    fonts = [p for p in (args.font, args.font_ko) if p and args.pdf]
+    missing = [p for p in [args.master] + sum(inputs.values(), []) + fonts if not os.path.isfile(p)]
+    if missing:
+        print(f"❌ 找不到文件: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    if args.pdf:
+        # 写进环境变量：渲染子进程 (spawn) 启动时继承
+        if args.font:
+            os.environ[FONT_CANDIDATES['zh'][0]] = args.font
+        if args.font_ko or args.font:
+            os.environ[FONT_CANDIDATES['ko'][0]] = args.font_ko or args.font
+        missing = missing_fonts()
+        if missing:
+            print(f"❌ {font_hint(missing)}", file=sys.stderr)
+            return 2
+
+    params = Params(args.safety_weeks, args.min_safety_qty, args.orange_safety_weeks, args.redundancy_weeks,
+                    args.forecast, args.forecast_weight, args.forecast_alpha, args.service_z)
+    pipeline = Pipeline(cache=ParseCache(disk_dir=args.cache_dir), ingestor=Ingestor(workers=args.workers))
+
+    def on_parsed(done, total, name):
+        if not args.quiet:
+            print(f"[{done}/{total}] {name}", file=sys.stderr)
+
+    # 补跑某天 (--day) 时文件名用那一天，不覆盖今天的产物
+    stamp = args.stamp or (as_day(args.day) if args.day else pd.Timestamp.now()).strftime('%Y%m%d')
+    engine = None
+    if args.cprofile:
+        engine = 'pyinstrument' if args.cprofile.endswith('.html') else 'cprofile'
+    prof = Profiler(memory=args.profile, engine=engine)
+    try:
+        with prof.activate():
+            res, packs = run_packs(pipeline, args, inputs, params, stamp, on_parsed, prof)
+    except PipelineError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        pipeline.close()
+
+    written = []
+    for item in packs:
+        written += write_pack(os.path.join(args.out, item.folder), item.pack, args)
+    if args.by_shop:
+        summary = shop_summary(res.df_final)
+        path = os.path.join(args.out, f"Restock_Summary_{stamp}.xlsx")
+        with open(path, 'wb') as f:
+            f.write(summary_excel_bytes(summary))
+        written.append(path)
+
+    for info in res.files:
+        if info.get('note'):
+            print(f"⚠️ {info['name']}：{info['note']}", file=sys.stderr)
+    if not args.quiet:
+        for info in res.files:
+            print(f"  {info['group']:<6} {info['encoding']:<10} {info['name']}", file=sys.stderr)
+        for item in packs:
+            for t in item.pack.timings:
+                print(f"  渲染 {t['render_s']:6.2f}s  压缩 {t['compress_s']:5.2f}s  "
+                      f"{t['bytes'] / 2**20:6.1f} MB -> {t['zip_bytes'] / 2**20:5.1f} MB  "
+                      f"{os.path.join(item.folder, t['name'])}", file=sys.stderr)
+
+    if args.profile:
+        print_profile(prof)
+    if args.profile_json:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            f.write(prof.to_json())
+        written.append(args.profile_json)
+    if args.cprofile:
+        prof.dump_stats(args.cprofile)
+        written.append(args.cprofile)
+
+    t = res.tables
+    print(f"✅ SKU {len(t.sheet1)} · 需采购 {len(t.buy)} · 需调拨 {len(t.trans)} · 库龄预警 {len(t.fee)}")
+    if t.plan is not None:
+        print(f"💰 预算 ¥ {t.plan.budget:,.0f} · 已分配 ¥ {t.plan.spent:,.0f} · 覆盖水位 {t.plan.level:.2f} 周 · "
+              f"预算采购 {len(t.plan.frame)} SKU")
+        for row in t.plan.by_shop.itertuples(index=False):
+            cap = f"上限 ¥ {row.Cap:,.0f}" if np.isfinite(row.Cap) else "无上限"
+            print(f"   {row.Shop or UNASSIGNED_SHOP}: {cap} · 已分配 ¥ {row.Spent:,.0f} / 需求 ¥ {row.Need_Money:,.0f} · "
+                  f"{row.SKU} SKU")
+    if args.by_shop:
+        for row in summary.itertuples(index=False):
+            print(f"   {row.Shop}: SKU {row.SKU} · 需采购 {row.Restock_SKU} (¥ {row.Restock_Money:,.0f}) · "
+                  f"需调拨 {row.Transfer_SKU} · 库龄预警 {row.Fee_SKU}")
+    for p in written:
+        print(p)
+    return 0
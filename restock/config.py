@@ -0,0 +1,40 @@
+"""列号配置 (请确认 Excel 实际位置)
+
+A=0, B=1, C=2, D=3, E=4, F=5, G=6 ... M=12, N=13 ... R=17
+
+流水线优先按表头名定位列 (restock.schema)，这里的列号是表头认不出时的默认位置
+"""
+
+# --- 1. 基础信息表 (Master) ---
+IDX_M_CODE    = 0    # A列: 产品编码
+IDX_M_SHOP    = 1    # B列: 店铺
+IDX_M_COL_E   = 4    # E列: 基础信息E
+IDX_M_COL_F   = 5    # F列: SKU名称
+IDX_M_COST    = 6    # G列: 采购单价
+IDX_M_ORANGE  = 3    # D列: 橙火ID
+IDX_M_INBOUND = 12   # M列: 入库码
+IDX_M_ACTIVE  = 13   # N列: 是否在做 (有Y=在做，大小写容错)
+
+# --- 2.1 销售表 (近7天) ---
+IDX_7D_SKU    = 0    # A列: SKU/ID
+IDX_7D_QTY    = 8    # I列: 销售数量
+
+# --- 2.2 销售表 (近30天) ---
+IDX_30D_SKU   = 0    # A列: SKU/ID
+IDX_30D_QTY   = 8    # I列: 销售数量
+
+# --- 3. 火箭仓/橙火库存表 ---
+IDX_INV_R_SKU = 2    # C列: SKU/ID
+IDX_INV_R_QTY = 7    # H列: 数量
+IDX_INV_R_FEE = 17   # R列: 本月仓储费
+
+# --- 4. 极风库存表 ---
+IDX_INV_J_BAR = 2    # C列: 条码/入库码
+IDX_INV_J_QTY = 10   # K列: 数量
+
+# 各来源用到的默认列号（bench/datagen 按此生成合成数据）
+CFG_MASTER = (IDX_M_CODE, IDX_M_SHOP, IDX_M_COL_E, IDX_M_COL_F, IDX_M_COST, IDX_M_ORANGE, IDX_M_INBOUND, IDX_M_ACTIVE)
+CFG_7D = (IDX_7D_SKU, IDX_7D_QTY)
+CFG_30D = (IDX_30D_SKU, IDX_30D_QTY)
+CFG_INV_R = (IDX_INV_R_SKU, IDX_INV_R_QTY, IDX_INV_R_FEE)
+CFG_INV_J = (IDX_INV_J_BAR, IDX_INV_J_QTY)
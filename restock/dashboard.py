@@ -0,0 +1,56 @@
+"""看板辅助（不依赖 Streamlit）：表头映射 / KPI / 标签等常量与纯函数
+
+放在包里而不是 app.py：Streamlit 每次 rerun 都从头执行 app.py，
+而已导入的模块留在 sys.modules 中，这里的常量和函数只在进程里构建一次。
+"""
+import time
+
+import pandas as pd
+
+FORECAST_LABELS = {
+    '自动 (有逐日历史用EWMA)': 'auto',
+    '7天/30天加权混合': 'blend',
+    '逐日EWMA': 'ewma',
+    '仅7天销量 (旧算法)': 'flat',
+}
+
+FILE_LABELS = {'group': '类别', 'name': '文件名', 'encoding': '编码', 'bytes': '字节数',
+               'parse_s': '解析(秒)', 'cached': '命中缓存', 'note': '提示'}
+TIMING_LABELS = {'name': '文件名', 'render_s': '渲染(秒)', 'compress_s': '压缩(秒)',
+                 'bytes': '原始字节', 'zip_bytes': '压缩后字节'}
+STAGE_LABELS = {'stage': '阶段', 'wall_s': '耗时(秒)', 'rows_in': '输入行数', 'rows_out': '输出行数',
+                'cached': '命中缓存', 'py_peak_mb': 'Python峰值(MB)', 'rss_peak_mb': '进程峰值(MB)', 'bytes': '字节数'}
+JOB_LABELS = {'id': '任务ID', 'label': '输入', 'status': '状态', 'progress': '进度(%)', 'message': '说明',
+              'created': '提交时间', 'elapsed_s': '耗时(秒)'}
+SHOP_PLAN_LABELS = {'Shop': '店铺名称', 'Cap': '上限', 'Need_Money': '需求金额', 'Spent': '已分配', 'SKU': 'SKU数'}
+
+# KPI：(判定列, 求和列)，只统计判定列 > 0 的行
+KPI_SPECS = [
+    ('Restock_Qty', 'Restock_Money'),
+    ('Redundancy_Qty', 'Redundancy_Money'),
+    ('Orange_Transfer_Qty', 'Orange_Transfer_Qty'),
+    ('Storage_Fee', 'Storage_Fee'),
+]
+
+
+def table(records, labels: dict) -> pd.DataFrame:
+    """记录列表 -> 中文表头 DataFrame（展示用）"""
+    return pd.DataFrame(records).rename(columns=labels)
+
+def kpis(df: pd.DataFrame) -> list:
+    """[(SKU数, 合计)]，顺序同 KPI_SPECS"""
+    out = []
+    for mask_col, sum_col in KPI_SPECS:
+        mask = df[mask_col].to_numpy() > 0
+        out.append((int(mask.sum()), float(df[sum_col].to_numpy()[mask].sum())))
+    return out
+
+def today_stamp() -> str:
+    return time.strftime('%Y%m%d')
+
+def pack_label(with_plan: bool, with_pdf: bool) -> str:
+    n = 4 if with_plan else 3
+    return f"📦 下载压缩包（Excel + {n}个工单HTML" + (" + PDF）" if with_pdf else "）")
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, -(-n_rows // page_size))
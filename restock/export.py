@@ -0,0 +1,523 @@
+"""渲染阶段：Excel(Table + 按产品编码分组斑马纹) / A4 HTML 工单 / PDF 工单 (restock.pdf) / ZIP 打包（产物可并行渲染、条目并行压缩）"""
+import html
+import io
+import string
+import struct
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from restock.ingest import default_workers
+
+
+def group_starts(codes) -> np.ndarray:
+    """每行是否为新产品编码分组的首行（与上一行编码不同）"""
+    codes = np.asarray(pd.Series(codes).fillna('').astype(str).to_numpy(), dtype=object)
+    first = np.ones(len(codes), dtype=bool)
+    if len(codes) > 1:
+        first[1:] = codes[1:] != codes[:-1]
+    return first
+
+def group_zebra(first: np.ndarray) -> np.ndarray:
+    """由分组首行标记得到 0/1 交替的斑马纹分组号"""
+    return (np.cumsum(first) % 2).astype(np.int8)
+
+def blank_repeat_like_merge(df: pd.DataFrame, group_col: str, cols_to_blank: list, first=None):
+    """让指定列在同一group内重复行置空，达到“视觉合并”效果（兼容Excel Table）"""
+    if group_col not in df.columns:
+        return df.copy()
+    if first is None:
+        first = group_starts(df[group_col])
+    return df.assign(**{c: df[c].where(first, '') for c in cols_to_blank if c in df.columns})
+
+def estimate_col_widths(df: pd.DataFrame, fixed_col_names=None, fixed_width=26,
+                        min_w=6, max_w=22, header_pad=2, cell_pad=2, sample_rows=200_000):
+    """xlsxwriter无真正autofit，用字符长度估算列宽（按去重值向量化计算，超大列等距抽样）"""
+    fixed_col_names = set(fixed_col_names or [])
+    widths = []
+    for col in df.columns:
+        if col in fixed_col_names:
+            widths.append(fixed_width)
+            continue
+        best = len(str(col)) + header_pad
+        ser = df[col].dropna()
+        if len(ser) > sample_rows:
+            ser = ser.iloc[::len(ser) // sample_rows + 1]
+        if len(ser) > 0:
+            lens = pd.Series(ser.unique()).astype(str).str.len()
+            best = max(best, int(lens.max()) + cell_pad)
+        best = max(min_w, min(max_w, best))
+        widths.append(best)
+    return widths
+
+def column_values(ser: pd.Series) -> list:
+    """转成 xlsxwriter 可直接写入的 Python 值列表，缺失值写空单元格"""
+    if ser.hasnans:
+        ser = ser.astype(object).where(ser.notna(), None)
+    return ser.tolist()
+
+def col_to_excel(col_idx: int) -> str:
+    """0->A, 1->B ..."""
+    n = col_idx + 1
+    s = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+HTML_CHUNK_ROWS = 2_000           # 流式渲染每块行数
+WORK_ORDER_MAX_ROWS = 20_000      # 单份工单最多行数，超过则按产品分组拆成多份 A4 文档
+
+_HTML_HEAD = """<!doctype html>
+<html lang="zh">
+<head>
+  <meta charset="utf-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+  <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;600&family=Noto+Sans+KR:wght@400;600&display=swap" rel="stylesheet">
+  <title>$title</title>
+  <style>
+    :root {
+      --fg:#111; --muted:#555; --line:#d8d8d8; --head:#3f3f3f; --zebra:#f1f1f1; --white:#fff;
+    }
+    html,body {
+      margin:0; padding:0; background:var(--white); color:var(--fg);
+      font-family:"Noto Sans SC","Noto Sans KR",system-ui,-apple-system,"Segoe UI",Arial,sans-serif;
+      -webkit-print-color-adjust:exact; print-color-adjust:exact;
+    }
+    .page { width:210mm; margin:0 auto; padding:14mm 12mm; box-sizing:border-box; }
+    .header {
+      display:flex; justify-content:space-between; align-items:flex-end;
+      border-bottom:2px solid var(--line); padding-bottom:10px; margin-bottom:12px; gap:12px;
+    }
+    .title { font-size:18px; font-weight:600; margin:0; }
+    .sub { margin:6px 0 0 0; font-size:12px; color:var(--muted); }
+    .meta { font-size:12px; color:var(--muted); text-align:right; white-space:nowrap; }
+    table { width:100%; border-collapse:collapse; font-size:11px; }
+    th {
+      background:var(--head); color:#fff; padding:8px 6px; border:1px solid var(--line);
+      text-align:center; font-weight:600;
+    }
+    td { border:1px solid var(--line); padding:6px 6px; vertical-align:middle; word-break:break-word; }
+    .td-center { text-align:center; }
+    .td-left { text-align:left; }
+    tr.z1 td { background:var(--zebra); }
+    @media print {
+      thead { display:table-header-group; }
+      tr { page-break-inside:avoid; }
+      .page { padding:10mm 10mm; }
+    }
+  </style>
+</head>
+<body>
+  <div class="page">
+    <div class="header">
+      <div>
+        <h1 class="title">$title</h1>
+        <div class="sub">$subtitle</div>
+      </div>
+      <div class="meta">
+        生成日期：$today<br/>
+        打印：A4 / 黑白灰
+      </div>
+    </div>
+    <table>"""
+_HTML_TAIL = """</tbody></table>
+  </div>
+</body>
+</html>
+"""
+
+
+def escape_html(ser: pd.Series) -> pd.Series:
+    """向量化转义单元格文本（& < >）"""
+    if not ser.str.contains(r'[&<>]', regex=True).any():
+        return ser
+    return ser.str.replace('&', '&amp;', regex=False).str.replace('<', '&lt;', regex=False).str.replace('>', '&gt;', regex=False)
+
+def _html_rows(df: pd.DataFrame, gid: np.ndarray, left_cols: set) -> str:
+    """整块行按列拼接成 <tr>…</tr> 字符串（对象数组逐列相加，无逐行 iloc）"""
+    rows = np.where(gid == 1, '<tr class="z1">', '<tr class="z0">').astype(object)
+    for col in df.columns:
+        cls = "td-left" if col in left_cols else "td-center"
+        cells = escape_html(df[col].fillna('').astype(str)).to_numpy(dtype=object)
+        rows = rows + f'<td class="{cls}">' + cells + '</td>'
+    return ''.join(rows + '</tr>')
+
+def iter_work_order_html(df: pd.DataFrame, title: str, subtitle: str, chunk_rows=HTML_CHUNK_ROWS):
+    """按块产出 HTML 文本（A4灰白可打印，在线加载Noto字体；斑马纹按产品编码分组）"""
+    if '产品编码' in df.columns and len(df) > 0:
+        gid = group_zebra(group_starts(df['产品编码']))
+    else:
+        gid = np.zeros(len(df), dtype=np.int8)
+
+    left_cols = set([c for c in df.columns if c in ('基础信息', 'SKU名称')])
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    yield string.Template(_HTML_HEAD).substitute(
+        title=html.escape(title, quote=False), subtitle=html.escape(subtitle, quote=False), today=today)
+    yield "<thead><tr>" + "".join([f"<th>{html.escape(str(col), quote=False)}</th>" for col in df.columns]) + "</tr></thead>"
+    yield "<tbody>"
+    for start in range(0, len(df), chunk_rows):
+        stop = start + chunk_rows
+        yield _html_rows(df.iloc[start:stop], gid[start:stop], left_cols)
+    yield _HTML_TAIL
+
+def write_work_order_html(fp, df: pd.DataFrame, title: str, subtitle: str, chunk_rows=HTML_CHUNK_ROWS):
+    """流式写入二进制文件对象（普通文件 / ZipFile.open(name, 'w')），内存只占一块行
+
+    打包路径不走这里：产物在渲染子进程里生成，跨进程只能回传整份字节，由 make_work_order_html 收集
+    """
+    for chunk in iter_work_order_html(df, title, subtitle, chunk_rows):
+        fp.write(chunk.encode("utf-8"))
+
+def make_work_order_html(df: pd.DataFrame, title: str, subtitle: str) -> bytes:
+    """A4灰白可打印HTML，在线加载Noto字体；斑马纹按产品编码分组"""
+    buf = io.BytesIO()
+    write_work_order_html(buf, df, title, subtitle)
+    return buf.getvalue()
+
+def split_work_order(df: pd.DataFrame, max_rows=WORK_ORDER_MAX_ROWS) -> list:
+    """超长工单拆成多份，切点落在产品编码分组首行，同一产品不跨文档"""
+    if max_rows is None or len(df) <= max_rows:
+        return [df]
+    if '产品编码' in df.columns:
+        starts = np.flatnonzero(group_starts(df['产品编码']))
+    else:
+        starts = np.arange(len(df))
+    parts, begin = [], 0
+    while len(df) - begin > max_rows:
+        # 不超过 max_rows 的最后一个分组首行；单个分组超长时整组单独成份
+        cut = starts[np.searchsorted(starts, begin + max_rows, side='right') - 1]
+        if cut <= begin:
+            nxt = np.searchsorted(starts, begin, side='right')
+            cut = starts[nxt] if nxt < len(starts) else len(df)
+        parts.append(df.iloc[begin:cut])
+        begin = cut
+    if begin < len(df):
+        parts.append(df.iloc[begin:])
+    return parts
+
+def build_excel_bytes(df_sheet1, df_buy_with30, df_trans, df_fee, constant_memory=False, df_plan=None) -> bytes:
+    """Excel 导出（Table + 按产品编码分组斑马纹 + 两列左对齐）；df_plan 不为 None 时追加预算采购单
+
+    按列批量写入；constant_memory=True 时逐行流式写出、内存占用与行数无关，
+    但 xlsxwriter 该模式不支持 Table，改为表头加粗 + 自动筛选
+    """
+    import xlsxwriter   # 只在真正导出 Excel 时加载
+
+    out_io = io.BytesIO()
+    with xlsxwriter.Workbook(out_io, {'constant_memory': constant_memory}) as wb:
+        fmt_center = wb.add_format({'align': 'center', 'valign': 'vcenter'})
+        fmt_left = wb.add_format({'align': 'left', 'valign': 'vcenter'})
+        fmt_header = wb.add_format({'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#4F81BD',
+                                    'align': 'center', 'valign': 'vcenter'})
+
+        fmt_zebra_group = wb.add_format({'bg_color': '#F2F2F2', 'align': 'center', 'valign': 'vcenter'})
+        fmt_zebra_left = wb.add_format({'bg_color': '#F2F2F2', 'align': 'left', 'valign': 'vcenter'})
+
+        fmt_red_bold = wb.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
+        fmt_red_norm = wb.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006', 'bold': False, 'align': 'center', 'valign': 'vcenter'})
+        fmt_orange_bold = wb.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C5700', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
+        fmt_orange_norm = wb.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C5700', 'bold': False, 'align': 'center', 'valign': 'vcenter'})
+        fmt_blue = wb.add_format({'bg_color': '#C5D9F1', 'font_color': '#1F497D', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
+        fmt_purple = wb.add_format({'bg_color': '#E1BEE7', 'font_color': '#4A148C', 'bold': True, 'align': 'center', 'valign': 'vcenter'})
+        fmt_bold = wb.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter'})
+
+        def apply_conditional(ws, df_curr):
+            col_idx = {c: i for i, c in enumerate(df_curr.columns)}
+            nrows = len(df_curr)
+            if nrows <= 0:
+                return
+
+            def cf(colname, rule):
+                if colname not in col_idx:
+                    return
+                c = col_idx[colname]
+                if rule == 'bold':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'formula', 'criteria': '=TRUE', 'format': fmt_bold})
+                elif rule == 'red_bold':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_red_bold})
+                elif rule == 'red_norm':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_red_norm})
+                elif rule == 'orange_bold':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_orange_bold})
+                elif rule == 'orange_norm':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_orange_norm})
+                elif rule == 'blue':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_blue})
+                elif rule == 'purple':
+                    ws.conditional_format(1, c, nrows, c, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': fmt_purple})
+
+            cf('产品编码', 'bold')
+            cf('SKU名称', 'bold')
+            cf('建议采购数', 'red_bold')
+            cf('预算采购数', 'red_bold')
+            cf('预算采购额(RMB)', 'red_norm')
+            cf('预计采购总额(RMB)', 'red_norm')
+            cf('冗余数量', 'orange_bold')
+            cf('冗余资金', 'orange_norm')
+            cf('建议调拨数量', 'blue')
+            cf('本月仓储费(预警)', 'purple')
+
+        def build_table_sheet(sheet_name, df_curr, fixed_width_cols=None, fixed_width=26, hide_cols=None, bold_value_cols=None):
+            hide_cols = hide_cols or []
+            fixed_width_cols = fixed_width_cols or []
+            bold_value_cols = bold_value_cols or []
+
+            # 分组首行只算一次：斑马纹分组号与视觉置空共用
+            if '产品编码' in df_curr.columns and len(df_curr) > 0:
+                first = group_starts(df_curr['产品编码'])
+                gid = group_zebra(first)
+            else:
+                first = None
+                gid = np.zeros(len(df_curr), dtype=np.int8)
+
+            df_write = df_curr
+            if '产品编码' in df_write.columns and '店铺名称' in df_write.columns:
+                df_write = blank_repeat_like_merge(df_write, '产品编码', ['店铺名称', '产品编码'], first=first)
+
+            ws = wb.add_worksheet(sheet_name)
+
+            nrows, ncols = len(df_write), len(df_write.columns)
+            headers = [str(c) for c in df_write.columns]
+            helper_col = ncols
+
+            # 列格式/列宽须在流式写行之前设置
+            widths = estimate_col_widths(df_write, fixed_col_names=fixed_width_cols, fixed_width=fixed_width)
+            for i, w in enumerate(widths):
+                ws.set_column(i, i, w, fmt_center)
+
+            for colname in ['基础信息', 'SKU名称']:
+                if colname in df_write.columns:
+                    cidx = list(df_write.columns).index(colname)
+                    ws.set_column(cidx, cidx, widths[cidx], fmt_left)
+
+            ws.set_column(helper_col, helper_col, None, None, {'hidden': True})
+            for c in hide_cols:
+                if 0 <= c < ncols:
+                    ws.set_column(c, c, None, None, {'hidden': True})
+
+            cols = [column_values(df_write[c]) for c in df_write.columns]
+            gids = gid.tolist()
+            if constant_memory:
+                ws.write_row(0, 0, headers, fmt_header)
+                ws.write(0, helper_col, "_gid")
+                for i, row in enumerate(zip(*cols)):
+                    ws.write_row(i + 1, 0, row)
+                    ws.write_number(i + 1, helper_col, gids[i], fmt_center)
+                if nrows > 0 and ncols > 0:
+                    ws.autofilter(0, 0, nrows, ncols - 1)
+            else:
+                # 整列写入：column_values 已把缺失值转成 None（写空单元格），数值/文本列同一路径
+                for c, values in enumerate(cols):
+                    ws.write_column(1, c, values)
+                ws.write(0, helper_col, "_gid")
+                ws.write_column(1, helper_col, gids, fmt_center)
+                if ncols > 0:
+                    ws.add_table(0, 0, nrows, ncols - 1, {
+                        'columns': [{'header': h} for h in headers],
+                        'style': 'Table Style Medium 9',
+                        'autofilter': True if nrows > 0 else False,
+                        'banded_rows': False
+                    })
+
+            if nrows > 0 and ncols > 0:
+                helper_letter = col_to_excel(helper_col)
+                formula = f'=${helper_letter}2=1'
+                ws.conditional_format(1, 0, nrows, ncols - 1, {
+                    'type': 'formula',
+                    'criteria': formula,
+                    'format': fmt_zebra_group
+                })
+                for colname in ['基础信息', 'SKU名称']:
+                    if colname in df_write.columns:
+                        cidx = list(df_write.columns).index(colname)
+                        ws.conditional_format(1, cidx, nrows, cidx, {
+                            'type': 'formula',
+                            'criteria': formula,
+                            'format': fmt_zebra_left
+                        })
+
+            # ✅ 指定列“数值加粗”（不影响表头）
+            if nrows > 0:
+                col_idx_map = {c: i for i, c in enumerate(df_write.columns)}
+                for cname in bold_value_cols:
+                    if cname in col_idx_map:
+                        c = col_idx_map[cname]
+                        ws.conditional_format(1, c, nrows, c, {'type': 'formula', 'criteria': '=TRUE', 'format': fmt_bold})
+
+            apply_conditional(ws, df_write)
+
+        # sheet1：补货计算表（含在做列 + 30天销量）
+        build_table_sheet('补货计算表', df_sheet1, fixed_width_cols=['基础信息'], fixed_width=26)
+
+        # sheet2：采购单（插入30天销量；并加粗7天/30天两列数值）
+        build_table_sheet(
+            '采购单(找工厂)',
+            df_buy_with30,
+            fixed_width_cols=['基础信息'],
+            fixed_width=26,
+            hide_cols=[14, 15, 16, 17, 18, 19],  # 沿用你原来的隐藏列逻辑（基于原sheet2列结构）
+            bold_value_cols=['7天销量', '30天销量']
+        )
+
+        if df_plan is not None:
+            build_table_sheet('预算采购单', df_plan, fixed_width_cols=['基础信息'], fixed_width=26)
+
+        # sheet3：调拨单（保持原样）
+        build_table_sheet('调拨单(发橙火)', df_trans, fixed_width_cols=['基础信息'], fixed_width=26,
+                          hide_cols=[12, 13, 14, 15, 16, 17, 19])
+
+        # sheet4：库龄预警单（保持原样）
+        build_table_sheet('库龄预警单(需重入库)', df_fee, fixed_width_cols=['基础信息'], fixed_width=26,
+                          hide_cols=[11, 12, 13, 14, 15, 16, 17, 18])
+
+    return out_io.getvalue()
+
+ZIP32_LIMIT = 0xFFFFFFFF
+
+
+class PackResult(NamedTuple):
+    zip_bytes: bytes
+    zip_name: str
+    artifacts: dict            # {文件名: 字节}
+    timings: list              # [{name, render_s, compress_s, bytes, zip_bytes}]，按 artifacts 顺序
+
+
+def render_artifact(kind, frames, options):
+    """单个产物的渲染任务（可在子进程执行）；返回 (字节, 耗时秒)"""
+    t0 = time.perf_counter()
+    if kind == 'xlsx':
+        data = build_excel_bytes(*frames, **options)
+    elif kind == 'pdf':
+        from restock.pdf import make_work_order_pdf   # reportlab 只在需要 PDF 时加载
+        data = make_work_order_pdf(*frames, **options)
+    else:
+        data = make_work_order_html(*frames, **options)
+    return data, time.perf_counter() - t0
+
+def artifact_tasks(tables, stamp, constant_memory=False, max_rows=WORK_ORDER_MAX_ROWS, with_pdf=False):
+    """[(文件名, (kind, frames, options))]，顺序即 ZIP 内顺序；超长 HTML 工单按 max_rows 拆成多份，PDF 自带分页"""
+    show = tables.display
+    sheet1, buy_with30, trans, fee = show(tables.sheet1), show(tables.buy_with30), show(tables.trans), show(tables.fee)
+    plan = show(tables.plan.frame) if tables.plan is not None else None
+    tasks = [(f"Coupang_Restock_Full_v18_{stamp}.xlsx",
+              ('xlsx', (sheet1, buy_with30, trans, fee), {'constant_memory': constant_memory, 'df_plan': plan}))]
+    work_orders = [
+        # 采购工单HTML使用带30天销量版本
+        ('Buy', buy_with30, "采购工单（找工厂）", "范围：建议采购数 > 0"),
+        ('Transfer', trans, "调拨工单（发橙火）", "范围：建议调拨数量 > 0"),
+        ('Fee', fee, "库龄预警工单（需重入库）", "范围：本月仓储费(预警) > 0"),
+    ]
+    if plan is not None:
+        bp = tables.plan
+        work_orders.insert(1, ('Budget', plan, "预算采购工单（找工厂）",
+                               f"预算 ¥{bp.budget:,.0f} · 已分配 ¥{bp.spent:,.0f} · 覆盖水位 {bp.level:.1f} 周"))
+    for tag, df, title, subtitle in work_orders:
+        parts = split_work_order(df, max_rows)
+        for i, part in enumerate(parts, start=1):
+            if len(parts) == 1:
+                name, sub = f"WorkOrder_{tag}_{stamp}.html", subtitle
+            else:
+                name, sub = f"WorkOrder_{tag}_{stamp}_p{i}.html", f"{subtitle}（第 {i}/{len(parts)} 份）"
+            tasks.append((name, ('html', (part,), {'title': title, 'subtitle': sub})))
+    if with_pdf:
+        for tag, df, title, subtitle in work_orders:
+            tasks.append((f"WorkOrder_{tag}_{stamp}.pdf", ('pdf', (df,), {'title': title, 'subtitle': subtitle})))
+    return tasks
+
+def render_all(tasks, ingestor=None):
+    """渲染全部产物，返回 {任务标签: (字节, 耗时秒)}；给了 ingestor 且数据量够大时并行（进程池），否则串行"""
+    rendered = {}
+    if ingestor is None:
+        for name, args in tasks:
+            rendered[name] = render_artifact(*args)
+        return rendered
+    sizes = [sum(int(df.memory_usage(index=False).sum()) for df in args[1]) for _, args in tasks]
+    for name, value in ingestor.run(render_artifact, tasks, sizes):
+        rendered[name] = value
+    return rendered
+
+# ==========================================
+# ZIP：各条目独立 DEFLATE（zlib 释放 GIL，可线程并行），再按顺序拼装
+# ==========================================
+def deflate_entry(data: bytes, level=zlib.Z_DEFAULT_COMPRESSION):
+    """返回 (crc32, 压缩后字节, 耗时秒)；与 zipfile.ZIP_DEFLATED 的压缩流一致"""
+    t0 = time.perf_counter()
+    comp = zlib.compressobj(level, zlib.DEFLATED, -15)
+    body = comp.compress(data) + comp.flush()
+    return zlib.crc32(data), body, time.perf_counter() - t0
+
+def _dos_datetime(dt: datetime):
+    return (dt.hour << 11) | (dt.minute << 5) | (dt.second // 2), ((dt.year - 1980) << 9) | (dt.month << 5) | dt.day
+
+def assemble_zip(entries, when=None) -> bytes:
+    """entries: [(文件名, 原始字节, crc32, 压缩后字节)] -> ZIP 字节（无 ZIP64，超限由调用方退回 zipfile）"""
+    dos_time, dos_date = _dos_datetime(when or datetime.now())
+    out = io.BytesIO()
+    central = []
+    for name, data, crc, body in entries:
+        fname = name.encode('utf-8')
+        offset = out.tell()
+        out.write(struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, 0x800, zipfile.ZIP_DEFLATED, dos_time, dos_date,
+                              crc, len(body), len(data), len(fname), 0))
+        out.write(fname)
+        out.write(body)
+        central.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | 20, 20, 0x800, zipfile.ZIP_DEFLATED,
+                                   dos_time, dos_date, crc, len(body), len(data), len(fname), 0, 0, 0, 0,
+                                   0o600 << 16, offset) + fname)
+    cd_offset = out.tell()
+    for rec in central:
+        out.write(rec)
+    out.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, len(central), len(central),
+                          out.tell() - cd_offset, cd_offset, 0))
+    return out.getvalue()
+
+def _zip_sequential(artifacts) -> bytes:
+    zip_buf = io.BytesIO()
+    with zipfile.ZipFile(zip_buf, 'w', compression=zipfile.ZIP_DEFLATED) as z:
+        for name, data in artifacts.items():
+            z.writestr(name, data)
+    return zip_buf.getvalue()
+
+def zip_artifacts(artifacts: dict, workers=None):
+    """并行压缩各条目后拼装；返回 (zip字节, {文件名: (压缩耗时秒, 压缩后字节数)})"""
+    names = list(artifacts)
+    workers = max(1, min(len(names), workers or default_workers()))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            deflated = list(pool.map(deflate_entry, [artifacts[n] for n in names]))
+    else:
+        deflated = [deflate_entry(artifacts[n]) for n in names]
+    stats = {n: (sec, len(body)) for n, (_, body, sec) in zip(names, deflated)}
+
+    total = sum(len(artifacts[n]) + len(body) + 2 * len(n) + 76 for n, (_, body, _) in zip(names, deflated))
+    if total >= ZIP32_LIMIT or len(names) >= 0xFFFF:
+        return _zip_sequential(artifacts), stats
+    return assemble_zip([(n, artifacts[n], crc, body) for n, (crc, body, _) in zip(names, deflated)]), stats
+
+def assemble_pack(names, rendered, zip_name, workers=None, with_zip=True) -> PackResult:
+    """已渲染的产物 ({文件名: (字节, 耗时)}) 按 names 顺序打包并汇总耗时"""
+    artifacts = {name: rendered[name][0] for name in names}
+    zip_bytes, zstats = b'', {}
+    if with_zip:
+        zip_bytes, zstats = zip_artifacts(artifacts, workers=workers)
+    timings = [{'name': name, 'render_s': rendered[name][1], 'compress_s': zstats.get(name, (0.0, 0))[0],
+                'bytes': len(artifacts[name]), 'zip_bytes': zstats.get(name, (0.0, 0))[1]} for name in names]
+    return PackResult(zip_bytes, zip_name, artifacts, timings)
+
+def render_pack(tables, stamp=None, constant_memory=False, ingestor=None, with_zip=True, with_pdf=False) -> PackResult:
+    """渲染全部产物并打包，附带逐产物耗时（渲染/压缩），用于定位下载延迟来源；with_zip=False 时不压缩"""
+    stamp = stamp or pd.Timestamp.now().strftime('%Y%m%d')
+    tasks = artifact_tasks(tables, stamp, constant_memory, with_pdf=with_pdf)
+    rendered = render_all(tasks, ingestor)
+    return assemble_pack([name for name, _ in tasks], rendered, f"Coupang_Restock_Pack_{stamp}.zip",
+                         workers=ingestor.workers if ingestor is not None else None, with_zip=with_zip)
@@ -0,0 +1,48 @@
+"""PDF 工单字体定位（不依赖 reportlab，页面可在冷路径上检查）
+
+只用可嵌入的 TrueType 字体 (.ttf/.ttc)：环境变量 RESTOCK_PDF_FONT_ZH / RESTOCK_PDF_FONT_KO 优先，其次常见系统路径。
+找不到时直接报错，不退回 reportlab 内置 CID 字体——CID 字体不嵌入 PDF，离线电脑上没有对应字形，中韩文打印不出来。
+"""
+import os
+
+# (环境变量, 候选字体 [(路径, ttc子字体序号)])
+FONT_CANDIDATES = {
+    'zh': ('RESTOCK_PDF_FONT_ZH', [
+        ('C:/Windows/Fonts/simhei.ttf', 0),
+        ('C:/Windows/Fonts/msyh.ttc', 0),
+        ('C:/Windows/Fonts/simsun.ttc', 0),
+        ('/usr/share/fonts/truetype/wqy/wqy-microhei.ttc', 0),
+        ('/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc', 0),
+        ('/usr/share/fonts/truetype/arphic/uming.ttc', 0),
+        ('/System/Library/Fonts/STHeiti Medium.ttc', 0),
+    ]),
+    'ko': ('RESTOCK_PDF_FONT_KO', [
+        ('C:/Windows/Fonts/malgun.ttf', 0),
+        ('C:/Windows/Fonts/gulim.ttc', 0),
+        ('/usr/share/fonts/truetype/nanum/NanumGothic.ttf', 0),
+        ('/Library/Fonts/AppleGothic.ttf', 0),
+        ('/System/Library/Fonts/Supplemental/AppleGothic.ttf', 0),
+    ]),
+}
+FONT_EXTS = ('.ttf', '.ttc')
+LANG_NAMES = {'zh': '中文', 'ko': '韩文'}
+
+
+class PdfFontError(RuntimeError):
+    """找不到可嵌入的字体"""
+
+
+def font_candidates(lang: str) -> list:
+    """[(路径, 子字体序号)]，环境变量指定的在前；只保留存在的 .ttf/.ttc 文件"""
+    env, candidates = FONT_CANDIDATES[lang]
+    paths = [(os.environ[env], 0)] if os.environ.get(env) else []
+    return [(p, i) for p, i in paths + candidates if p.lower().endswith(FONT_EXTS) and os.path.isfile(p)]
+
+def missing_fonts() -> list:
+    """找不到候选字体文件的语言"""
+    return [lang for lang in FONT_CANDIDATES if not font_candidates(lang)]
+
+def font_hint(langs) -> str:
+    names = '/'.join(LANG_NAMES[lang] for lang in langs)
+    envs = ' / '.join(FONT_CANDIDATES[lang][0] for lang in langs)
+    return f"未找到可嵌入的{names}字体 (.ttf/.ttc)：请设置环境变量 {envs} 指向字体文件（命令行用 --font / --font-ko）"
@@ -0,0 +1,75 @@
+"""需求预测：全部 SKU 一次数组运算，输出周预测销量 + 周销量标准差（置信带）
+
+- flat  : 原逻辑，周销量 = 近7天销量，无波动项，各标准不取整（与旧算法逐位一致）
+- blend : 近7天日均与近30天日均加权混合；波动取 泊松项 与 "近7天 vs 其余23天" 两段差异 的较大者
+- ewma  : 历史库逐日销量 (SKU × 天) 指数加权均值/方差，越近的天权重越大
+- auto  : 有逐日销量时 ewma，否则 blend
+
+下游按 周预测×周数 + z×标准差×√周数 得到安全库存 / 冗余标准 / 橙火安全库存。
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+METHODS = ('auto', 'blend', 'ewma', 'flat')
+
+
+class Forecast(NamedTuple):
+    weekly: np.ndarray         # 周预测销量
+    sigma: np.ndarray          # 周销量标准差
+    exact: bool = False        # flat：原算法，标准 = 销量×周数，不取整
+
+    def horizon(self, weeks, z) -> np.ndarray:
+        """weeks 周内需求的上沿：均值×周数 + z×σ×√周数，向上取整到件；flat 预测保持原算法 销量×周数（小数销量也不取整）"""
+        need = self.weekly * weeks
+        if self.exact:
+            return need
+        if z:
+            need = need + z * self.sigma * np.sqrt(weeks)
+        # 先舍掉浮点误差再进位，避免 7.0000001 进成 8
+        return np.ceil(np.round(need, 6))
+
+    def band(self, z) -> tuple:
+        """周预测置信带 (下沿, 上沿)，下沿不低于 0"""
+        return np.maximum(self.weekly - z * self.sigma, 0), self.weekly + z * self.sigma
+
+
+def flat_forecast(sales_7d) -> Forecast:
+    weekly = np.asarray(sales_7d)
+    return Forecast(weekly, np.zeros(weekly.shape), exact=True)
+
+def blend_forecast(sales_7d, sales_30d, weight=0.5) -> Forecast:
+    """weight：近7天日均的权重；近30天少于近7天（文件缺漏）时只用近7天"""
+    s7 = np.asarray(sales_7d, dtype=float)
+    s30 = np.asarray(sales_30d, dtype=float)
+    ok = s30 >= s7
+    rate7 = s7 / 7
+    rate30 = np.where(ok, s30 / 30, rate7)
+    rest23 = np.where(ok, (s30 - s7) / 23, rate7)
+    weekly = 7 * (weight * rate7 + (1 - weight) * rate30)
+    # 两段周销量 (近7天, 其余23天折算) 的样本方差 vs 泊松方差(=均值)，取大
+    var = np.maximum(weekly, (s7 - 7 * rest23) ** 2 / 2)
+    return Forecast(weekly, np.sqrt(var))
+
+def ewma_weights(n_days: int, alpha=0.3) -> np.ndarray:
+    """最旧 → 最新 的归一化指数权重"""
+    w = alpha * (1 - alpha) ** np.arange(n_days - 1, -1, -1, dtype=float)
+    return w / w.sum()
+
+def ewma_forecast(daily: np.ndarray, alpha=0.3) -> Forecast:
+    """daily：(SKU数, 天数) 逐日销量，列按日期升序；未出现在当天销量表中的 SKU 记 0"""
+    daily = np.asarray(daily, dtype=float)
+    w = ewma_weights(daily.shape[1], alpha)
+    mean = daily @ w
+    var = ((daily - mean[:, None]) ** 2) @ w
+    # 逐日独立：周方差 = 7 × 日方差
+    return Forecast(7 * mean, np.sqrt(7 * var))
+
+def forecast_arrays(sales_7d, sales_30d, method='auto', weight=0.5, alpha=0.3, daily=None) -> Forecast:
+    if method not in METHODS:
+        raise ValueError(f"未知预测方法 {method!r}，可选 {', '.join(METHODS)}")
+    if method == 'flat':
+        return flat_forecast(sales_7d)
+    if method in ('auto', 'ewma') and daily is not None and daily.shape[1] > 0:
+        return ewma_forecast(daily, alpha)
+    return blend_forecast(sales_7d, sales_30d, weight)
@@ -0,0 +1,113 @@
+"""本地历史库：按天存 SKU 销量 / 库存快照（Parquet，一天一个文件），窗口销量按天滚动求和
+
+目录结构：
+    <root>/sales/2026-10-17.parquet    当天销量   Key, Qty
+    <root>/inv_r/2026-10-17.parquet    橙火库存快照 Key, Qty, Fee
+    <root>/inv_j/2026-10-17.parquet    极风库存快照 Key, Qty
+
+每日只追加（覆盖）当天文件；7/30 天或任意天数窗口只读落在窗口内的文件。
+"""
+import hashlib
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+
+KINDS = {
+    'sales': ['Qty'],
+    'inv_r': ['Qty', 'Fee'],
+    'inv_j': ['Qty'],
+}
+
+
+def as_day(value) -> date:
+    """'2026-10-17' / datetime / date / None(今天) -> date"""
+    if value is None:
+        return date.today()
+    if isinstance(value, date):
+        return value if type(value) is date else value.date()
+    return pd.Timestamp(value).date()
+
+
+class HistoryStore:
+    def __init__(self, root: str):
+        self.root = root
+        for kind in KINDS:
+            os.makedirs(os.path.join(root, kind), exist_ok=True)
+
+    def _path(self, kind: str, day: date) -> str:
+        return os.path.join(self.root, kind, f"{day.isoformat()}.parquet")
+
+    def days(self, kind: str) -> list:
+        """已入库的日期（升序）"""
+        out = []
+        for name in os.listdir(os.path.join(self.root, kind)):
+            if name.endswith('.parquet'):
+                try:
+                    out.append(date.fromisoformat(name[:-len('.parquet')]))
+                except ValueError:
+                    continue
+        return sorted(out)
+
+    def append_day(self, kind: str, day, frames) -> int:
+        """写入（覆盖）某天的数据：多个已按 Key 汇总的来源表再汇总后落盘；返回 SKU 数"""
+        cols = KINDS[kind]
+        frames = [f for f in frames if f is not None and not f.empty]
+        if frames:
+            df = pd.concat([f[['Key'] + cols] for f in frames], ignore_index=True)
+            df = df.groupby('Key', sort=False)[cols].sum().reset_index()
+        else:
+            df = pd.DataFrame({'Key': pd.Series([], dtype=str), **{c: pd.Series([], dtype=float) for c in cols}})
+        path = self._path(kind, as_day(day))
+        tmp = path + '.tmp'
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return len(df)
+
+    def day_frame(self, kind: str, day) -> pd.DataFrame:
+        """某一天的原始入库数据"""
+        return pd.read_parquet(self._path(kind, as_day(day)), columns=['Key'] + KINDS[kind])
+
+    def window_days(self, kind: str, end, days: int) -> list:
+        """窗口 (end-days, end] 内已入库的日期"""
+        end = as_day(end)
+        start = end - timedelta(days=days - 1)
+        return [d for d in self.days(kind) if start <= d <= end]
+
+    def missing_days(self, kind: str, end, days: int) -> list:
+        end = as_day(end)
+        have = set(self.window_days(kind, end, days))
+        return [end - timedelta(days=i) for i in range(days - 1, -1, -1) if end - timedelta(days=i) not in have]
+
+    def window(self, kind: str, end, days: int) -> pd.DataFrame:
+        """窗口内逐日数据按 Key 求和（与上传整段窗口报表的汇总结果同形：Key + 数值列）"""
+        cols = KINDS[kind]
+        frames = [pd.read_parquet(self._path(kind, d), columns=['Key'] + cols)
+                  for d in self.window_days(kind, end, days)]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=['Key'] + cols)
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return df.groupby('Key')[cols].sum().reset_index()
+
+    def snapshot_day(self, kind: str, day=None):
+        """day 当天或之前最近一次快照的日期；没有则 None"""
+        day = as_day(day)
+        past = [d for d in self.days(kind) if d <= day]
+        return past[-1] if past else None
+
+    def snapshot(self, kind: str, day=None) -> pd.DataFrame:
+        """库存类：取 day 当天或之前最近一次快照"""
+        found = self.snapshot_day(kind, day)
+        if found is None:
+            return pd.DataFrame(columns=['Key'] + KINDS[kind])
+        return pd.read_parquet(self._path(kind, found))
+
+    def fingerprint(self, kind: str, day_list) -> str:
+        """窗口内文件的 名称+大小+修改时间 指纹，用于流水线记忆化"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(kind.encode('utf-8'))
+        for d in day_list:
+            st = os.stat(self._path(kind, d))
+            h.update(f"{d.isoformat()}:{st.st_size}:{st.st_mtime_ns};".encode('utf-8'))
+        return h.hexdigest()
@@ -0,0 +1,83 @@
+"""并行读取：多文件解析分发到进程池（openpyxl 解析是纯 Python、受 GIL 限制），小输入自动退回串行"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+def default_workers() -> int:
+    env = os.environ.get('RESTOCK_WORKERS')
+    if env:
+        try:
+            return max(1, int(env))
+        except ValueError:
+            pass
+    return max(1, min(8, (os.cpu_count() or 1)))
+
+
+class Ingestor:
+    """按完成顺序产出结果的任务池
+
+    - kind='process'：进程池 (spawn，兼容 Windows / Streamlit 多线程环境)
+    - kind='thread' ：线程池 (适合 CSV 等 C 实现的解析)
+    - 文件数 < min_files 或总字节 < min_bytes 时串行执行，省去进程启动开销
+    """
+
+    def __init__(self, workers=None, kind='process', min_files=4, min_bytes=4 * 1024 * 1024):
+        self.workers = workers or default_workers()
+        self.kind = kind
+        self.min_files = min_files
+        self.min_bytes = min_bytes
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                if self.kind == 'thread':
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def use_parallel(self, n_tasks: int, total_bytes: int) -> bool:
+        return self.workers > 1 and n_tasks >= self.min_files and total_bytes >= self.min_bytes
+
+    def run(self, fn, tasks, sizes=None):
+        """tasks: [(tag, args)]；按完成顺序 yield (tag, 结果)"""
+        tasks = list(tasks)
+        sizes = sizes or [0] * len(tasks)
+        if not self.use_parallel(len(tasks), sum(sizes)):
+            for tag, args in tasks:
+                yield tag, fn(*args)
+            return
+
+        pool = self._executor()
+        # 大文件先提交，避免最后一个大文件拖尾
+        order = sorted(range(len(tasks)), key=lambda i: -sizes[i])
+        pending = {pool.submit(fn, *tasks[i][1]): i for i in order}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i = pending.pop(fut)
+                    try:
+                        value = fut.result()
+                    except BrokenExecutor:
+                        # 子进程无法启动/异常退出：剩余任务退回主进程串行执行
+                        self.shutdown()
+                        for j in [i] + list(pending.values()):
+                            yield tasks[j][0], fn(*tasks[j][1])
+                        pending.clear()
+                        return
+                    yield tasks[i][0], value
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
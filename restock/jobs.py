@@ -0,0 +1,292 @@
+"""后台任务：报表生成提交到工作池，按任务ID轮询状态/进度；生成的 ZIP 存进有界磁盘结果缓存 (TTL 淘汰)
+
+- 工作池用线程：解析/渲染本身已分发到 Ingestor 进程池，任务线程里主要是调度和 numpy/pandas 计算；
+  同进程内共享 Pipeline 记忆化结果，多个操作员提交相同输入时只算一次（同键任务直接复用）
+- 任务与浏览器会话无关：刷新页面后凭任务ID继续轮询 / 下载
+- 结果缓存：<dir>/<键>.zip + <键>.json；超过 TTL 删除，超出条目数/总字节时先删最久未访问的
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+STATUS_TEXT = {QUEUED: '排队中', RUNNING: '运行中', DONE: '已完成', FAILED: '失败'}
+
+
+def default_job_workers() -> int:
+    env = os.environ.get('RESTOCK_JOB_WORKERS')
+    if env:
+        try:
+            return max(1, int(env))
+        except ValueError:
+            pass
+    return max(1, min(4, (os.cpu_count() or 1)))
+
+def job_key(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+# ==========================================
+# 磁盘结果缓存
+# ==========================================
+class ResultCache:
+    """ZIP 结果落盘：按键存取，TTL + 条目数 + 总字节三重限额；多进程共享同一目录也安全（写入走临时文件 + 原子替换）"""
+
+    def __init__(self, disk_dir=None, max_entries=32, max_bytes=2 * 1024 ** 3, ttl_s=24 * 3600):
+        self.disk_dir = disk_dir or os.path.join(tempfile.gettempdir(), 'restock_results')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self.evictions = 0
+        os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.disk_dir, key)
+        return base + '.zip', base + '.json'
+
+    def put(self, key: str, name: str, data: bytes):
+        p_data, p_meta = self._paths(key)
+        with self._lock:
+            for path, payload in ((p_data, data),
+                                  (p_meta, json.dumps({'name': name, 'bytes': len(data)}, ensure_ascii=False).encode('utf-8'))):
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    with open(tmp, 'wb') as f:
+                        f.write(payload)
+                    os.replace(tmp, path)
+                except OSError:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+        self.evict()
+
+    def get(self, key: str):
+        """(文件名, 字节) 或 None；命中时刷新访问时间 (LRU)"""
+        p_data, p_meta = self._paths(key)
+        try:
+            if time.time() - os.path.getmtime(p_data) > self.ttl_s:
+                self.evict()
+                return None
+            with open(p_meta, 'r', encoding='utf-8') as f:
+                name = json.load(f)['name']
+            with open(p_data, 'rb') as f:
+                data = f.read()
+            os.utime(p_data)
+        except (OSError, ValueError, KeyError):
+            return None
+        return name, data
+
+    def __contains__(self, key):
+        p_data, p_meta = self._paths(key)
+        try:
+            return os.path.exists(p_meta) and time.time() - os.path.getmtime(p_data) <= self.ttl_s
+        except OSError:
+            return False
+
+    def _entries(self):
+        """[(键, 访问时间, 字节)]，最久未访问的在前"""
+        out = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith('.zip'):
+                try:
+                    st = os.stat(os.path.join(self.disk_dir, name))
+                except OSError:
+                    continue
+                out.append((name[:-4], st.st_mtime, st.st_size))
+        return sorted(out, key=lambda e: e[1])
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.evictions += 1
+
+    def evict(self) -> int:
+        """删过期条目，再按 LRU 删到条目数/总字节以内；返回删除数"""
+        with self._lock:
+            before = self.evictions
+            now = time.time()
+            live = []
+            for key, mtime, size in self._entries():
+                if now - mtime > self.ttl_s:
+                    self._remove(key)
+                else:
+                    live.append((key, size))
+            total = sum(size for _, size in live)
+            while live and (len(live) > self.max_entries or total > self.max_bytes):
+                key, size = live.pop(0)
+                self._remove(key)
+                total -= size
+            return self.evictions - before
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._entries()
+        return {'entries': len(entries), 'mb': round(sum(e[2] for e in entries) / 2**20, 1),
+                'evictions': self.evictions, 'dir': self.disk_dir}
+
+    def clear(self):
+        with self._lock:
+            for key, _, _ in self._entries():
+                self._remove(key)
+
+
+# ==========================================
+# 任务队列
+# ==========================================
+class Job:
+    """一次提交；status/progress/message 由工作线程更新，其余线程只读"""
+    __slots__ = ('id', 'key', 'label', 'status', 'progress', 'message', 'error', 'value',
+                 'created', 'started', 'finished', 'claims', '_future', '_published')
+
+    def __init__(self, key: str, label: str):
+        self.id = os.urandom(6).hex()
+        self.key = key
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.error = ''
+        self.value = None          # 中间结果 (publish) / 任务函数返回的结果（只在本进程内存中）
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.claims = set()        # 提交方（会话）标识；同键复用时各自登记，全部撤回才真正取消
+        self._future = None
+        self._published = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def report(self, progress: float, message=''):
+        """任务函数内调用：进度 0~1 + 当前步骤说明"""
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message:
+            self.message = message
+
+    def publish(self, value):
+        """任务函数内调用：先交出可展示的中间结果（如计算结果），后续步骤（打包）继续在后台跑"""
+        self.value = value
+        self._published.set()
+
+    def wait(self, timeout=None) -> bool:
+        """等到有可展示的结果或任务结束；超时返回 False"""
+        return self._published.wait(timeout)
+
+    def elapsed_s(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def record(self) -> dict:
+        """状态表一行"""
+        return {'id': self.id, 'label': self.label, 'status': STATUS_TEXT[self.status],
+                'progress': round(self.progress * 100), 'message': self.error or self.message,
+                'created': time.strftime('%H:%M:%S', time.localtime(self.created)),
+                'elapsed_s': round(self.elapsed_s(), 1)}
+
+
+class JobQueue:
+    """submit(fn, key) -> Job；fn(job) 在工作线程执行，返回 (结果, PackResult 或 None)，ZIP 写入结果缓存
+    （ZIP 已在缓存中时 fn 可跳过渲染返回 None）；fn 可先 job.publish(结果) 让页面提前展示，再继续打包
+
+    同键任务：进行中 / 已完成且 ZIP 仍在缓存 的直接返回原任务，不重复计算（登记 owner 为提交方之一）；
+    已结束的任务记录按 TTL 过期，最多保留 max_jobs 条（结果对象只在内存中，随记录一起释放）
+    """
+
+    def __init__(self, workers=None, results=None, max_jobs=16, ttl_s=None):
+        self.workers = workers or default_job_workers()
+        self.results = results or ResultCache()
+        self.max_jobs = max_jobs
+        self.ttl_s = ttl_s or self.results.ttl_s
+        self._jobs = OrderedDict()     # id -> Job，按提交顺序
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='restock-job')
+
+    def submit(self, fn, key: str, label='', owner=None) -> Job:
+        """owner：提交方标识（如会话ID），cancel 时只撤回该提交方的登记"""
+        with self._lock:
+            self._prune()
+            for job in reversed(self._jobs.values()):
+                if job.key == key and (job.active or (job.status == DONE and key in self.results)):
+                    job.claims.add(owner)
+                    return job
+            job = Job(key, label)
+            job.claims.add(owner)
+            self._jobs[job.id] = job
+            job._future = self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn):
+        job.status, job.started = RUNNING, time.time()
+        try:
+            value, pack = fn(job)
+            if pack is not None:
+                self.results.put(job.key, pack.zip_name, pack.zip_bytes)
+            job.value = value
+            job.progress, job.status = 1.0, DONE
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+            job._published.set()
+
+    def _prune(self):
+        """过期 / 超出 max_jobs 的已结束任务出队（进行中的不动）"""
+        now = time.time()
+        ended = [j for j in self._jobs.values() if not j.active]
+        drop = {j.id for j in ended if now - j.finished > self.ttl_s}
+        keep = [j for j in ended if j.id not in drop]
+        drop.update(j.id for j in keep[:max(0, len(keep) - self.max_jobs)])
+        for job_id in drop:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def pack(self, job: Job):
+        """(ZIP 文件名, 字节) 或 None（已被淘汰）"""
+        return self.results.get(job.key) if job.status == DONE else None
+
+    def cancel(self, job_id, owner=None) -> bool:
+        """撤回 owner 对任务的登记；没有其他提交方且仍在排队时才真正取消（其他会话还在等的任务照常跑）"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.claims.discard(owner)
+            if job.claims or job.status != QUEUED or not job._future.cancel():
+                return False
+        job.status, job.error, job.finished = FAILED, '已取消', time.time()
+        job._published.set()
+        return True
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_default_jobs = None
+_default_lock = threading.Lock()
+
+def get_default_jobs() -> JobQueue:
+    """进程级共享任务队列；RESTOCK_RESULT_DIR 指定结果缓存目录，RESTOCK_JOB_WORKERS 指定并发任务数"""
+    global _default_jobs
+    with _default_lock:
+        if _default_jobs is None:
+            _default_jobs = JobQueue(results=ResultCache(os.environ.get('RESTOCK_RESULT_DIR') or None))
+        return _default_jobs
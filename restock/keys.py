@@ -0,0 +1,44 @@
+"""共享键空间：把清洗后的 SKU/橙火ID/入库码 字符串驻留为 int32 编码
+
+Master 与所有来源表使用同一个 KeySpace，汇总与匹配都在整数编码上进行，
+每个不同的键字符串只哈希一次。编码只追加不重排，已有编码在 KeySpace 生命周期内保持不变。
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+MISSING = -1   # lookup 时键空间中不存在的键
+
+
+class KeySpace:
+    def __init__(self):
+        self._index = pd.Index([], dtype=object)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._index)
+
+    def encode(self, keys) -> np.ndarray:
+        """键 -> 编码；新键追加进键空间"""
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=False)
+        with self._lock:
+            pos = self._index.get_indexer(uniques)
+            new = pos == MISSING
+            if new.any():
+                start = len(self._index)
+                self._index = self._index.append(pd.Index(uniques[new], dtype=object))
+                pos[new] = np.arange(start, start + int(new.sum()))
+        return pos.astype(np.int32)[codes]
+
+    def lookup(self, keys) -> np.ndarray:
+        """键 -> 编码；不在键空间中的键返回 MISSING，不修改键空间"""
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=False)
+        with self._lock:
+            index = self._index
+        return index.get_indexer(uniques).astype(np.int32)[codes]
+
+    def decode(self, codes) -> np.ndarray:
+        with self._lock:
+            index = self._index
+        return index.take(np.asarray(codes)).to_numpy()
@@ -0,0 +1,190 @@
+"""离线 PDF 工单：reportlab 画布逐页绘制（A4 横向，表头每页重复，按产品编码分组斑马纹）
+
+字体只用嵌入 PDF 的本地 TrueType 字体（定位规则见 restock.fonts），找不到时抛 PdfFontError。
+含韩文的单元格用韩文字体，其余用中文字体。
+"""
+import io
+import math
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from restock.export import estimate_col_widths, group_starts, group_zebra
+from restock.fonts import PdfFontError, font_candidates, font_hint
+
+HANGUL = re.compile('[\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3]')
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 28
+FONT_SIZE = 7
+HEADER_FONT_SIZE = 7
+ROW_H = 13
+HEAD_ROW_H = 22
+CELL_PAD = 3
+LEFT_COLS = ('基础信息', 'SKU名称')
+
+_fonts = {}
+
+
+def resolve_font(lang: str) -> str:
+    """注册并返回 lang 对应的嵌入字体名（同一字体文件进程内只注册一次）；都不可用时抛 PdfFontError"""
+    for path, index in font_candidates(lang):
+        if (path, index) in _fonts:
+            return _fonts[(path, index)]
+        name = f"Restock-{lang}-{len(_fonts)}"
+        try:
+            pdfmetrics.registerFont(TTFont(name, path, subfontIndex=index))
+        except Exception:
+            # CFF 轮廓的 OTF/TTC 等 reportlab 不支持的字体，继续找下一个
+            continue
+        _fonts[(path, index)] = name
+        return name
+    raise PdfFontError(font_hint([lang]))
+
+def _fit(text: str, font: str, size: float, width: float) -> str:
+    """超宽文本截断并加省略号"""
+    if pdfmetrics.stringWidth(text, font, size) <= width:
+        return text
+    while text and pdfmetrics.stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+def _wrap2(text: str, font: str, size: float, width: float) -> list:
+    """表头最多折成两行"""
+    if pdfmetrics.stringWidth(text, font, size) <= width:
+        return [text]
+    for i in range(len(text) - 1, 0, -1):
+        if pdfmetrics.stringWidth(text[:i], font, size) <= width:
+            return [text[:i], _fit(text[i:], font, size, width)]
+    return [_fit(text, font, size, width)]
+
+def _column_widths(df: pd.DataFrame, total: float) -> list:
+    """按估算字符宽度比例分配页面宽度"""
+    est = estimate_col_widths(df, max_w=30)
+    scale = total / max(1, sum(est))
+    return [w * scale for w in est]
+
+def _prepare_cells(df: pd.DataFrame, widths, font_zh, font_ko):
+    """列数组 -> (文本列表, 字体列表)；只对可能超宽的单元格做精确截断"""
+    cols = []
+    for col, w in zip(df.columns, widths):
+        text = df[col].fillna('').astype(str)
+        avail = w - 2 * CELL_PAD
+        if font_ko != font_zh:
+            is_ko = text.str.contains(HANGUL, regex=True).to_numpy()
+        else:
+            is_ko = np.zeros(len(text), dtype=bool)
+        fonts = np.where(is_ko, font_ko, font_zh)
+        values = text.tolist()
+        # 全角字宽约等于字号，字符数 * 字号 <= 可用宽度的一定放得下
+        maybe_long = np.flatnonzero(text.str.len().to_numpy() * FONT_SIZE > avail)
+        for i in maybe_long:
+            values[i] = _fit(values[i], fonts[i], FONT_SIZE, avail)
+        cols.append((values, fonts.tolist()))
+    return cols
+
+def write_work_order_pdf(fp, df: pd.DataFrame, title: str, subtitle: str):
+    """逐页绘制并写入二进制文件对象"""
+    font_zh, font_ko = resolve_font('zh'), resolve_font('ko')
+    page_w, page_h = PAGE_SIZE
+    table_w = page_w - 2 * MARGIN
+    widths = _column_widths(df, table_w)
+    xs = np.concatenate([[MARGIN], MARGIN + np.cumsum(widths)]).tolist()
+    left = [c in LEFT_COLS for c in df.columns]
+
+    if '产品编码' in df.columns and len(df) > 0:
+        gid = group_zebra(group_starts(df['产品编码']))
+    else:
+        gid = np.zeros(len(df), dtype=np.int8)
+
+    cells = _prepare_cells(df, widths, font_zh, font_ko)
+    headers = [_wrap2(str(c), font_zh, HEADER_FONT_SIZE, w - 2 * CELL_PAD) for c, w in zip(df.columns, widths)]
+
+    top = page_h - MARGIN - 34                       # 标题区下沿 = 表头上沿
+    body_top = top - HEAD_ROW_H
+    rows_per_page = max(1, int((body_top - MARGIN - 12) // ROW_H))
+    n_pages = max(1, math.ceil(len(df) / rows_per_page))
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    c = canvas.Canvas(fp, pagesize=PAGE_SIZE, pageCompression=1)
+    c.setTitle(title)
+    line = colors.HexColor('#d8d8d8')
+    zebra = colors.HexColor('#f1f1f1')
+    head = colors.HexColor('#3f3f3f')
+    muted = colors.HexColor('#555555')
+
+    for page in range(n_pages):
+        start = page * rows_per_page
+        stop = min(len(df), start + rows_per_page)
+
+        # 标题区
+        c.setFillColor(colors.black)
+        c.setFont(font_zh, 14)
+        c.drawString(MARGIN, page_h - MARGIN - 14, title)
+        c.setFillColor(muted)
+        c.setFont(font_zh, 8)
+        c.drawString(MARGIN, page_h - MARGIN - 27, subtitle)
+        c.drawRightString(page_w - MARGIN, page_h - MARGIN - 14, f"生成日期：{today}")
+        c.drawRightString(page_w - MARGIN, page_h - MARGIN - 27, f"第 {page + 1} / {n_pages} 页")
+
+        # 表头（每页重复）
+        c.setFillColor(head)
+        c.setStrokeColor(line)
+        c.rect(MARGIN, body_top, table_w, HEAD_ROW_H, stroke=1, fill=1)
+        c.setFillColor(colors.white)
+        c.setFont(font_zh, HEADER_FONT_SIZE)
+        for j, lines in enumerate(headers):
+            cx = (xs[j] + xs[j + 1]) / 2
+            y0 = body_top + HEAD_ROW_H / 2 + (len(lines) - 1) * (HEADER_FONT_SIZE / 2 + 0.5) - HEADER_FONT_SIZE / 3
+            for k, text in enumerate(lines):
+                c.drawCentredString(cx, y0 - k * (HEADER_FONT_SIZE + 1), text)
+
+        # 斑马纹底色
+        c.setFillColor(zebra)
+        for i in range(start, stop):
+            if gid[i] == 1:
+                c.rect(MARGIN, body_top - (i - start + 1) * ROW_H, table_w, ROW_H, stroke=0, fill=1)
+
+        # 单元格文本
+        c.setFillColor(colors.black)
+        current_font = None
+        for j, (values, fonts) in enumerate(cells):
+            cx = (xs[j] + xs[j + 1]) / 2
+            for i in range(start, stop):
+                text = values[i]
+                if not text:
+                    continue
+                if fonts[i] != current_font:
+                    current_font = fonts[i]
+                    c.setFont(current_font, FONT_SIZE)
+                y = body_top - (i - start + 1) * ROW_H + (ROW_H - FONT_SIZE) / 2 + 1
+                if left[j]:
+                    c.drawString(xs[j] + CELL_PAD, y, text)
+                else:
+                    c.drawCentredString(cx, y, text)
+
+        # 网格线
+        bottom = body_top - (stop - start) * ROW_H
+        c.setStrokeColor(line)
+        c.setLineWidth(0.5)
+        for x in xs:
+            c.line(x, bottom, x, body_top + HEAD_ROW_H)
+        for k in range(stop - start + 1):
+            y = body_top - k * ROW_H
+            c.line(MARGIN, y, MARGIN + table_w, y)
+
+        c.showPage()
+    c.save()
+
+def make_work_order_pdf(df: pd.DataFrame, title: str, subtitle: str) -> bytes:
+    """A4 横向可打印 PDF（离线字体）"""
+    buf = io.BytesIO()
+    write_work_order_pdf(buf, df, title, subtitle)
+    return buf.getvalue()
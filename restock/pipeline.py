@@ -0,0 +1,511 @@
+"""分阶段补货流水线：parse → normalize → aggregate → join → compute → render
+
+每个阶段按自身输入的指纹记忆化：
+- parse      : 文件内容哈希 + 列号配置 (ParseCache)
+- normalize  : 单文件指纹 (未命中的文件经 Ingestor 并行解析)
+- aggregate  : 同一来源全部文件指纹 (键驻留为共享 KeySpace 的 int32 编码后汇总)；
+               历史库模式下为窗口内逐日文件指纹 (restock.history)
+- join       : Master + 4 个汇总表指纹
+- compute    : join 指纹 + 参数 (只改周数时只重算这一步)
+- render     : compute 指纹 + 日期
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from restock.budget import BudgetParams, plan_budget
+from restock.cache import ParseCache, get_default_cache
+from restock.history import as_day
+from restock.calc import Params, restock_arrays
+from restock.forecast import forecast_arrays
+from restock.ingest import Ingestor
+from restock.keys import KeySpace
+from restock.profiling import count_rows, current_profiler
+from restock.readers import EXCEL_EXTS, as_source, file_encoding, read_columns, read_header
+from restock.report import ReportTables, build_report_tables
+from restock.schema import MASTER, SCHEMAS, SchemaError, SourceSchema, resolve
+from restock.utils import clean_match_key, clean_num, clean_str
+
+
+MAX_KEYSPACE = 5_000_000
+
+
+class PipelineError(Exception):
+    """可直接展示给用户的错误"""
+
+
+class RunResult(NamedTuple):
+    key: str                   # compute 阶段指纹，下游 render 以此记忆化
+    df_final: pd.DataFrame
+    tables: ReportTables
+    files: list                # 每个输入文件: {'group', 'name', 'encoding', 'bytes'}
+
+
+def _fingerprint(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+# ==========================================
+# 阶段函数（纯函数，不依赖 Streamlit）
+# ==========================================
+def _column_getter(df, positions):
+    """列号 -> Series；positions 为 {原始列号: df中位置}（列裁剪读取时传入），缺列时抛 IndexError"""
+    if positions is None:
+        return lambda idx: df.iloc[:, idx]
+    return lambda idx: df.iloc[:, positions.get(idx, df.shape[1])]
+
+def normalize_master(df_m: pd.DataFrame, positions=None, cols=None) -> pd.DataFrame:
+    """cols：{字段名: 列号}（restock.schema.resolve 的结果），缺省为默认列号"""
+    if df_m.empty:
+        raise PipelineError("❌ 基础表为空或无法解析！")
+    col = _column_getter(df_m, positions)
+    idx = cols or MASTER.defaults()
+    df_base = pd.DataFrame()
+    try:
+        df_base['Shop'] = clean_str(col(idx['Shop']))
+        df_base['Code'] = clean_match_key(col(idx['Code']))
+        df_base['Info_E'] = clean_str(col(idx['Info_E']))
+        df_base['Info_F'] = clean_str(col(idx['Info_F']))
+        df_base['Cost'] = clean_num(col(idx['Cost']))
+        df_base['Orange_ID'] = clean_match_key(col(idx['Orange_ID']))
+        df_base['Inbound_Code'] = clean_match_key(col(idx['Inbound_Code']))
+
+        active_raw = clean_str(col(idx['Active']))
+        df_base['Active'] = active_raw.astype(str).str.contains('Y', case=False, na=False).map(lambda x: 'Y' if x else '')
+    except IndexError:
+        raise PipelineError("❌ 基础表列数不足，请检查列配置！")
+    return df_base
+
+def normalize_source(df: pd.DataFrame, key_idx: int, qty_idx: int, fee_idx=None, name='', positions=None) -> pd.DataFrame:
+    """单个来源文件 -> Key/Qty(/Fee)"""
+    col = _column_getter(df, positions)
+    out = pd.DataFrame()
+    try:
+        out['Key'] = clean_match_key(col(key_idx))
+        out['Qty'] = clean_num(col(qty_idx))
+        if fee_idx is not None:
+            out['Fee'] = clean_num(col(fee_idx))
+    except IndexError:
+        raise PipelineError(f"❌ {name} 列数不足，请检查列配置！")
+    return out
+
+def aggregate(frames, with_fee=False) -> pd.DataFrame:
+    cols = ['Qty', 'Fee'] if with_fee else ['Qty']
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=['Key'] + cols)
+    df = pd.concat(frames, ignore_index=True)
+    return df.groupby('Key')[cols].sum().reset_index()
+
+def aggregate_codes(frames, keyspace: KeySpace, with_fee=False) -> pd.DataFrame:
+    """同一来源各文件的 Key/Qty(/Fee) -> 驻留为共享键空间编码后按整数汇总，返回以 Key(int32编码) 为索引的 Qty(/Fee)"""
+    cols = ['Qty', 'Fee'] if with_fee else ['Qty']
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame({c: np.array([], dtype=float) for c in cols},
+                            index=pd.Index(np.array([], dtype=np.int32), name='Key'))
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    codes = keyspace.encode(df['Key'])
+    out = df[cols].groupby(codes).sum()
+    out.index = pd.Index(out.index.to_numpy(dtype=np.int32), name='Key')
+    return out
+
+def join_sources(df_base, agg_sales_7d, agg_sales_30d, agg_orange, agg_jifeng, keyspace: KeySpace) -> pd.DataFrame:
+    """一次按编码对齐取值：Master 的橙火ID/入库码查成编码后，直接 reindex 各汇总表，缺失补0
+
+    汇总表按 Key 唯一，与原先四次 left merge 结果一致，但不产生中间大表和多余的 Key 列
+    """
+    orange = keyspace.lookup(df_base['Orange_ID'])
+    inbound = keyspace.lookup(df_base['Inbound_Code'])
+
+    def pick(agg, col, codes):
+        return agg[col].reindex(codes, fill_value=0).to_numpy()
+
+    return df_base.assign(
+        Sales_7d=pick(agg_sales_7d, 'Qty', orange),
+        Sales_30d=pick(agg_sales_30d, 'Qty', orange),
+        Stock_Orange=pick(agg_orange, 'Qty', orange),
+        Storage_Fee=pick(agg_orange, 'Fee', orange),
+        Stock_Jifeng=pick(agg_jifeng, 'Qty', inbound),
+    )
+
+def daily_matrix(frames, orange_codes: np.ndarray, keyspace: KeySpace) -> np.ndarray:
+    """逐日 Key/Qty 表 (日期升序) -> (行数, 天数) 销量矩阵，按 Master 橙火ID 编码对齐，当天无销量记 0"""
+    out = np.zeros((len(orange_codes), len(frames)), dtype=np.float32)
+    for j, df in enumerate(frames):
+        agg = aggregate_codes([df], keyspace)
+        out[:, j] = agg['Qty'].reindex(orange_codes, fill_value=0).to_numpy()
+    return out
+
+def compute_restock(df_joined: pd.DataFrame, params: Params, daily=None) -> pd.DataFrame:
+    """预测 + 计算；公式见 restock.forecast / restock.calc，不修改传入的 df_joined
+
+    daily：历史库模式下与 df_joined 行对齐的逐日销量矩阵 (行数, 天数)，供 ewma 预测
+    """
+    fc = forecast_arrays(df_joined['Sales_7d'].to_numpy(), df_joined['Sales_30d'].to_numpy(),
+                         params.forecast, params.forecast_weight, params.forecast_alpha, daily)
+    results = restock_arrays(
+        fc,
+        df_joined['Stock_Orange'].to_numpy(),
+        df_joined['Stock_Jifeng'].to_numpy(),
+        df_joined['Cost'].to_numpy(),
+        df_joined['Active'].astype(str).str.strip().str.upper().eq('Y').to_numpy(),
+        df_joined['Inbound_Code'].astype(str).str.strip().ne('').to_numpy(),
+        params.safety_weeks, params.min_safety_qty, params.orange_safety_weeks, params.redundancy_weeks,
+        params.service_z,
+    )
+    return df_joined.assign(**results)
+
+# ==========================================
+# 读取任务（可在子进程中执行）
+# ==========================================
+_worker_cache = None
+
+def _task_cache(disk_dir):
+    """子进程内的解析缓存；与主进程共享同一磁盘目录"""
+    global _worker_cache
+    if _worker_cache is None:
+        _worker_cache = ParseCache(max_entries=8, disk_dir=disk_dir)
+    return _worker_cache
+
+def _positions(chunk):
+    return {c: i for i, c in enumerate(chunk.columns)}
+
+def _with_encoding(read, name, data):
+    """按前缀探测的编码读取；后文与探测结果不符时用全文探测重读一次"""
+    enc = file_encoding(name, data)
+    try:
+        df = read(enc)
+    except UnicodeDecodeError:
+        enc = file_encoding(name, data, sniff_bytes=None)
+        df = read(enc)
+    df.attrs['source'] = {'name': name, 'encoding': enc, 'bytes': len(data)}
+    return df
+
+def resolve_columns(name: str, data: bytes, schema: SourceSchema) -> dict:
+    """只读表头定位列号 {字段名: 列号}；表头与结构不符时抛 PipelineError，不解析正文"""
+    header = read_header(name, data, None if name.endswith(EXCEL_EXTS) else file_encoding(name, data))
+    if not header:
+        raise PipelineError(f"❌ {schema.label} {name} 为空或无法解析！")
+    try:
+        return resolve(schema, header)
+    except SchemaError as e:
+        raise PipelineError(f"❌ {schema.label} {name} 列不匹配：{e}") from None
+
+def read_master(name: str, data: bytes, cols=None) -> pd.DataFrame:
+    """Master：只读结构里的列，直接产出 df_base"""
+    cols = cols or MASTER.defaults()
+    usecols = list(cols.values())
+
+    def read(enc):
+        chunks = list(read_columns(name, data, usecols, encoding=enc))
+        if not chunks:
+            raise PipelineError("❌ 基础表为空或无法解析！")
+        df_m = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return normalize_master(df_m, _positions(df_m), cols)
+    return _with_encoding(read, name, data)
+
+def read_source_aggregated(name: str, data: bytes, key_idx: int, qty_idx: int, fee_idx=None) -> pd.DataFrame:
+    """来源文件：只读 Key/Qty(/Fee) 列，分块清洗并滚动 groupby-sum，峰值内存只与块大小和 SKU 数有关"""
+    with_fee = fee_idx is not None
+    usecols = [key_idx, qty_idx] + ([fee_idx] if with_fee else [])
+
+    def read(enc):
+        running = aggregate([], with_fee=with_fee)
+        for chunk in read_columns(name, data, usecols, encoding=enc):
+            part = normalize_source(chunk, key_idx, qty_idx, fee_idx, name, _positions(chunk))
+            running = aggregate([running, part], with_fee=with_fee)
+        return running
+    return _with_encoding(read, name, data)
+
+def ingest_file(name: str, data: bytes, spec: tuple, cache=None, disk_dir=None) -> pd.DataFrame:
+    """parse + normalize 单个文件 (列裁剪流式读取)，结果按 内容哈希 + 结构 + 列号 进缓存
+
+    spec = (SourceSchema, 列号)；列号为 resolve_columns 的结果，None 时在此读表头定位。
+    来源文件在此先按 Key 汇总，各文件的汇总结果再在 aggregate 阶段相加（求和满足结合律，结果与整体 groupby 一致）
+    """
+    cache = cache or _task_cache(disk_dir)
+    t0 = time.perf_counter()
+    schema, cols = spec
+    cols = cols or resolve_columns(name, data, schema)
+    config = (schema, tuple(cols.items()))
+    if schema.is_master:
+        df = cache.get_or_parse(data, name, lambda: read_master(name, data, cols), config + ('master',))
+    else:
+        # 可选字段缺列时按 0 计（火箭仓没有仓储费列 = 本月无仓储费）
+        fill = {f.name: 0.0 for f in schema.optional_missing(cols)}
+        df = cache.get_or_parse(data, name, lambda: read_source_aggregated(
+            name, data, cols['Key'], cols['Qty'], cols.get('Fee')).assign(**fill), config + ('aggregated',))
+    # 本次耗时（解析缓存命中时接近 0）
+    df.attrs['source'] = {**(df.attrs.get('source') or {}), 'parse_s': time.perf_counter() - t0,
+                          'note': '；'.join(f"缺少「{f.aliases[0]}」列，按 0 计"
+                                           for f in schema.optional_missing(cols))}
+    return df
+
+
+# ==========================================
+# 记忆化流水线
+# ==========================================
+class Pipeline:
+    """持有各阶段的记忆化结果；同一进程内跨 rerun/会话复用"""
+
+    def __init__(self, cache=None, max_memo=16, ingestor=None):
+        self.cache = cache or get_default_cache()
+        self.max_memo = max_memo
+        self.stage_limits = {'normalize': 512}   # 单文件结果很小，可多留
+        self.ingestor = ingestor or Ingestor()
+        self.keyspace = KeySpace()
+        self._generation = 0       # 键空间每重建一次 +1；aggregate 记忆键带上它，旧编码的结果不会被新键空间取到
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def memo(self, stage: str, key: str, fn, label=None):
+        """label：剖析记录里的阶段名（默认同 stage）"""
+        prof = current_profiler()
+        with self._lock:
+            store = self._memo.setdefault(stage, OrderedDict())
+            if key in store:
+                store.move_to_end(key)
+                value = store[key]
+                if prof is not None:
+                    prof.add_stage(label or stage, 0.0, rows_out=count_rows(value), cached=True)
+                return value
+        if prof is None:
+            value = fn()
+        else:
+            with prof.stage(label or stage) as rec:
+                value = fn()
+                rec['rows_out'] = count_rows(value)
+        self._store(stage, key, value)
+        return value
+
+    def _peek(self, stage, key):
+        with self._lock:
+            store = self._memo.get(stage)
+            if store is not None and key in store:
+                store.move_to_end(key)
+                return store[key]
+        return None
+
+    def _store(self, stage, key, value):
+        limit = self.stage_limits.get(stage, self.max_memo)
+        with self._lock:
+            store = self._memo.setdefault(stage, OrderedDict())
+            store[key] = value
+            while len(store) > limit:
+                store.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self.keyspace = KeySpace()
+            self._generation += 1
+
+    def _check_keyspace(self):
+        """键空间只追加；长期运行累计过大时整体重建（依赖编码的阶段记忆一并作废）
+
+        检查、替换、作废在同一把锁内完成，返回本次运行使用的 (键空间, 代数)；
+        其他线程手上的旧键空间照常用完，其结果按旧代数入记忆，新运行不会命中
+        """
+        with self._lock:
+            if len(self.keyspace) > MAX_KEYSPACE:
+                for stage in ('aggregate', 'join', 'compute', 'render'):
+                    self._memo.pop(stage, None)
+                self.keyspace = KeySpace()
+                self._generation += 1
+            return self.keyspace, self._generation
+
+    def close(self):
+        self.ingestor.shutdown()
+
+    # ---------- 各阶段 ----------
+    def _ingest(self, groups, progress=None):
+        """parse + normalize：未命中记忆的文件统一分发到读取池，按完成顺序回填
+
+        groups: {来源名: (文件列表, SourceSchema)}；返回 {来源名: [(文件指纹, 单文件结果)]}
+        未命中的文件先全部只读表头定位列号，任一文件不匹配即整体报错（列出所有问题），不开始解析正文
+        """
+        plan, results, tasks, sizes = {}, {}, [], []
+        for group, (files, schema) in groups.items():
+            entries = []
+            for src in (as_source(f) for f in files if f is not None):
+                fkey = src.key(schema)
+                entries.append(fkey)
+                if fkey in results:
+                    continue
+                results[fkey] = self._peek('normalize', fkey)
+                if results[fkey] is None:
+                    tasks.append((fkey, (src.name, src.data, schema, None, self.cache.disk_dir)))
+                    sizes.append(len(src.data))
+            plan[group] = entries
+
+        prof = current_profiler()
+        with (prof.stage('schema') if prof is not None else nullcontext({})):
+            errors = []
+            for i, (fkey, (name, data, schema, cache, disk_dir)) in enumerate(tasks):
+                try:
+                    tasks[i] = (fkey, (name, data, (schema, resolve_columns(name, data, schema)), cache, disk_dir))
+                except PipelineError as e:
+                    errors.append(str(e))
+            if errors:
+                raise PipelineError('\n\n'.join(errors))
+
+        total = len(tasks)
+        fresh = {k for k, _ in tasks}
+        if not self.ingestor.use_parallel(total, sum(sizes)):
+            # 串行时直接用主进程的解析缓存
+            tasks = [(k, (n, d, spec, self.cache)) for k, (n, d, spec, _, _) in tasks]
+        names = {k: args[0] for k, args in tasks}
+        with (prof.stage('ingest') if prof is not None else nullcontext({})) as rec:
+            for done, (fkey, value) in enumerate(self.ingestor.run(ingest_file, tasks, sizes), start=1):
+                results[fkey] = value
+                self._store('normalize', fkey, value)
+                if progress:
+                    progress(done, total, names[fkey])
+            rec['rows_out'] = sum(len(v) for v in results.values())
+
+        parts = {g: [(k, results[k]) for k in keys] for g, keys in plan.items()}
+        if prof is not None:
+            for group, entries in parts.items():
+                for fkey, df in entries:
+                    info = df.attrs.get('source') or {}
+                    prof.add_file(group, info.get('name', ''), info.get('encoding', ''), info.get('bytes', 0),
+                                  info.get('parse_s') if fkey in fresh else None, cached=fkey not in fresh)
+        return parts
+
+    @staticmethod
+    def _file_infos(parts):
+        infos = []
+        for group, entries in parts.items():
+            for _, df in entries:
+                info = dict(df.attrs.get('source') or {})
+                infos.append({'group': group, 'name': info.get('name', ''),
+                              'encoding': info.get('encoding', ''), 'bytes': info.get('bytes', 0),
+                              'note': info.get('note', '')})
+        return infos
+
+    def join(self, master, sales_7d, sales_30d, inv_r, inv_j, progress=None):
+        """parse → normalize → aggregate → join，返回 (指纹, 合并表, 文件信息)；与参数无关"""
+        if not sales_7d or not sales_30d:
+            raise PipelineError("❌ 请上传近7天/近30天销售表！")
+        if master is None:
+            raise PipelineError("❌ 请上传基础信息表 (Master)！")
+
+        parts = self._ingest({
+            'master': ([master], MASTER),
+            '7d': (sales_7d, SCHEMAS['7d']),
+            '30d': (sales_30d, SCHEMAS['30d']),
+            'r': (inv_r or [], SCHEMAS['inv_r']),
+            'j': (inv_j or [], SCHEMAS['inv_j']),
+        }, progress)
+
+        m_key, df_base = parts['master'][0]
+        sources = {}
+        for group in ('7d', '30d', 'r', 'j'):
+            file_keys = [k for k, _ in parts[group]]
+            frames = [v for _, v in parts[group]]
+            sources[group] = (_fingerprint('aggregate', file_keys, group == 'r'), lambda frames=frames: frames)
+        join_key, df_joined = self._aggregate_join(m_key, df_base, sources)
+        return join_key, df_joined, self._file_infos(parts)
+
+    def _aggregate_join(self, m_key, df_base, sources):
+        """aggregate → join；sources = {组: (汇总指纹, 返回 Key/Qty(/Fee) 表列表的函数)}，记忆命中时不调用"""
+        keyspace, generation = self._check_keyspace()
+        keys, aggs = {}, {}
+        for group in ('7d', '30d', 'r', 'j'):
+            keys[group], load = sources[group]
+            with_fee = group == 'r'
+            aggs[group] = self.memo('aggregate', f"{generation}:{keys[group]}",
+                                    lambda: aggregate_codes(load(), keyspace, with_fee=with_fee),
+                                    label=f'aggregate:{group}')
+
+        join_key = _fingerprint('join', m_key, keys['7d'], keys['30d'], keys['r'], keys['j'])
+        df_joined = self.memo('join', join_key, lambda: join_sources(df_base, aggs['7d'], aggs['30d'], aggs['r'], aggs['j'], keyspace))
+        return join_key, df_joined
+
+    # ---------- 历史库（每日增量） ----------
+    def ingest_day(self, store, day, sales=(), inv_r=(), inv_j=(), progress=None) -> dict:
+        """把某天的日销量表 / 库存快照解析后写入历史库（只写这一天）；返回 {类别: SKU数}
+
+        日销量表与近7天销售表同结构 (SCHEMAS['7d'])
+        """
+        groups = {}
+        if sales:
+            groups['sales'] = (sales, SCHEMAS['7d'])
+        if inv_r:
+            groups['inv_r'] = (inv_r, SCHEMAS['inv_r'])
+        if inv_j:
+            groups['inv_j'] = (inv_j, SCHEMAS['inv_j'])
+        parts = self._ingest(groups, progress)
+        return {kind: store.append_day(kind, day, [v for _, v in entries]) for kind, entries in parts.items()}
+
+    def join_history(self, master, store, day=None, windows=(7, 30), progress=None):
+        """Master + 历史库：销量取截至 day 的滚动窗口，库存取 day 当天或之前最近的快照"""
+        if master is None:
+            raise PipelineError("❌ 请上传基础信息表 (Master)！")
+        parts = self._ingest({'master': ([master], MASTER)}, progress)
+        m_key, df_base = parts['master'][0]
+        files = self._file_infos(parts)
+
+        sources = {}
+        for group, n in zip(('7d', '30d'), windows):
+            days = store.window_days('sales', day, n)
+            if group == '7d' and not days:
+                raise PipelineError(f"❌ 历史库中没有截至 {as_day(day)} 的近{n}天销量，请先导入日销量！")
+            sources[group] = (_fingerprint('history', 'sales', n, store.fingerprint('sales', days)),
+                              lambda n=n: [store.window('sales', day, n)])
+            files.append({'group': group, 'name': f"history:sales {len(days)}/{n}天",
+                          'encoding': 'parquet', 'bytes': 0})
+        for group, kind in (('r', 'inv_r'), ('j', 'inv_j')):
+            snap = store.snapshot_day(kind, day)
+            sources[group] = (_fingerprint('history', kind, store.fingerprint(kind, [snap] if snap else [])),
+                              lambda kind=kind: [store.snapshot(kind, day)])
+            files.append({'group': group, 'name': f"history:{kind} {snap.isoformat() if snap else '-'}",
+                          'encoding': 'parquet', 'bytes': 0})
+
+        join_key, df_joined = self._aggregate_join(m_key, df_base, sources)
+        return join_key, df_joined, files
+
+    def daily_history(self, store, day, days, join_key, df_joined):
+        """窗口内已入库各天的销量矩阵（与 df_joined 行对齐），返回 (指纹, 矩阵)；缺失的天不占列"""
+        day_list = store.window_days('sales', day, days)
+        key = _fingerprint('daily', join_key, store.fingerprint('sales', day_list))
+        keyspace = self.keyspace
+        matrix = self.memo('daily', key, lambda: daily_matrix(
+            [store.day_frame('sales', d) for d in day_list], keyspace.lookup(df_joined['Orange_ID']), keyspace))
+        return key, matrix
+
+    def run_history(self, master, store, day, params: Params, windows=(7, 30), progress=None) -> RunResult:
+        """逐日销量按较长窗口取，供 ewma 预测"""
+        join_key, df_joined, files = self.join_history(master, store, day, windows, progress)
+        daily = self.daily_history(store, day, max(windows), join_key, df_joined)
+        return self._compute(join_key, df_joined, files, params, daily)
+
+    def run(self, master, sales_7d, sales_30d, inv_r, inv_j, params: Params, progress=None) -> RunResult:
+        """progress(已完成, 总数, 文件名)：每解析完一个文件回调一次（全部命中记忆时不回调）"""
+        join_key, df_joined, files = self.join(master, sales_7d, sales_30d, inv_r, inv_j, progress)
+        return self._compute(join_key, df_joined, files, params)
+
+    def plan_budget(self, res: RunResult, params: Params, bp: BudgetParams) -> RunResult:
+        """在计算结果上做预算分配，返回附带预算采购单的结果（指纹随预算参数变化，产物记忆化随之区分）"""
+        key = _fingerprint('budget', res.key, tuple(bp))
+        plan = self.memo('budget', key, lambda: plan_budget(res.df_final, params.safety_weeks, bp))
+        return res._replace(key=key, tables=res.tables._replace(plan=plan))
+
+    def _compute(self, join_key, df_joined, files, params: Params, daily=None) -> RunResult:
+        """daily：(指纹, 逐日销量矩阵) 或 None"""
+        daily_key, matrix = daily or ('', None)
+        key = _fingerprint('compute', join_key, tuple(params), daily_key)
+
+        def compute():
+            df_final = compute_restock(df_joined, params, matrix)
+            return df_final, build_report_tables(df_final, params)
+
+        df_final, tables = self.memo('compute', key, compute)
+        return RunResult(key, df_final, tables, files)
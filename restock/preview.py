@@ -0,0 +1,96 @@
+"""看板预览：筛选/排序/分页都在服务端完成，只对当前页生成样式，渲染成本与页大小成正比"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from restock.report import COUNT_COLS, MONEY_COLS
+
+PAGE_SIZES = [50, 100, 200, 500]
+
+# 快捷筛选：标签 -> 该列 > 0 的行（None = 全部）
+PREVIEW_FILTERS = {
+    '全部': None,
+    '需采购': 'Restock_Qty',
+    '冗余': 'Redundancy_Qty',
+    '需调拨': 'Orange_Transfer_Qty',
+    '库龄预警': 'Storage_Fee',
+}
+
+ZEBRA_CSS = 'background-color: #f7f7f7'
+BOLD_COLS = ['Code', 'Info_F']
+HIGHLIGHT_RULES = {
+    'Restock_Qty': 'background-color: #ffcccc; color: #b71c1c; font-weight: bold',
+    'Restock_Money': 'background-color: #ffcccc; color: #b71c1c',
+    'Redundancy_Qty': 'background-color: #ffe0b2; color: #e65100; font-weight: bold',
+    'Redundancy_Money': 'background-color: #ffe0b2; color: #e65100',
+    'Orange_Transfer_Qty': 'background-color: #e3f2fd; color: #0d47a1; font-weight: bold',
+    'Storage_Fee': 'background-color: #e1bee7; color: #4a148c; font-weight: bold',
+}
+
+
+class PreviewPage(NamedTuple):
+    frame: pd.DataFrame        # 当前页（内部列名，Shop/Code 已视觉置空）
+    zebra: np.ndarray          # 当前页各行斑马纹
+    page: int                  # 1 起
+    n_pages: int
+    n_rows: int                # 筛选后总行数
+
+
+def select_rows(df: pd.DataFrame, filter_col=None, sort_col=None, ascending=True) -> pd.DataFrame:
+    """服务端筛选 + 稳定排序（数值列直接比较）"""
+    if filter_col:
+        df = df[df[filter_col].to_numpy() > 0]
+    if sort_col:
+        df = df.sort_values(sort_col, ascending=ascending, kind='stable')
+    return df
+
+def paginate(df: pd.DataFrame, page: int, page_size: int) -> PreviewPage:
+    """分组/斑马纹按整张筛选结果计算，再切出当前页"""
+    n_rows = len(df)
+    n_pages = max(1, -(-n_rows // page_size))
+    page = min(max(1, int(page)), n_pages)
+    start, stop = (page - 1) * page_size, min(n_rows, page * page_size)
+
+    codes = df['Code'].astype(str).to_numpy()
+    first = np.ones(n_rows, dtype=bool)
+    if n_rows > 1:
+        first[1:] = codes[1:] != codes[:-1]
+    zebra = (np.cumsum(first) % 2) == 1
+
+    part = df.iloc[start:stop]
+    first_p = first[start:stop].copy()
+    if len(first_p):
+        first_p[0] = True      # 每页首行总显示店铺/编码
+    part = part.assign(Shop=part['Shop'].where(first_p, ''), Code=part['Code'].where(first_p, ''))
+    return PreviewPage(part, zebra[start:stop], page, n_pages, n_rows)
+
+def _css_join(a: np.ndarray, b) -> np.ndarray:
+    """逐元素拼接两组 CSS（后者覆盖前者同名属性，与 Styler 多次 apply 叠加效果一致）"""
+    b = np.broadcast_to(np.asarray(b, dtype=object), a.shape)
+    out = np.where(a == '', b, a + '; ' + b)
+    return np.where(b == '', a, out)
+
+def page_css(frame: pd.DataFrame, zebra: np.ndarray) -> np.ndarray:
+    """当前页的 CSS 矩阵：斑马纹 + 加粗列 + 正数高亮，全部用布尔掩码一次算出"""
+    cols = list(frame.columns)
+    css = np.repeat(np.where(zebra, ZEBRA_CSS, '').astype(object)[:, None], len(cols), axis=1)
+    for c in BOLD_COLS:
+        if c in cols:
+            j = cols.index(c)
+            css[:, j] = _css_join(css[:, j], 'font-weight: bold')
+    for c, rule in HIGHLIGHT_RULES.items():
+        if c in cols:
+            j = cols.index(c)
+            mask = frame[c].to_numpy() > 0
+            css[:, j] = _css_join(css[:, j], np.where(mask, rule, ''))
+    return css
+
+def style_page(page: PreviewPage, tables):
+    """只给当前页生成 Styler（中文表头 + 一次性 CSS 矩阵 + 数值格式）"""
+    hdr = tables.headers
+    vis = tables.display(page.frame)
+    css = pd.DataFrame(page_css(page.frame, page.zebra), index=vis.index, columns=vis.columns)
+    fmt_map = {hdr[c]: '{:.0f}' for c in COUNT_COLS if hdr.get(c) in vis.columns}
+    fmt_map.update({hdr[c]: '{:,.0f}' for c in MONEY_COLS if hdr.get(c) in vis.columns})
+    return vis.style.apply(lambda _: css, axis=None).format(fmt_map)
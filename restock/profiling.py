@@ -0,0 +1,182 @@
+"""运行剖析：各阶段耗时 / 行数 / 内存峰值 + 逐文件解析耗时与编码，可导出 JSON，可选 cProfile/pyinstrument
+
+用法：
+    prof = Profiler(memory=True, engine='cprofile')
+    with prof.activate():
+        res = pipeline.run(...)            # Pipeline.memo / _ingest 自动记录
+        with prof.stage('render'):
+            ...
+    prof.to_json(); prof.hot_paths()
+
+tracemalloc / cProfile 是进程级的：开了 memory 或 engine 的激活在进程内串行（并发任务排队），
+互不清零峰值、不抢剖析钩子；activate(wait=False) 不排队，被占用时本次只计时；只计时的激活不受影响
+"""
+import contextvars
+import io
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+_current = contextvars.ContextVar('restock_profiler', default=None)
+_exclusive = threading.RLock()   # 进程级剖析 (tracemalloc / cProfile) 同一时刻只允许一个激活
+
+
+def current_profiler():
+    """当前上下文中激活的 Profiler；未激活时为 None（各埋点直接跳过）"""
+    return _current.get()
+
+def rss_peak_mb():
+    """进程常驻内存峰值 (MB)；平台不支持时 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位 KB，macOS 单位字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def count_rows(value):
+    """DataFrame / 元组中首个 DataFrame 的行数"""
+    if isinstance(value, tuple):
+        value = next((v for v in value if hasattr(v, 'shape')), None)
+    shape = getattr(value, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+class Profiler:
+    """stages: [{stage, wall_s, rows_in, rows_out, cached, py_peak_mb, rss_peak_mb}]；files: 逐文件解析记录"""
+
+    def __init__(self, memory=False, engine=None):
+        """memory=True：tracemalloc 统计每阶段 Python 分配峰值（有额外开销）
+        engine：None / 'cprofile' / 'pyinstrument'（未安装时退回 cprofile）
+        """
+        self.memory = memory
+        self.engine = engine
+        self.stages = []
+        self.files = []
+        self._profile = None
+        self._t0 = None
+        self._traced = False       # 本剖析器持有进程级剖析时才读/清 tracemalloc 峰值
+        self.total_s = 0.0
+
+    # ---------- 激活 ----------
+    @contextmanager
+    def activate(self, wait=True):
+        """wait=False：其他线程正在做进程级剖析时不等待，本次激活只记录耗时/行数"""
+        exclusive = bool(self.memory or self.engine) and _exclusive.acquire(blocking=wait)
+        token = _current.set(self)
+        traced, started_trace = self._traced, False
+        try:
+            if exclusive:
+                if self.memory and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    started_trace = True
+                self._traced = self.memory
+                self._start_engine()
+            self._t0 = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self.total_s += time.perf_counter() - self._t0
+                if exclusive:
+                    self._stop_engine()
+        finally:
+            if started_trace:
+                tracemalloc.stop()
+            self._traced = traced
+            _current.reset(token)
+            if exclusive:
+                _exclusive.release()
+
+    def _start_engine(self):
+        # 多次 activate（如 UI 分段激活）累积到同一个剖析器
+        if self._profile is not None:
+            if self.engine == 'pyinstrument':
+                self._profile.start()
+            else:
+                self._profile.enable()
+            return
+        if self.engine == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler as _Pyinstrument
+                self._profile = _Pyinstrument()
+                self._profile.start()
+                return
+            except ImportError:
+                self.engine = 'cprofile'
+        if self.engine == 'cprofile':
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def _stop_engine(self):
+        if self._profile is None:
+            return
+        if self.engine == 'pyinstrument':
+            self._profile.stop()
+        else:
+            self._profile.disable()
+
+    # ---------- 记录 ----------
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """记录一个阶段；在 with 体内给 rec['rows_out'] 赋值即可记录输出行数"""
+        rec = {'stage': name, 'wall_s': 0.0, 'rows_in': rows_in, 'rows_out': None, 'cached': False}
+        if self._traced and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec['wall_s'] = round(time.perf_counter() - t0, 4)
+            if self._traced and tracemalloc.is_tracing():
+                rec['py_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            rec['rss_peak_mb'] = rss_peak_mb()
+            self.stages.append(rec)
+
+    def add_stage(self, name, wall_s, **extra):
+        """直接追加一条已测好的记录（如子进程里渲染的产物耗时）"""
+        self.stages.append({'stage': name, 'wall_s': round(wall_s, 4), **extra})
+
+    def add_file(self, group, name, encoding, nbytes, parse_s, cached=False):
+        self.files.append({'group': group, 'name': name, 'encoding': encoding, 'bytes': nbytes,
+                           'parse_s': round(parse_s, 4) if parse_s is not None else None, 'cached': cached})
+
+    # ---------- 输出 ----------
+    def summary(self) -> dict:
+        return {
+            'total_s': round(self.total_s, 4),
+            'rss_peak_mb': rss_peak_mb(),
+            'stages': list(self.stages),
+            'files': list(self.files),
+        }
+
+    def to_json(self, indent=2) -> str:
+        return json.dumps(self.summary(), ensure_ascii=False, indent=indent)
+
+    def hot_paths(self, limit=30) -> str:
+        """剖析器热点（文本）；未开启剖析器时为空串"""
+        if self._profile is None:
+            return ''
+        if self.engine == 'pyinstrument':
+            return self._profile.output_text(unicode=True, color=False)
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def dump_stats(self, path):
+        """cProfile 原始数据 (.prof，可用 snakeviz 等查看) / pyinstrument HTML"""
+        if self._profile is None:
+            return
+        if self.engine == 'pyinstrument':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profile.output_html())
+        else:
+            self._profile.dump_stats(path)
@@ -0,0 +1,209 @@
+"""文件读取：统一 Streamlit 上传文件 / 本地文件，解析结果走 ParseCache
+
+- parse_file  : 整表读取 (所有列，dtype=str)；只作 read_columns / read_header 认不出的文件的回退
+- read_columns: 列裁剪 + 分块流式读取，只加载流水线用到的列号；内存与文件大小无关
+- read_header : 只读表头行，供 restock.schema 定位列号
+"""
+import codecs
+import io
+import math
+import os
+
+import pandas as pd
+
+from restock.cache import content_key
+
+
+class SourceFile:
+    """内存中的输入文件 (文件名 + 原始字节)"""
+    __slots__ = ('name', 'data')
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.data = data
+
+    @classmethod
+    def from_upload(cls, f):
+        f.seek(0)
+        return cls(f.name, f.read())
+
+    @classmethod
+    def from_path(cls, path):
+        with open(path, 'rb') as fh:
+            return cls(os.path.basename(path), fh.read())
+
+    def key(self, config=()):
+        return content_key(self.data, self.name, config)
+
+
+def as_source(f):
+    if f is None or isinstance(f, SourceFile):
+        return f
+    if isinstance(f, (str, os.PathLike)):
+        return SourceFile.from_path(f)
+    return SourceFile.from_upload(f)
+
+CSV_ENCODINGS = ['utf-8', 'utf-8-sig', 'cp949', 'euc-kr', 'gbk', 'latin1']
+EXCEL_EXTS = ('.xlsx', '.xls', '.xlsm')
+DEFAULT_CHUNK_ROWS = 50_000
+SNIFF_BYTES = 256 * 1024   # 编码探测只读的前缀长度
+
+# 与 pandas 默认 na_values 一致，保证流式读取与 read_excel(dtype=str) 结果相同
+_NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+
+def parse_file(name: str, data: bytes) -> pd.DataFrame:
+    if name.endswith(EXCEL_EXTS):
+        try:
+            return pd.read_excel(io.BytesIO(data), dtype=str, engine='openpyxl')
+        except:
+            return pd.DataFrame()
+    for enc in dict.fromkeys([detect_encoding(data)] + CSV_ENCODINGS):
+        try:
+            return pd.read_csv(io.BytesIO(data), dtype=str, encoding=enc)
+        except ValueError:   # 含 UnicodeDecodeError / ParserError / EmptyDataError
+            continue
+    return pd.DataFrame()
+
+
+# ==========================================
+# 列裁剪 + 分块流式读取
+# ==========================================
+def detect_encoding(data: bytes, sniff_bytes=SNIFF_BYTES) -> str:
+    """只看前 sniff_bytes 字节：先认 BOM，再按 CSV_ENCODINGS 顺序试解码；sniff_bytes=None 时检查全文"""
+    if data.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    sample = data
+    if sniff_bytes is not None and len(data) > sniff_bytes:
+        # 截到最后一个换行，避免切断多字节字符（utf-8/cp949/gbk 的多字节序列里不会出现 0x0A）
+        sample = data[:sniff_bytes]
+        cut = sample.rfind(b'\n')
+        if cut > 0:
+            sample = sample[:cut + 1]
+    for enc in CSV_ENCODINGS:
+        if enc == 'utf-8-sig':
+            continue
+        try:
+            sample.decode(enc)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return 'latin1'
+
+def file_encoding(name: str, data: bytes, sniff_bytes=SNIFF_BYTES) -> str:
+    """CSV 返回探测到的编码；Excel 返回 'xlsx'"""
+    return 'xlsx' if name.endswith(EXCEL_EXTS) else detect_encoding(data, sniff_bytes)
+
+def _excel_cell(v):
+    """openpyxl 单元格值 -> 与 read_excel(dtype=str) 相同的字符串/NaN"""
+    if v is None:
+        return math.nan
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    v = str(v)
+    return math.nan if v in _NA_STRINGS else v
+
+def _iter_csv_columns(data, usecols, chunksize, enc):
+    header = pd.read_csv(io.BytesIO(data), dtype=str, encoding=enc, nrows=0)
+    present = sorted(c for c in set(usecols) if 0 <= c < header.shape[1])
+    if not present:
+        return
+    reader = pd.read_csv(io.BytesIO(data), dtype=str, encoding=enc, usecols=present, chunksize=chunksize)
+    for chunk in reader:
+        chunk.columns = present
+        yield chunk
+
+def _iter_excel_columns(data, usecols, chunksize):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()   # 部分导出文件的 dimension 不可靠
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        present = sorted(c for c in set(usecols) if 0 <= c < len(header))
+        if not present:
+            return
+
+        buf = {c: [] for c in present}
+        blank_run = 0   # 连续整行空白：与 read_excel 一致，末尾空行丢弃，中间空行保留
+        for row in rows:
+            if all(v is None for v in row):
+                blank_run += 1
+                continue
+            for _ in range(blank_run):
+                for c in present:
+                    buf[c].append(math.nan)
+            blank_run = 0
+            n = len(row)
+            for c in present:
+                buf[c].append(_excel_cell(row[c]) if c < n else math.nan)
+            if len(buf[present[0]]) >= chunksize:
+                yield pd.DataFrame(buf, columns=present, dtype=object)
+                buf = {c: [] for c in present}
+        if buf[present[0]]:
+            yield pd.DataFrame(buf, columns=present, dtype=object)
+    finally:
+        wb.close()
+
+def _excel_header(data):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        return next(ws.iter_rows(values_only=True), None) or ()
+    finally:
+        wb.close()
+
+def read_header(name: str, data: bytes, encoding=None) -> list:
+    """只读第一行 (表头)，不解析正文；返回各列表头字符串，空单元格为 ''，空文件为 []
+
+    列数与 read_columns 判断列是否存在时用的表头宽度一致
+    """
+    if name.endswith(EXCEL_EXTS):
+        try:
+            row = _excel_header(data)
+        except Exception:
+            row = parse_file(name, data).columns   # 同 read_columns：非标准 xlsx 整表读取
+        return ['' if v is None else str(v) for v in row]
+    try:
+        row = pd.read_csv(io.BytesIO(data), header=None, nrows=1, dtype=str,
+                          encoding=encoding or detect_encoding(data), keep_default_na=False)
+    except pd.errors.EmptyDataError:
+        return []
+    return list(row.iloc[0]) if len(row) else []
+
+def read_columns(name: str, data: bytes, usecols, chunksize=DEFAULT_CHUNK_ROWS, encoding=None):
+    """只读取 usecols 指定的列号，按 chunksize 行分块产出
+
+    每块的列名就是原始列号 (int)；文件里不存在的列号直接缺省，由调用方决定报错或补零。
+    CSV 的 encoding 缺省时按前缀探测；探测结果与后文不符时读取中途会抛 UnicodeDecodeError
+    """
+    if name.endswith(EXCEL_EXTS):
+        started = False
+        try:
+            for chunk in _iter_excel_columns(data, usecols, chunksize):
+                started = True
+                yield chunk
+        except Exception:
+            if started:
+                raise
+            # 非标准 xlsx (加密/旧格式等) 退回整表读取
+            df = parse_file(name, data)
+            present = [c for c in sorted(set(usecols)) if c < df.shape[1]]
+            if present and not df.empty:
+                out = df.iloc[:, present]
+                out.columns = present
+                yield out
+        return
+    yield from _iter_csv_columns(data, usecols, chunksize, encoding or detect_encoding(data))
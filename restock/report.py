@@ -0,0 +1,95 @@
+"""输出模型：各报表保持内部英文列名 + 数值 dtype，中文表头只在展示/导出时套用"""
+from typing import NamedTuple
+
+import pandas as pd
+
+from restock.calc import Params
+
+# 基础导出列（保持原结构，不含30天）
+COLS_EXPORT_BASE = [
+    'Shop', 'Code', 'Info_E', 'Info_F', 'Cost', 'Orange_ID', 'Inbound_Code',
+    'Sales_7d', 'Stock_Orange', 'Stock_Jifeng', 'Total_Stock', 'Safety',
+    'Restock_Qty', 'Restock_Money', 'Redundancy_Std', 'Redundancy_Qty',
+    'Redundancy_Money', 'Orange_Safety_Std', 'Orange_Transfer_Qty', 'Storage_Fee'
+]
+
+# 插入“30天销量”，落在 7天销量 与 橙火库存 中间
+COLS_WITH_30D = COLS_EXPORT_BASE[:COLS_EXPORT_BASE.index('Sales_7d') + 1] + ['Sales_30d'] + \
+    COLS_EXPORT_BASE[COLS_EXPORT_BASE.index('Sales_7d') + 1:]
+
+# Sheet1/展示专用：再插入“在做(Y)”列，30天销量后接周预测及置信带
+FORECAST_COLS = ['Forecast_Week', 'Forecast_Lo', 'Forecast_Hi']
+_AFTER_30D = COLS_WITH_30D.index('Sales_30d') + 1
+COLS_SHEET1 = COLS_WITH_30D[:1] + ['Active'] + COLS_WITH_30D[1:_AFTER_30D] + FORECAST_COLS + COLS_WITH_30D[_AFTER_30D:]
+
+# 数值列（预览格式化用）
+COUNT_COLS = ['Stock_Orange', 'Stock_Jifeng', 'Total_Stock', 'Sales_7d', 'Sales_30d', 'Restock_Qty', 'Redundancy_Qty',
+              'Orange_Transfer_Qty', 'Safety', 'Redundancy_Std', 'Orange_Safety_Std', 'Plan_Qty'] + FORECAST_COLS
+MONEY_COLS = ['Restock_Money', 'Cost', 'Redundancy_Money', 'Storage_Fee', 'Plan_Money']
+
+
+def header_map(params: Params) -> dict:
+    """内部列名 -> 中文表头（含随参数变化的三列）"""
+    min_safety_qty, redundancy_weeks = params.min_safety_qty, params.redundancy_weeks
+    return {
+        'Shop': '店铺名称',
+        'Active': '在做(Y)',
+        'Code': '产品编码',
+        'Info_E': '基础信息',
+        'Info_F': 'SKU名称',
+        'Cost': '采购单价',
+        'Orange_ID': '橙火ID',
+        'Inbound_Code': '入库码',
+        'Sales_7d': '7天销量',
+        'Sales_30d': '30天销量',
+        'Forecast_Week': '预测周销量',
+        'Forecast_Lo': '预测下沿',
+        'Forecast_Hi': '预测上沿',
+        'Stock_Orange': '橙火库存',
+        'Stock_Jifeng': '极风库存',
+        'Total_Stock': '库存合计',
+        'Safety': f'总安全库存(有码>{min_safety_qty})',
+        'Restock_Qty': '建议采购数',
+        'Restock_Money': '预计采购总额(RMB)',
+        'Redundancy_Std': f'冗余标准({redundancy_weeks}周)',
+        'Redundancy_Qty': '冗余数量',
+        'Redundancy_Money': '冗余资金',
+        'Orange_Safety_Std': f'橙火安全库存(有码>{min_safety_qty})',
+        'Orange_Transfer_Qty': '建议调拨数量',
+        'Storage_Fee': '本月仓储费(预警)',
+        'Cover_Weeks': '当前覆盖周数',
+        'Plan_Qty': '预算采购数',
+        'Plan_Money': '预算采购额(RMB)',
+        'Plan_Cover_Weeks': '采购后覆盖周数',
+    }
+
+
+class ReportTables(NamedTuple):
+    sheet1: pd.DataFrame       # 补货计算表 (含在做列 + 30天销量)，也用于预览
+    buy: pd.DataFrame          # 采购单 (原结构)
+    buy_with30: pd.DataFrame   # 采购单 (插入30天销量)，用于sheet2 + 采购工单
+    trans: pd.DataFrame        # 调拨单
+    fee: pd.DataFrame          # 库龄预警单
+    headers: dict              # 内部列名 -> 中文表头
+    plan: object = None        # budget.BudgetPlan：预算采购单（开启预算模式时）
+
+    def display(self, df: pd.DataFrame) -> pd.DataFrame:
+        """套用中文表头（不复制数据）"""
+        return df.rename(columns=self.headers)
+
+
+def build_report_tables(df_final: pd.DataFrame, params: Params) -> ReportTables:
+    """按原逻辑筛选采购/调拨/预警表；筛选条件直接在数值列上做"""
+    df_sheet1 = df_final[COLS_SHEET1]
+    with30 = df_final[COLS_WITH_30D]
+    base = df_final[COLS_EXPORT_BASE]
+
+    buy_mask = df_final['Restock_Qty'].to_numpy() > 0
+    return ReportTables(
+        sheet1=df_sheet1,
+        buy=base[buy_mask],
+        buy_with30=with30[buy_mask],
+        trans=base[df_final['Orange_Transfer_Qty'].to_numpy() > 0],
+        fee=base[df_final['Storage_Fee'].to_numpy() > 0],
+        headers=header_map(params),
+    )
@@ -0,0 +1,148 @@
+"""来源表结构注册表：按表头名 (韩/中/英别名) 定位各字段的列号，认不出表头时回退到 config.py 的默认列号
+
+每个文件只读表头行解析一次列号，不解析正文；缺列 / 列位错乱的文件在解析前直接拒绝，
+避免整轮解析、导出后才发现数据错位。
+
+- 表头单元格按 去空白 + 忽略大小写 与别名比对
+- 默认列号处的表头就是别名之一 → 用默认列号；否则取唯一匹配别名的列，匹配到多列时判为歧义（不猜）
+- 没有任何列匹配别名 → 回退默认列号；但该列表头若是其他字段的别名（列位错乱）或文件列数不够，判为缺列
+- 可选字段 (optional) 定位不到时不报错，结果里不含该字段，由调用方补 0 并提示
+- 新来源 / 新别名：register(SourceSchema(...))；结构本身参与解析缓存键，改别名后旧缓存自动失效
+"""
+import re
+from typing import NamedTuple
+
+from restock.config import (
+    IDX_M_CODE, IDX_M_SHOP, IDX_M_COL_E, IDX_M_COL_F, IDX_M_COST, IDX_M_ORANGE, IDX_M_INBOUND, IDX_M_ACTIVE,
+    IDX_7D_SKU, IDX_7D_QTY, IDX_30D_SKU, IDX_30D_QTY,
+    IDX_INV_R_SKU, IDX_INV_R_QTY, IDX_INV_R_FEE, IDX_INV_J_BAR, IDX_INV_J_QTY,
+)
+
+
+class SchemaError(ValueError):
+    """文件表头与结构不符（缺列 / 列位错乱）"""
+
+
+class Field(NamedTuple):
+    name: str                  # 内部字段名 (Master 为 df_base 列名；来源表为 Key/Qty/Fee)
+    index: int                 # 默认列号，表头认不出时使用
+    aliases: tuple = ()        # 表头别名
+    optional: bool = False     # 缺列时不拒绝文件（如火箭仓仓储费，缺了按 0 计）
+
+
+class SourceSchema(NamedTuple):
+    kind: str                  # 'master' / '7d' / '30d' / 'inv_r' / 'inv_j' ...
+    label: str                 # 报错时展示的来源名
+    fields: tuple              # (Field, ...)
+
+    @property
+    def is_master(self) -> bool:
+        return self.kind == 'master'
+
+    def field(self, name: str):
+        return next((f for f in self.fields if f.name == name), None)
+
+    def optional_missing(self, cols: dict) -> list:
+        """resolve 结果里没有定位到的可选字段"""
+        return [f for f in self.fields if f.optional and f.name not in cols]
+
+    def defaults(self) -> dict:
+        """{字段名: 默认列号}"""
+        return {f.name: f.index for f in self.fields}
+
+
+# ==========================================
+# 内置结构
+# ==========================================
+_SKU = ('옵션ID', '옵션 ID', '옵션아이디', 'SKU', 'SKU ID', 'SKU/ID', 'Option ID', 'OptionID')
+_SALES_QTY = ('판매수량', '판매량', '销售数量', '销量', 'Sales Qty', 'Units Sold', 'Sales')
+_STOCK_QTY = ('수량', '재고수량', '재고', '数量', '库存数量', 'Qty', 'Quantity', 'Stock')
+
+MASTER = SourceSchema('master', '基础表', (
+    Field('Code', IDX_M_CODE, ('产品编码', '商品编码', '상품코드', 'Product Code')),
+    Field('Shop', IDX_M_SHOP, ('店铺', '店铺名称', '스토어', 'Shop', 'Store')),
+    Field('Orange_ID', IDX_M_ORANGE, ('橙火ID', '옵션ID', 'Orange ID', 'Option ID')),
+    Field('Info_E', IDX_M_COL_E, ('基础信息E', '基础信息', 'Info')),
+    Field('Info_F', IDX_M_COL_F, ('SKU名称', '商品名称', '상품명', 'SKU Name')),
+    Field('Cost', IDX_M_COST, ('采购单价', '单价', '매입단가', 'Cost', 'Unit Cost')),
+    Field('Inbound_Code', IDX_M_INBOUND, ('入库码', '条码', '바코드', 'Inbound Code', 'Barcode')),
+    Field('Active', IDX_M_ACTIVE, ('是否在做', '在做', '진행여부', 'Active')),
+))
+SALES_7D = SourceSchema('7d', '近7天销售表', (
+    Field('Key', IDX_7D_SKU, _SKU),
+    Field('Qty', IDX_7D_QTY, _SALES_QTY),
+))
+SALES_30D = SourceSchema('30d', '近30天销售表', (
+    Field('Key', IDX_30D_SKU, _SKU),
+    Field('Qty', IDX_30D_QTY, _SALES_QTY),
+))
+INV_R = SourceSchema('inv_r', '火箭仓库存表', (
+    Field('Key', IDX_INV_R_SKU, _SKU),
+    Field('Qty', IDX_INV_R_QTY, _STOCK_QTY),
+    Field('Fee', IDX_INV_R_FEE, ('보관료', '월 보관료', '이번달 보관료', '本月仓储费', '仓储费', 'Storage Fee'),
+          optional=True),
+))
+INV_J = SourceSchema('inv_j', '极风库存表', (
+    Field('Key', IDX_INV_J_BAR, ('条码', '入库码', '바코드', 'Barcode', 'Inbound Code')),
+    Field('Qty', IDX_INV_J_QTY, _STOCK_QTY),
+))
+
+SCHEMAS = {s.kind: s for s in (MASTER, SALES_7D, SALES_30D, INV_R, INV_J)}
+
+
+def register(schema: SourceSchema) -> SourceSchema:
+    """新增或替换一种来源结构（同 kind 覆盖）"""
+    SCHEMAS[schema.kind] = schema
+    return schema
+
+def get_schema(kind: str) -> SourceSchema:
+    try:
+        return SCHEMAS[kind]
+    except KeyError:
+        raise SchemaError(f"未知来源结构 {kind!r}，可选 {', '.join(SCHEMAS)}") from None
+
+
+# ==========================================
+# 表头 -> 列号
+# ==========================================
+_SPACE = re.compile(r'\s+')
+
+def _norm(v) -> str:
+    return _SPACE.sub('', str(v)).casefold()
+
+def resolve(schema: SourceSchema, header) -> dict:
+    """header：表头行各单元格 (缺省为 '')；返回 {字段名: 列号}，缺列时抛 SchemaError 列出全部问题"""
+    cells = [_norm(v) for v in header]
+    owner = {}   # 规范化别名 -> 字段名
+    for f in schema.fields:
+        for a in f.aliases:
+            owner.setdefault(_norm(a), f.name)
+
+    cols, problems = {}, []
+    for f in schema.fields:
+        names = {_norm(a) for a in f.aliases}
+        hits = [i for i, c in enumerate(cells) if c in names]
+        if f.index in hits:
+            cols[f.name] = f.index
+        elif len(hits) > 1:
+            problems.append(f"「{f.aliases[0]}」有多列表头可匹配 "
+                            f"({', '.join(f'第 {i + 1} 列「{header[i]}」' for i in hits)})，无法确定用哪一列")
+        elif hits:
+            cols[f.name] = hits[0]
+        elif f.optional and (f.index >= len(cells) or owner.get(cells[f.index], f.name) != f.name):
+            continue
+        elif f.index >= len(cells):
+            problems.append(f"缺少「{f.aliases[0] if f.aliases else f.name}」列 (默认第 {f.index + 1} 列，文件只有 {len(cells)} 列)")
+        elif owner.get(cells[f.index], f.name) != f.name:
+            problems.append(f"第 {f.index + 1} 列表头「{header[f.index]}」不是「{f.aliases[0] if f.aliases else f.name}」，列位可能已变动")
+        else:
+            cols[f.name] = f.index
+
+    taken = {}
+    for name, idx in cols.items():
+        if idx in taken:
+            problems.append(f"「{taken[idx]}」与「{name}」都定位到第 {idx + 1} 列")
+        taken.setdefault(idx, name)
+    if problems:
+        raise SchemaError('；'.join(problems))
+    return cols
@@ -0,0 +1,76 @@
+"""结果表检索：在已计算好的表上建 3-gram 倒排索引，查询只做候选行校验，不重算不重读文件"""
+import numpy as np
+import pandas as pd
+
+# 可检索字段：产品编码 / SKU名称 / 橙火ID / 入库码
+SEARCH_COLS = ['Code', 'Info_F', 'Orange_ID', 'Inbound_Code']
+GRAM = 3
+
+
+class SearchIndex:
+    """不区分大小写的子串检索
+
+    - 每个字段的小写值按位置切 3-gram，倒排为 {gram: 行号数组}
+    - 查询 = 各 gram 行号求交 → 候选行逐字段校验子串
+    - 短于 3 个字符的查询直接逐值扫描
+    """
+
+    def __init__(self, df: pd.DataFrame, cols=SEARCH_COLS):
+        self.n_rows = len(df)
+        self.cols = [c for c in cols if c in df.columns]
+        self.values = [df[c].fillna('').astype(str).str.lower().to_numpy(dtype=object) for c in self.cols]
+        self.postings = self._build()
+
+    def _build(self) -> dict:
+        grams, rows = [], []
+        row_ids = np.arange(self.n_rows)
+        for vals in self.values:
+            ser = pd.Series(vals, dtype=object)
+            lens = ser.str.len().to_numpy()
+            for k in range(int(lens.max(initial=0)) - GRAM + 1):
+                ok = lens >= k + GRAM
+                grams.append(ser[ok].str.slice(k, k + GRAM).to_numpy(dtype=object))
+                rows.append(row_ids[ok])
+        if not grams:
+            return {}
+        codes, uniques = pd.factorize(np.concatenate(grams))
+        rows = np.concatenate(rows)
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        postings = {}
+        for g, part in zip(uniques, np.split(rows, bounds)):
+            postings[g] = np.unique(part)
+        return postings
+
+    def _verify(self, rows: np.ndarray, q: str) -> np.ndarray:
+        hit = np.zeros(len(rows), dtype=bool)
+        for vals in self.values:
+            cand = vals[rows]
+            hit |= np.fromiter((q in v for v in cand), dtype=bool, count=len(cand))
+        return rows[hit]
+
+    def search(self, query: str) -> np.ndarray:
+        """返回命中行的位置（升序，保持原表顺序）"""
+        q = (query or '').strip().lower()
+        if not q:
+            return np.arange(self.n_rows)
+        if len(q) < GRAM:
+            return self._verify(np.arange(self.n_rows), q)
+        cand = None
+        # 从最稀有的 gram 开始求交，候选集最快收缩
+        for g in sorted({q[i:i + GRAM] for i in range(len(q) - GRAM + 1)},
+                        key=lambda g: len(self.postings.get(g, ()))):
+            rows = self.postings.get(g)
+            if rows is None:
+                return np.array([], dtype=np.int64)
+            cand = rows if cand is None else np.intersect1d(cand, rows, assume_unique=True)
+            if len(cand) == 0:
+                return cand
+        return self._verify(cand, q)
+
+    def filter(self, df: pd.DataFrame, query: str) -> pd.DataFrame:
+        """df 须为建索引时的同一张表"""
+        if not (query or '').strip():
+            return df
+        return df.iloc[self.search(query)]
@@ -0,0 +1,17 @@
+"""通用清洗函数"""
+import pandas as pd
+
+
+def clean_match_key(series):
+    """只清洗去重后的取值，再按 factorize 编码展开（SKU 列重复率高，省掉大部分字符串运算）"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    s = pd.Series(uniques, dtype=object).astype(str).str.upper()
+    s = s.str.replace(r'\.0$', '', regex=True).str.replace('"', '').str.strip()
+    s = s.replace('NAN', '')
+    return pd.Series(s.to_numpy()[codes], index=series.index, dtype=s.dtype)
+
+def clean_num(series):
+    return pd.to_numeric(series.astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+
+def clean_str(series):
+    return series.astype(str).str.replace('nan', '', case=False).str.strip()
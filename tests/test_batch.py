@@ -0,0 +1,7 @@
+from restock.batch import UNASSIGNED_SHOP, shop_folders
+
+
+def test_colliding_shop_names_get_distinct_folders():
+    folders = shop_folders(['A/B', 'A:B', 'a b', 'C', '', '???'])
+    assert folders == {'A/B': 'A_B', 'A:B': 'A_B_2', 'a b': 'a_b_3', 'C': 'C',
+                       '': UNASSIGNED_SHOP, '???': f'{UNASSIGNED_SHOP}_2'}
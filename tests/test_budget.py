@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from restock.batch import UNASSIGNED_SHOP, shop_plan
+from restock.budget import BudgetParams, plan_budget
+
+
+def _final(shops):
+    n = len(shops)
+    return pd.DataFrame({
+        'Shop': shops,
+        'Code': [f'P{i}' for i in range(n)],
+        'Info_E': '', 'Info_F': '', 'Orange_ID': [f'O{i}' for i in range(n)], 'Inbound_Code': 'B',
+        'Cost': 10.0,
+        'Sales_7d': 7.0, 'Sales_30d': 30.0,
+        'Stock_Orange': 0.0, 'Stock_Jifeng': 0.0, 'Total_Stock': 0.0,
+        'Safety': 21.0, 'Restock_Qty': 21, 'Restock_Money': 210.0,
+        'Forecast_Week': 7.0,
+    })
+
+
+def test_blank_shop_is_planned_not_crashing():
+    df = _final(['A', np.nan, 'A', None])
+    plan = plan_budget(df, 3, BudgetParams(budget=1000))
+    assert plan.spent <= 1000
+    assert set(plan.by_shop['Shop']) == {'A', ''}
+    assert plan.by_shop['Spent'].sum() == plan.spent
+    # 空店铺的行在按店铺切分时归到未分配店铺
+    assert len(shop_plan(plan, UNASSIGNED_SHOP).frame) == (plan.frame['Shop'] == '').sum()
@@ -0,0 +1,74 @@
+import io
+import zipfile
+import zlib
+
+import pytest
+
+from restock import export
+
+ARTIFACTS = {
+    'Coupang_Restock_Full_v18_X.xlsx': bytes(range(256)) * 50,
+    'WorkOrder_采购工单_X.html': '<p>采购 · 调拨</p>'.encode('utf-8') * 400,
+    '작업지시서_X.html': '재고 경고'.encode('utf-8') * 300,
+    'empty.txt': b'',
+}
+
+
+def _entries(zip_bytes):
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as z:
+        assert z.testzip() is None
+        return {i.filename: (i, z.read(i)) for i in z.infolist()}
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_assembled_zip_round_trips(workers):
+    zip_bytes, stats = export.zip_artifacts(ARTIFACTS, workers=workers)
+    entries = _entries(zip_bytes)
+    assert list(entries) == list(ARTIFACTS)                    # 顺序与非 ASCII 文件名都保留
+    for name, data in ARTIFACTS.items():
+        info, body = entries[name]
+        assert body == data and info.CRC == zlib.crc32(data) and info.file_size == len(data)
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+        assert stats[name][1] == info.compress_size
+    assert all(entries[n][0].flag_bits & 0x800 for n in ARTIFACTS if not n.isascii())
+
+
+def test_falls_back_to_zipfile_above_zip32_limit(monkeypatch):
+    calls = []
+    sequential = export._zip_sequential
+    monkeypatch.setattr(export, 'ZIP32_LIMIT', 1024)
+    monkeypatch.setattr(export, '_zip_sequential', lambda a: calls.append(a) or sequential(a))
+    zip_bytes, _ = export.zip_artifacts(ARTIFACTS, workers=1)
+    assert calls
+    entries = _entries(zip_bytes)
+    assert {n: body for n, (_, body) in entries.items()} == ARTIFACTS
+
+
+def _work_order(codes):
+    import pandas as pd
+    return pd.DataFrame({'产品编码': codes, 'SKU名称': [f'名{i}' for i in range(len(codes))],
+                         '数量': range(len(codes))})
+
+
+def test_work_order_html_escapes_cell_text():
+    df = _work_order(['P1', 'P2'])
+    df.loc[0, 'SKU名称'] = '<b>A&B</b> 세트'
+    html = export.make_work_order_html(df, '采购 <工单>', 'R&D').decode('utf-8')
+    assert '&lt;b&gt;A&amp;B&lt;/b&gt; 세트' in html and '<b>A&B' not in html
+    assert '采购 &lt;工单&gt;' in html and 'R&amp;D' in html
+
+
+def test_streamed_html_matches_bytes():
+    df = _work_order(['P1'] * 5 + ['P2'] * 3)
+    buf = io.BytesIO()
+    export.write_work_order_html(buf, df, 't', 's', chunk_rows=2)
+    assert buf.getvalue() == export.make_work_order_html(df, 't', 's')
+
+
+def test_split_work_order_pages_at_group_boundaries():
+    codes = ['A'] * 3 + ['B'] * 2 + ['C'] * 4 + ['D'] * 1 + ['E'] * 6
+    parts = export.split_work_order(_work_order(codes), max_rows=5)
+    assert [list(p['产品编码'].unique()) for p in parts] == [['A', 'B'], ['C', 'D'], ['E']]
+    assert sum(len(p) for p in parts) == len(codes)
+    assert all(len(p) <= 5 for p in parts[:-1]) and len(parts[-1]) == 6   # 单组超长时整组成份
+    assert len(export.split_work_order(_work_order(codes), max_rows=100)) == 1
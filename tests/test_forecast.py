@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from restock.pipeline import Params, compute_restock
+
+
+def _joined(sales_7d):
+    n = len(sales_7d)
+    return pd.DataFrame({
+        'Cost': 10.0, 'Inbound_Code': 'IB', 'Active': 'Y',
+        'Sales_7d': np.asarray(sales_7d, dtype=float), 'Sales_30d': 30.0,
+        'Stock_Orange': np.linspace(0, 20, n), 'Stock_Jifeng': 1.5,
+    })
+
+
+def test_flat_keeps_legacy_arithmetic_for_fractional_sales():
+    sales = [0.0, 0.4, 2.5, 3.3333, 7.0, 12.75]
+    params = Params(forecast='flat', service_z=0.0)
+    out = compute_restock(_joined(sales), params)
+    s = np.asarray(sales)
+    np.testing.assert_array_equal(out['Safety_Calc'], s * params.safety_weeks)
+    np.testing.assert_array_equal(out['Redundancy_Std'], s * params.redundancy_weeks)
+    np.testing.assert_array_equal(out['Orange_Safety_Std'], s * params.orange_safety_weeks)
+
+
+def test_forecast_methods_round_up_to_whole_units():
+    out = compute_restock(_joined([0.4, 2.5, 12.75]), Params(forecast='blend', service_z=1.0))
+    for col in ('Safety_Calc', 'Redundancy_Std', 'Orange_Safety_Std'):
+        assert (out[col] == np.ceil(out[col])).all()
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.history import HistoryStore
+
+pytest.importorskip('pyarrow')
+
+END = date(2026, 10, 17)
+
+
+def _sales(rng, n_keys=30):
+    keys = rng.choice([f'K{i:03d}' for i in range(n_keys)], size=rng.integers(5, n_keys), replace=False)
+    return pd.DataFrame({'Key': keys, 'Qty': rng.integers(0, 20, size=len(keys)).astype(float)})
+
+
+def test_append_day_aggregates_frames(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    a = pd.DataFrame({'Key': ['A', 'B'], 'Qty': [1.0, 2.0]})
+    b = pd.DataFrame({'Key': ['B', 'C'], 'Qty': [3.0, 4.0]})
+    assert store.append_day('sales', END, [a, b]) == 3
+    assert store.days('sales') == [END]
+    day = store.day_frame('sales', END).set_index('Key')['Qty'].to_dict()
+    assert day == {'A': 1.0, 'B': 5.0, 'C': 4.0}
+
+
+def test_reappending_a_day_replaces_it(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append_day('sales', END, [pd.DataFrame({'Key': ['A'], 'Qty': [5.0]})])
+    store.append_day('sales', END, [pd.DataFrame({'Key': ['A', 'B'], 'Qty': [2.0, 1.0]})])
+    assert store.days('sales') == [END]
+    window = store.window('sales', END, 7).set_index('Key')['Qty'].to_dict()
+    assert window == {'A': 2.0, 'B': 1.0}
+
+
+def test_rolling_windows_match_full_recompute(tmp_path):
+    rng = np.random.default_rng(1)
+    store = HistoryStore(str(tmp_path))
+    frames = {}
+    for i in range(40):
+        d = END - timedelta(days=i)
+        if i in (3, 12):                     # 缺几天
+            continue
+        frames[d] = _sales(rng)
+        store.append_day('sales', d, [frames[d]])
+
+    for n in (7, 30):
+        days = [d for d in frames if END - timedelta(days=n - 1) <= d <= END]
+        expected = pd.concat([frames[d] for d in days]).groupby('Key')['Qty'].sum()
+        got = store.window('sales', END, n).set_index('Key')['Qty']
+        pd.testing.assert_series_equal(got.sort_index(), expected.sort_index(), check_names=False)
+        assert store.window_days('sales', END, n) == sorted(days)
+    assert store.missing_days('sales', END, 7) == [END - timedelta(days=3)]
+
+
+def test_snapshot_takes_latest_on_or_before_day(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append_day('inv_j', END - timedelta(days=2), [pd.DataFrame({'Key': ['A'], 'Qty': [9.0]})])
+    assert store.snapshot_day('inv_j', END) == END - timedelta(days=2)
+    assert store.snapshot('inv_j', END)['Qty'].tolist() == [9.0]
+    assert store.snapshot_day('inv_j', END - timedelta(days=3)) is None
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import pytest
+
+from restock.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, ResultCache
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(workers=1, results=ResultCache(str(tmp_path)))
+    yield q
+    q.shutdown()
+
+
+def _blocker(queue):
+    """占住唯一的工作线程，后续提交保持排队"""
+    release = threading.Event()
+    job = queue.submit(lambda job: (release.wait(5), None), 'blocker')
+    return job, release
+
+
+def test_cancel_only_withdraws_one_submitters_claim(queue):
+    blocker, release = _blocker(queue)
+    a = queue.submit(lambda job: ('x', None), 'k', owner='a')
+    b = queue.submit(lambda job: ('x', None), 'k', owner='b')
+    assert a is b and a.status == QUEUED
+
+    assert not queue.cancel(a.id, 'a')          # b 还在等
+    release.set()
+    assert b.wait(5) and b._future.result(5) is None
+    assert b.status == DONE and b.value == 'x'
+
+
+def test_last_claim_cancels_queued_job(queue):
+    blocker, release = _blocker(queue)
+    job = queue.submit(lambda job: ('x', None), 'k', owner='a')
+    queue.submit(lambda job: ('x', None), 'k', owner='b')
+    assert not queue.cancel(job.id, 'a')
+    assert queue.cancel(job.id, 'b')
+    assert job.status == FAILED and job.error == '已取消' and job.wait(0)
+    release.set()
+
+
+class _Pack:
+    def __init__(self, name, data):
+        self.zip_name, self.zip_bytes = name, data
+
+
+def test_job_lifecycle_publish_and_progress(queue):
+    blocker, release = _blocker(queue)
+    step = threading.Event()
+
+    def fn(job):
+        job.report(0.5, '计算')
+        job.publish('preview')
+        step.wait(5)
+        return 'final', _Pack('a.zip', b'zip')
+
+    job = queue.submit(fn, 'k', label='L')
+    assert job.status == QUEUED and not job.wait(0)
+    release.set()
+    assert job.wait(5) and job.value == 'preview'
+    assert job.status == RUNNING and job.progress == 0.5 and job.message == '计算'
+    assert queue.pack(job) is None
+    step.set()
+    job._future.result(5)
+    assert job.status == DONE and job.progress == 1.0 and job.value == 'final'
+    assert queue.pack(job) == ('a.zip', b'zip')
+    # 已完成且 ZIP 仍在缓存：同键直接复用
+    assert queue.submit(fn, 'k') is job
+    assert job.record()['status'] == '已完成'
+
+
+def test_failed_job_reports_error_and_is_not_reused(queue):
+    def boom(job):
+        raise ValueError('坏文件')
+
+    job = queue.submit(boom, 'k')
+    job._future.result(5)
+    assert job.status == FAILED and job.error == '坏文件' and job.wait(0)
+    again = queue.submit(lambda job: ('ok', None), 'k')
+    assert again is not job
+
+
+def test_prune_drops_expired_and_extra_finished_jobs(tmp_path):
+    q = JobQueue(workers=1, results=ResultCache(str(tmp_path)), max_jobs=2, ttl_s=60)
+    done = [q.submit(lambda job: (i, None), f'k{i}') for i in range(4)]
+    for job in done:
+        job._future.result(5)
+    done[0].finished -= 120                       # 过期
+    blocker, release = _blocker(q)
+    try:
+        ids = {j.id for j in q.jobs()}
+        assert done[0].id not in ids and done[1].id not in ids   # 过期 + 超出 max_jobs 的最早一条
+        assert {done[2].id, done[3].id, blocker.id} <= ids
+    finally:
+        release.set()
+        q.shutdown()
+
+
+def test_result_cache_ttl_expiry(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_s=60)
+    cache.put('k', 'a.zip', b'data')
+    assert 'k' in cache and cache.get('k') == ('a.zip', b'data')
+    old = time.time() - 120
+    os.utime(os.path.join(str(tmp_path), 'k.zip'), (old, old))
+    assert 'k' not in cache and cache.get('k') is None
+    assert not os.listdir(str(tmp_path))
+
+
+def test_result_cache_evicts_least_recently_used_by_size(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=25)
+    now = time.time()
+    for i, key in enumerate(('a', 'b')):
+        cache.put(key, f'{key}.zip', b'x' * 10)
+        os.utime(os.path.join(str(tmp_path), f'{key}.zip'), (now - 100 + i, now - 100 + i))
+    assert cache.get('a') is not None             # 访问 a：b 变成最久未用
+    cache.put('c', 'c.zip', b'x' * 10)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.stats()['entries'] == 2 and cache.evictions == 1
+
+
+def test_result_cache_replace_is_atomic(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    cache.put('k', 'a.zip', b'old')
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr('restock.jobs.os.replace', fail)
+    with pytest.raises(OSError):
+        cache.put('k', 'a.zip', b'new-and-longer')
+    monkeypatch.undo()
+    assert cache.get('k') == ('a.zip', b'old')
+    cache.put('k', 'b.zip', b'new')
+    assert cache.get('k') == ('b.zip', b'new')
+    assert sorted(os.listdir(str(tmp_path))) == ['k.json', 'k.zip']      # 没有残留临时文件
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('reportlab')
+
+from restock import pdf  # noqa: E402
+from restock.fonts import FONT_CANDIDATES, PdfFontError, missing_fonts  # noqa: E402
+
+DEJAVU = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+
+
+@pytest.fixture
+def no_fonts(monkeypatch):
+    monkeypatch.setattr('restock.fonts.FONT_CANDIDATES',
+                        {lang: (env, []) for lang, (env, _) in FONT_CANDIDATES.items()})
+    for env, _ in FONT_CANDIDATES.values():
+        monkeypatch.delenv(env, raising=False)
+
+
+def test_missing_fonts_raise_instead_of_cid_fallback(no_fonts):
+    assert missing_fonts() == ['zh', 'ko']
+    with pytest.raises(PdfFontError):
+        pdf.make_work_order_pdf(pd.DataFrame({'产品编码': ['A']}), '标题', '范围')
+
+
+@pytest.mark.skipif(not os.path.isfile(DEJAVU), reason='需要一个本地 TrueType 字体')
+def test_pdf_embeds_the_font(no_fonts, monkeypatch):
+    for env, _ in FONT_CANDIDATES.values():
+        monkeypatch.setenv(env, DEJAVU)
+    data = pdf.make_work_order_pdf(pd.DataFrame({'产品编码': ['A', 'B'], '数量': [1, 2]}), 'Title', 'sub')
+    assert b'/FontFile2' in data
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from restock import pipeline as pl
+
+
+def _sources(tag):
+    frame = pd.DataFrame({'Key': ['A', 'B'], 'Qty': [1.0, 2.0], 'Fee': [0.0, 0.0]})
+    return {g: (f'{tag}-{g}', lambda: [frame]) for g in ('7d', '30d', 'r', 'j')}
+
+
+def _base():
+    return pd.DataFrame({'Orange_ID': ['B', 'A'], 'Inbound_Code': ['A', 'B']})
+
+
+def test_keyspace_reset_drops_dependent_memos_and_ignores_stale_aggregates(monkeypatch):
+    p = pl.Pipeline(cache=object())
+    _, joined = p._aggregate_join('m', _base(), _sources('x'))
+    old_space = p.keyspace
+
+    monkeypatch.setattr(pl, 'MAX_KEYSPACE', 0)
+    space, generation = p._check_keyspace()
+    assert space is not old_space
+    assert not {'aggregate', 'join', 'compute', 'render'} & set(p._memo)
+
+    # 重建前开始的线程把旧编码的汇总结果写回记忆：新键空间下不能被取到
+    p._store('aggregate', f'{generation - 1}:x-7d', pd.DataFrame({'Qty': [9.0, 9.0]}, index=pd.Index([1, 0], name='Key')))
+    monkeypatch.setattr(pl, 'MAX_KEYSPACE', 10)
+    _, rejoined = p._aggregate_join('m', _base(), _sources('x'))
+    assert p.keyspace is space
+    pd.testing.assert_frame_equal(rejoined, joined)
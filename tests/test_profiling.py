@@ -0,0 +1,59 @@
+import threading
+import time
+
+from restock.profiling import Profiler
+
+
+def test_memory_profiled_runs_do_not_overlap():
+    active, overlaps = [0], []
+    lock = threading.Lock()
+
+    def job():
+        with Profiler(memory=True).activate() as prof, prof.stage('work'):
+            with lock:
+                active[0] += 1
+                overlaps.append(active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=job) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert overlaps == [1, 1, 1, 1]
+
+
+def test_timing_only_runs_are_not_serialized():
+    barrier = threading.Barrier(2, timeout=2)
+
+    def job():
+        with Profiler().activate():
+            barrier.wait()
+
+    threads = [threading.Thread(target=job) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not barrier.broken
+
+
+def test_no_wait_activation_falls_back_to_timing_only():
+    holding, release = threading.Event(), threading.Event()
+
+    def job():
+        with Profiler(memory=True).activate():
+            holding.set()
+            release.wait(2)
+
+    t = threading.Thread(target=job)
+    t.start()
+    holding.wait(2)
+    prof = Profiler(memory=True)
+    with prof.activate(wait=False), prof.stage('preview') as rec:
+        rec['rows_out'] = 1
+    release.set()
+    t.join()
+    assert 'py_peak_mb' not in prof.stages[0] and prof.stages[0]['rows_out'] == 1
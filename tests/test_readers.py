@@ -0,0 +1,80 @@
+import datetime
+import io
+
+import pandas as pd
+import pytest
+
+from restock.readers import detect_encoding, file_encoding, read_columns
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _xlsx(rows) -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_streamed_excel_columns_match_read_excel_dtype_str():
+    data = _xlsx([
+        ['옵션ID', 'Int', 'Float', 'Date', 'Text', 'Flag'],
+        [12345.0, 7, 1.0, datetime.datetime(2026, 10, 1), 'abc', True],
+        [None, -3, 1e20, datetime.datetime(2026, 10, 2, 13, 5), 'NA', False],
+        [67890.0, 0, 2.5, datetime.date(2026, 1, 1), None, None],
+        [None, None, None, None, None, None],                 # 中间整行空白保留为 NaN 行
+        [1e15, 10 ** 12, 0.1 + 0.2, datetime.datetime(2026, 1, 1, 0, 0, 0, 500000), '0012', True],
+        [3.0, 5, -0.0, None, '한글 商品', None],
+    ])
+    expected = pd.read_excel(io.BytesIO(data), dtype=str)
+    expected.columns = range(expected.shape[1])
+
+    got = pd.concat(read_columns('a.xlsx', data, range(6), chunksize=2), ignore_index=True)
+    pd.testing.assert_frame_equal(got.astype(object), expected.astype(object))
+    assert list(got[0].dropna()) == ['12345', '67890', '1000000000000000', '3']   # .0 编号不带小数
+
+
+def test_missing_columns_are_omitted():
+    data = _xlsx([['a', 'b'], [1, 2]])
+    chunks = list(read_columns('a.xlsx', data, [1, 5]))
+    assert [list(c.columns) for c in chunks] == [[1]]
+
+
+KOREAN = '재고수량'
+
+
+@pytest.mark.parametrize('data, enc', [
+    (b'\xef\xbb\xbfSKU,Qty\n' + 'A,1\n'.encode('utf-8'), 'utf-8-sig'),
+    ('옵션ID,판매수량\nA,1\n'.encode('utf-8'), 'utf-8'),
+    ('옵션ID,판매수량\nA,1\n'.encode('cp949'), 'cp949'),
+    ('SKU,Qty\n'.encode('utf-16'), 'utf-16'),
+])
+def test_detect_encoding(data, enc):
+    assert detect_encoding(data) == enc
+    assert file_encoding('a.csv', data) == enc
+    assert file_encoding('a.xlsx', data) == 'xlsx'
+
+
+def _late_cp949(prefix_bytes=1024):
+    """前 prefix_bytes 字节全是 ASCII，后面才出现 cp949 韩文"""
+    head = 'SKU,Qty\n'
+    ascii_rows = ''.join(f'A{i:06d},1\n' for i in range(prefix_bytes // 10 + 1))
+    return (head + ascii_rows + f'{KOREAN},5\n').encode('cp949')
+
+
+def test_prefix_sniff_misses_late_cp949_but_full_scan_finds_it():
+    data = _late_cp949()
+    assert detect_encoding(data, sniff_bytes=512) == 'utf-8'
+    assert detect_encoding(data, sniff_bytes=None) == 'cp949'
+
+
+def test_late_cp949_falls_back_to_full_scan_when_reading():
+    from restock import pipeline, readers
+
+    data = _late_cp949(readers.SNIFF_BYTES + 4096)
+    assert file_encoding('a.csv', data) == 'utf-8'
+    agg = pipeline.read_source_aggregated('a.csv', data, 0, 1)
+    assert agg.loc[agg['Key'] == KOREAN, 'Qty'].tolist() == [5]
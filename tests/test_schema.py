@@ -0,0 +1,50 @@
+import pytest
+
+from restock.cache import ParseCache
+from restock.schema import INV_R, SALES_7D, SchemaError, resolve
+
+
+def _header(cells: dict, width=9):
+    row = [''] * width
+    for i, v in cells.items():
+        row[i] = v
+    return row
+
+
+def test_default_column_wins_over_other_alias_hits():
+    header = _header({0: '옵션ID', 3: 'SKU ID', 8: '판매수량'})
+    assert resolve(SALES_7D, header) == {'Key': 0, 'Qty': 8}
+
+
+def test_several_matching_headers_off_default_are_ambiguous():
+    header = _header({1: 'SKU ID', 2: '옵션ID', 8: '판매수량'})
+    with pytest.raises(SchemaError, match='第 2 列「SKU ID」, 第 3 列「옵션ID」'):
+        resolve(SALES_7D, header)
+
+
+def test_single_match_off_default_is_used():
+    header = _header({2: '옵션ID', 5: 'Sales'})
+    assert resolve(SALES_7D, header) == {'Key': 2, 'Qty': 5}
+
+
+def test_optional_fee_column_may_be_missing():
+    header = _header({2: 'SKU ID', 7: '수량'}, width=10)       # 没有仓储费列，文件也不到默认列宽
+    cols = resolve(INV_R, header)
+    assert cols == {'Key': 2, 'Qty': 7}
+    assert [f.name for f in INV_R.optional_missing(cols)] == ['Fee']
+
+
+def test_missing_fee_is_filled_with_zero_and_noted():
+    from restock.pipeline import ingest_file
+
+    rows = [','.join(_header({2: 'SKU ID', 7: '수량'}, width=10))]
+    rows += [','.join(_header({2: f'K{i}', 7: str(i)}, width=10)) for i in range(3)]
+    data = ('\n'.join(rows) + '\n').encode('utf-8')
+    df = ingest_file('inv_r.csv', data, (INV_R, None), cache=ParseCache(max_entries=1))
+    assert df['Fee'].tolist() == [0.0, 0.0, 0.0] and df['Qty'].tolist() == [0.0, 1.0, 2.0]
+    assert '보관료' in df.attrs['source']['note']
+
+
+def test_required_columns_still_rejected():
+    with pytest.raises(SchemaError, match='수량'):
+        resolve(INV_R, _header({2: 'SKU ID'}, width=5))
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.search import SEARCH_COLS, SearchIndex
+
+
+def _table(n=400):
+    rng = np.random.default_rng(0)
+    words = ['保温杯', '수건 세트', 'Phone Case', '儿童牙刷', '텀블러', 'USB-C 线', 'abcabc']
+    return pd.DataFrame({
+        'Code': [f'P{i // 3:04d}' for i in range(n)],
+        'Info_F': [f'{words[i % len(words)]} {rng.integers(1, 50)}' for i in range(n)],
+        'Orange_ID': [None if i % 11 == 0 else str(880000 + i) for i in range(n)],
+        'Inbound_Code': [f'JF{i:05d}' for i in range(n)],
+        'Qty': range(n),
+    })
+
+
+def _scan(df, q):
+    q = q.strip().lower()
+    hit = np.zeros(len(df), dtype=bool)
+    for c in SEARCH_COLS:
+        hit |= df[c].fillna('').astype(str).str.lower().str.contains(q, regex=False).to_numpy()
+    return np.flatnonzero(hit)
+
+
+@pytest.mark.parametrize('query', [
+    'p', '01', 'P0012', '保温', '保温杯', '수', '수건 세트', '텀블러 1', 'case', 'PHONE CASE',
+    'usb-c', '8801', 'jf0039', 'bca', 'abcabc', 'zzz', '没有的商品', '없는',
+])
+def test_matches_plain_substring_scan(query):
+    df = _table()
+    index = SearchIndex(df)
+    np.testing.assert_array_equal(index.search(query), _scan(df, query))
+
+
+def test_no_match_and_blank_query():
+    df = _table(50)
+    index = SearchIndex(df)
+    assert len(index.search('no such sku')) == 0 and index.filter(df, 'no such sku').empty
+    assert index.filter(df, '  ') is df